@@ -38,7 +38,7 @@ Export-Features:
 import flet as ft
 from flet import (
     Page, Text, ElevatedButton, FilePicker, FilePickerResultEvent,
-    Column, Row, Container, DataTable, DataColumn, DataRow, DataCell,
+    Column, Row, Container,
     Dropdown, dropdown, TextField, Checkbox, ProgressBar, Divider,
     Tab, Tabs, ListView, Card, AlertDialog, TextButton, SnackBar,
     Switch, RadioGroup, Radio, ScrollMode, MainAxisAlignment,
@@ -46,19 +46,29 @@ from flet import (
     ThemeMode, ButtonStyle, BorderSide
 )
 from flet import Icons, Colors  # Neue Flet-Version
+import codecs
 import csv
+import heapq
+import mmap
 import json
 import os
 import re
+import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict, List, Any, Tuple
-from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, List, Any, Set, Tuple, Iterable, Iterator, Callable
+from dataclasses import dataclass, field
 import threading
+from collections import OrderedDict, defaultdict, deque
+from functools import lru_cache
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
 import mimetypes
 import hashlib
+import sqlite3
 import logging
 
 # Conditional requests import
@@ -70,21 +80,171 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# Optional requests-toolbelt für gestreamte Datei-Uploads (Fallback: Body im Speicher)
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+# Optional httpx mit HTTP/2 (h2) für parallele Lese-Requests über eine Verbindung
+try:
+    import httpx
+    import h2  # noqa: F401 - von httpx für http2=True benötigt
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Optional lxml für schnelles Streaming-Parsing (Fallback: ElementTree)
+try:
+    from lxml import etree as LET
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Optional Aho-Corasick für Teilstring-Suche im Auto-Mapping
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Optional orjson für schnelles JSON-Parsing (Fallback: json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data):
+    """Dekodiert JSON (str oder bytes) - orjson wenn verfügbar"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Kodiert JSON als UTF-8 Bytes - orjson wenn verfügbar"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, indent=2 if pretty else None,
+                      ensure_ascii=False, default=str).encode("utf-8")
+
+
+def json_param(obj: Any) -> str:
+    """Kodiert JSON als str für Query-Parameter (fields/filters)"""
+    return json_dumps(obj).decode("utf-8")
+
+
+# Optional pyarrow für schnelles CSV-Parsing (Fallback: csv.DictReader)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Gemini API
 GEMINI_AVAILABLE = REQUESTS_AVAILABLE  # Uses requests
 
 
+@lru_cache(maxsize=8)
+def _render_mapping_prefix(targets: Tuple[Tuple, ...]) -> str:
+    """Rendert den von den Quellspalten unabhängigen Teil des Mapping-Prompts"""
+    target_list = "\n".join(
+        f"- {key}: {label} ({field_type}) {'PFLICHT' if required else ''}".strip()
+        for key, label, field_type, required in targets
+    )
+    return f"""Du bist ein Experte für Daten-Mapping in ERP-Systemen.
+
+AUFGABE: Ordne die Quellspalten den passenden ERPNext-Zielfeldern zu.
+
+ZIELFELDER (ERPNext):
+{target_list}
+
+REGELN:
+1. Jede Quellspalte kann nur EINEM Zielfeld zugeordnet werden
+2. Nicht alle Quellspalten müssen zugeordnet werden
+3. Achte auf semantische Ähnlichkeit, nicht nur auf Namen
+4. Berücksichtige die Beispieldaten für bessere Zuordnung
+5. Typische Mappings:
+   - Artikelnummer/SKU/Art-Nr -> item_code
+   - Bezeichnung/Name/Titel -> item_name
+   - EAN/GTIN/Barcode -> gtin
+   - Preis/VK/Netto -> standard_rate
+   - Kategorie/Warengruppe -> item_group
+   - Beschreibung/Text -> description
+   - Gewicht -> weight_per_unit
+   - Hersteller/Marke/Brand -> brand
+
+ANTWORT-FORMAT (NUR JSON, keine Erklärung):
+[{{"source": "quellspalte1", "target": "zielfeld1"}}, {{"source": "quellspalte2", "target": "zielfeld2"}}]
+
+Wenn keine passende Zuordnung möglich ist, die Spalte weglassen."""
+
+
 class GeminiAPI:
     """Google Gemini API Client für intelligentes Feld-Mapping"""
 
+    # Ab dieser Spaltenanzahl wird das Mapping in parallele Teil-Prompts zerlegt
+    CHUNK_THRESHOLD = 40
+    CHUNK_SIZE = 30
+    MAX_PARALLEL_REQUESTS = 4
+    # Gleiche Spalten/Zielfelder/Beispiele liefern das gespeicherte Mapping (30 Tage)
+    MAPPING_CACHE_TTL = 30 * 24 * 3600
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
         self.model = "gemini-2.5-flash"
         self.last_error = ""
+        self._sessions: Dict[int, Any] = {}
+        self._mapping_cache: Optional[PersistentCache] = None
+
+    def _get_session(self, retries: int = 2):
+        """
+        Gemeinsame Session (Keep-Alive) je Retry-Anzahl - wird beim ersten Request erstellt.
+
+        Retries/Backoff übernimmt urllib3 inkl. Retry-After-Header bei 429.
+        """
+        session = self._sessions.get(retries)
+        if session is None:
+            session = requests.Session()
+            retry_strategy = Retry(
+                total=retries,
+                backoff_factor=2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy)
+            session.mount("https://", adapter)
+            self._sessions[retries] = session
+        return session
 
-    def _make_request(self, prompt: str, retries: int = 2) -> Optional[str]:
-        """Sendet Anfrage an Gemini API mit Retry-Logik"""
+    # Structured Output: Gemini akzeptiert nur die OpenAPI-Teilmenge (kein additionalProperties,
+    # OBJECT braucht feste properties) - daher Liste von {source, target}-Paaren
+    MAPPING_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "source": {"type": "string"},
+                "target": {"type": "string"},
+            },
+            "required": ["source", "target"],
+        },
+    }
+
+    def _make_request(self, prompt: str, retries: int = 2,
+                      response_schema: Optional[Dict] = None) -> Optional[str]:
+        """Sendet Anfrage an Gemini API mit Retry-Logik.
+
+        Mit response_schema liefert die API direkt JSON (ohne Markdown).
+        """
         if not REQUESTS_AVAILABLE:
             return None
 
@@ -101,51 +261,45 @@ class GeminiAPI:
                 "maxOutputTokens": 2048,
             }
         }
+        if response_schema is not None:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = response_schema
 
-        for attempt in range(retries + 1):
-            try:
-                response = requests.post(url, json=payload, timeout=60)
-
-                # Rate Limit Handling
-                if response.status_code == 429:
-                    self.last_error = "Rate Limit erreicht - bitte kurz warten"
-                    if attempt < retries:
-                        wait_time = (attempt + 1) * 5  # 5s, 10s
-                        logger.warning(f"Rate limit, warte {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        logger.error("Rate limit nach allen Retries")
-                        return None
-
-                response.raise_for_status()
-                data = response.json()
-
-                # Extrahiere Text aus Antwort
-                candidates = data.get("candidates", [])
-                if candidates:
-                    content = candidates[0].get("content", {})
-                    parts = content.get("parts", [])
-                    if parts:
-                        self.last_error = ""
-                        return parts[0].get("text", "")
-
-                self.last_error = "Keine Antwort von API"
-                return None
+        try:
+            response = self._get_session(retries).post(
+                url, data=json_dumps(payload),
+                headers={"Content-Type": "application/json"}, timeout=60
+            )
 
-            except requests.exceptions.HTTPError as e:
-                self.last_error = f"HTTP Fehler: {e.response.status_code}"
-                logger.error(f"Gemini API HTTP Error: {e}")
-                if attempt < retries and e.response.status_code >= 500:
-                    time.sleep(2)
-                    continue
-                return None
-            except Exception as e:
-                self.last_error = str(e)
-                logger.error(f"Gemini API Error: {e}")
+            # Rate Limit Handling (Retries bereits durch Session ausgeschöpft)
+            if response.status_code == 429:
+                self.last_error = "Rate Limit erreicht - bitte kurz warten"
+                logger.error("Rate limit nach allen Retries")
                 return None
 
-        return None
+            response.raise_for_status()
+            data = json_loads(response.content)
+
+            # Extrahiere Text aus Antwort
+            candidates = data.get("candidates", [])
+            if candidates:
+                content = candidates[0].get("content", {})
+                parts = content.get("parts", [])
+                if parts:
+                    self.last_error = ""
+                    return parts[0].get("text", "")
+
+            self.last_error = "Keine Antwort von API"
+            return None
+
+        except requests.exceptions.HTTPError as e:
+            self.last_error = f"HTTP Fehler: {e.response.status_code}"
+            logger.error(f"Gemini API HTTP Error: {e}")
+            return None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Gemini API Error: {e}")
+            return None
 
     def test_connection(self) -> Tuple[bool, str]:
         """Testet die API-Verbindung"""
@@ -160,17 +314,80 @@ class GeminiAPI:
         """
         Mappt Quellspalten intelligent auf Zielfelder mittels AI.
 
+        Ergebnisse werden persistent gecacht - ein erneuter Aufruf mit gleichen
+        Spalten, Zielfeldern und Beispielen braucht keinen API-Request.
+
         Returns: Dict[source_column, target_field]
         """
-        # Erstelle Beschreibung der Zielfelder
-        target_descriptions = []
-        for field_key, field_info in target_fields.items():
-            label = field_info.get("label", field_key)
-            field_type = field_info.get("type", "Text")
-            required = "PFLICHT" if field_info.get("required") else ""
-            target_descriptions.append(f"- {field_key}: {label} ({field_type}) {required}")
+        key = self._mapping_cache_key(source_columns, target_fields, sample_data)
+        if self._mapping_cache is None:
+            self._mapping_cache = PersistentCache(self.base_url, ttl=self.MAPPING_CACHE_TTL)
+        cached = self._mapping_cache.get("ai_mapping", key)
+        if cached is not None:
+            return json_loads(cached)
+
+        mapping, complete = self._map_all_columns(source_columns, target_fields, sample_data)
+        # Nur vollständige Antworten cachen - ein fehlgeschlagener Teil-Prompt
+        # (429, Timeout) darf kein lückenhaftes Mapping für 30 Tage festschreiben
+        if complete and mapping:
+            self._mapping_cache.put("ai_mapping", key, json_dumps(mapping).decode("utf-8"))
+        return mapping
+
+    def _mapping_cache_key(self, source_columns: List[str],
+                           target_fields: Dict[str, Dict],
+                           sample_data: Optional[List[Dict]]) -> str:
+        """Hash über alles, was in den Prompt eingeht (Modell, Spalten, Zielfelder, Beispiele)"""
+        targets = [
+            (key, info.get("label", key), info.get("type", "Text"),
+             bool(info.get("required")), bool(info.get("custom")))
+            for key, info in target_fields.items()
+        ]
+        samples = [[str(row.get(col, ""))[:50] for col in source_columns]
+                   for row in (sample_data or [])[:3]]
+        payload = json_dumps([self.model, list(source_columns), targets, samples])
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _map_all_columns(self, source_columns: List[str],
+                         target_fields: Dict[str, Dict],
+                         sample_data: List[Dict] = None) -> Tuple[Dict[str, str], bool]:
+        """
+        Fragt die AI (bei vielen Spalten in parallelen Teil-Prompts).
 
-        target_list = "\n".join(target_descriptions)
+        Returns: (Mapping, True wenn alle Teil-Prompts erfolgreich waren)
+        """
+        if len(source_columns) <= self.CHUNK_THRESHOLD:
+            mapping = self._map_columns(source_columns, target_fields, sample_data)
+            return mapping or {}, mapping is not None
+
+        chunks = [source_columns[i:i + self.CHUNK_SIZE]
+                  for i in range(0, len(source_columns), self.CHUNK_SIZE)]
+        workers = min(len(chunks), self.MAX_PARALLEL_REQUESTS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda cols: self._map_columns(cols, target_fields, sample_data),
+                chunks
+            )
+            mapping = {}
+            complete = True
+            for chunk_mapping in results:
+                if chunk_mapping is None:
+                    complete = False
+                else:
+                    mapping.update(chunk_mapping)
+        return mapping, complete
+
+    def _map_columns(self, source_columns: List[str],
+                     target_fields: Dict[str, Dict],
+                     sample_data: List[Dict] = None) -> Optional[Dict[str, str]]:
+        """Mappt eine Gruppe von Quellspalten mit einem einzelnen Prompt (None bei Fehler)"""
+        # Stabiler Prompt-Anfang (Zielfelder + Regeln) wird gecacht und steht vorne,
+        # damit Gemini Context Caching greifen kann
+        targets = tuple(
+            (key, info.get("label", key), info.get("type", "Text"),
+             bool(info.get("required")))
+            for key, info in target_fields.items()
+        )
+        prefix = _render_mapping_prefix(targets)
 
         # Erstelle Beschreibung der Quellspalten mit Beispieldaten
         source_descriptions = []
@@ -187,67 +404,41 @@ class GeminiAPI:
 
         source_list = "\n".join(source_descriptions)
 
-        prompt = f"""Du bist ein Experte für Daten-Mapping in ERP-Systemen.
-
-AUFGABE: Ordne die Quellspalten den passenden ERPNext-Zielfeldern zu.
+        prompt = f"""{prefix}
 
 QUELLSPALTEN (aus CSV/Import-Datei):
 {source_list}
 
-ZIELFELDER (ERPNext):
-{target_list}
-
-REGELN:
-1. Jede Quellspalte kann nur EINEM Zielfeld zugeordnet werden
-2. Nicht alle Quellspalten müssen zugeordnet werden
-3. Achte auf semantische Ähnlichkeit, nicht nur auf Namen
-4. Berücksichtige die Beispieldaten für bessere Zuordnung
-5. Typische Mappings:
-   - Artikelnummer/SKU/Art-Nr -> item_code
-   - Bezeichnung/Name/Titel -> item_name
-   - EAN/GTIN/Barcode -> gtin
-   - Preis/VK/Netto -> standard_rate
-   - Kategorie/Warengruppe -> item_group
-   - Beschreibung/Text -> description
-   - Gewicht -> weight_per_unit
-   - Hersteller/Marke/Brand -> brand
-
-ANTWORT-FORMAT (NUR JSON, keine Erklärung):
-{{"quellspalte1": "zielfeld1", "quellspalte2": "zielfeld2"}}
-
-Wenn keine passende Zuordnung möglich ist, die Spalte weglassen.
-Antworte NUR mit dem JSON-Objekt, nichts anderes."""
+Antworte NUR mit dem JSON-Array, nichts anderes."""
 
-        result = self._make_request(prompt)
+        result = self._make_request(prompt, response_schema=self.MAPPING_SCHEMA)
 
         if not result:
-            return {}
+            return None
 
-        # Parse JSON aus Antwort
+        # Parse JSON aus Antwort (Structured Output, kein Markdown mehr)
         try:
-            # Bereinige Antwort (manchmal kommt Markdown)
-            result = result.strip()
-            if result.startswith("```"):
-                lines = result.split("\n")
-                result = "\n".join(lines[1:-1])
-            if result.startswith("json"):
-                result = result[4:]
-
-            mapping = json.loads(result.strip())
+            pairs = json_loads(result)
+            if not isinstance(pairs, list):
+                return None
 
-            # Validiere Mapping
+            # Validiere Mapping und wandle Paare in {quellspalte: zielfeld}
             valid_targets = set(target_fields.keys())
             validated_mapping = {}
-            for source, target in mapping.items():
+            for pair in pairs:
+                if not isinstance(pair, dict):
+                    continue
+                source, target = pair.get("source"), pair.get("target")
                 if source in source_columns and target in valid_targets:
                     validated_mapping[source] = target
 
             return validated_mapping
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json.JSONDecodeError und orjson.JSONDecodeError erben von ValueError
             logger.error(f"Gemini JSON Parse Error: {e}")
             logger.error(f"Response was: {result}")
-            return {}
+            return None
 
 
 # Logging Setup
@@ -315,6 +506,111 @@ class FieldMapping:
     transform: str = "none"
     default_value: str = ""
 
+    def __post_init__(self):
+        # Schlüssel internieren: Zeilen-Dicts und Literale wie "standard_rate_brutto"
+        # teilen dann dasselbe Objekt, Dict-Zugriffe treffen per Identitätsvergleich
+        self.source_column = sys.intern(self.source_column)
+        self.target_field = sys.intern(self.target_field)
+
+    def to_dict(self) -> dict:
+        """Direkte Attribut-Zugriffe statt asdict() (ohne rekursives Kopieren)"""
+        return {
+            "source_column": self.source_column,
+            "target_field": self.target_field,
+            "transform": self.transform,
+            "default_value": self.default_value
+        }
+
+
+# ==================== TRANSFORMATIONEN ====================
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _to_number(value: Any) -> float:
+    try:
+        return float(str(value).replace(",", ".").replace(" ", ""))
+    except ValueError:
+        return 0.0
+
+
+# Transformation je FieldMapping.transform - "none"/unbekannt lässt den Wert unverändert
+TRANSFORMS: Dict[str, Any] = {
+    "trim": lambda v: str(v).strip(),
+    "uppercase": lambda v: str(v).upper(),
+    "lowercase": lambda v: str(v).lower(),
+    "number": _to_number,
+    "bool": lambda v: str(v).lower() in ("1", "true", "ja", "yes", "y"),
+    "html_strip": lambda v: _HTML_TAG_RE.sub('', str(v)),
+}
+
+
+# ==================== JTL-NACHBEARBEITUNG ====================
+
+def _jtl_barcode(item_data: Dict) -> None:
+    """Barcode/EAN -> gtin (wird in create_item in barcodes-Tabelle konvertiert)"""
+    barcode = item_data.pop("barcode", None)
+    if barcode is None:
+        return
+    # Leere oder ungültige Barcodes filtern
+    barcode_str = str(barcode).strip()
+    if len(barcode_str) >= 8:
+        item_data["gtin"] = barcode_str
+
+
+def _jtl_disabled(item_data: Dict) -> None:
+    """Aktiv-Status invertieren (JTL: aktiv=1 -> ERPNext: disabled=0)"""
+    aktiv = item_data.get("disabled")
+    if isinstance(aktiv, str):
+        # Wenn "aktiv" gemappt wurde, invertieren
+        is_aktiv = aktiv.lower() in ("1", "true", "ja", "yes", "y", "aktiv")
+        item_data["disabled"] = 0 if is_aktiv else 1
+    elif isinstance(aktiv, bool):
+        item_data["disabled"] = 0 if aktiv else 1
+
+
+def _jtl_description_html(item_data: Dict) -> None:
+    """description_html -> description (Alias, falls keine Beschreibung gemappt ist)"""
+    html = item_data.pop("description_html", None)
+    if html is not None and "description" not in item_data:
+        item_data["description"] = html
+
+
+def build_jtl_postprocess(mapped_targets: Set[str], tax_divisor: float) -> List[Callable[[Dict], None]]:
+    """
+    Stellt die JTL-Nachbearbeitung für einen Import zusammen.
+
+    Es werden nur Schritte für tatsächlich gemappte Zielfelder aufgenommen -
+    die Zeilenschleife prüft nicht gemappte Felder gar nicht erst.
+
+    Args:
+        mapped_targets: Zielfelder des aktuellen Mappings
+        tax_divisor: 1 + Steuersatz/100 für die Brutto-Netto-Umrechnung
+
+    Returns:
+        Liste von Funktionen, die item_data in Reihenfolge verändern
+    """
+    def brutto_to_netto(item_data: Dict) -> None:
+        """VK Brutto -> standard_rate (Netto mit konfigurierbarem Steuersatz)"""
+        brutto = item_data.pop("standard_rate_brutto", None)
+        if brutto is None:
+            return
+        try:
+            # Bereits per "number"-Transformation umgewandelt: nicht erneut parsen
+            brutto_val = brutto if type(brutto) is float else float(
+                str(brutto).replace(",", ".").replace(" ", ""))
+            item_data["standard_rate"] = round(brutto_val / tax_divisor, 2)
+        except ValueError:
+            pass
+
+    steps = (
+        ("standard_rate_brutto", brutto_to_netto),
+        ("barcode", _jtl_barcode),
+        ("disabled", _jtl_disabled),
+        ("description_html", _jtl_description_html),
+    )
+    return [step for target, step in steps if target in mapped_targets]
+
 
 @dataclass
 class ImportTemplate:
@@ -333,7 +629,7 @@ class ImportTemplate:
             "name": self.name,
             "import_type": self.import_type,
             "file_format": self.file_format,
-            "mappings": [asdict(m) for m in self.mappings],
+            "mappings": [m.to_dict() for m in self.mappings],
             "csv_delimiter": self.csv_delimiter,
             "csv_encoding": self.csv_encoding,
             "skip_first_row": self.skip_first_row,
@@ -667,6 +963,288 @@ AUTO_MAPPING_RULES = {
     "oberkategorie": "parent_item_group",
 }
 
+# Normalisierte Auto-Mapping-Tabelle (einmalig beim Modul-Import gebaut)
+# Umlaute ersetzen ("Größe" == "Groesse") und _/- zu Leerzeichen - ein
+# translate()-Durchlauf statt Regex; split()/join() fasst Whitespace zusammen
+_HEADER_TABLE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "_": " ", "-": " "})
+
+
+def _normalize_header(header: str) -> str:
+    """Normalisiert einen Spaltennamen (Whitespace/_/- vereinheitlicht, klein, ohne Umlaute)"""
+    return " ".join(header.lower().translate(_HEADER_TABLE).split())
+
+
+_AUTO_MAP_NORM: Dict[str, str] = {
+    _normalize_header(key): target for key, target in AUTO_MAPPING_RULES.items()
+}
+
+if AHOCORASICK_AVAILABLE:
+    _AUTO_MAP_AUTOMATON = ahocorasick.Automaton()
+    for _key, _target in _AUTO_MAP_NORM.items():
+        _AUTO_MAP_AUTOMATON.add_word(_key, (_key, _target))
+    _AUTO_MAP_AUTOMATON.make_automaton()
+else:
+    _AUTO_MAP_AUTOMATON = None
+
+# Fallback ohne Aho-Corasick: alle Schlüssel in einer Regex-Alternation (längste
+# zuerst). Der Lookahead liefert überlappende Treffer an jeder Position in einem
+# einzigen Durchlauf der C-Regex-Engine.
+_AUTO_MAP_RE = re.compile(
+    "(?=(" + "|".join(re.escape(key) for key in sorted(_AUTO_MAP_NORM, key=len, reverse=True)) + "))"
+)
+
+
+# Spaltennamen wiederholen sich bei jedem erneuten Parsen/Auto-Mapping
+@lru_cache(maxsize=4096)
+def auto_map(header: str) -> str:
+    """
+    Ermittelt das ERPNext-Zielfeld für einen Spaltennamen.
+
+    Erst exakter Treffer auf den normalisierten Namen, danach der längste
+    Regel-Schlüssel, der im Spaltennamen enthalten ist (z.B. "SEO Titel (Meta)").
+
+    Returns:
+        Zielfeld oder "" wenn keine Regel passt
+    """
+    normalized = _normalize_header(header)
+    target = _AUTO_MAP_NORM.get(normalized)
+    if target:
+        return target
+
+    if _AUTO_MAP_AUTOMATON is not None:
+        best_key = ""
+        for _, (key, key_target) in _AUTO_MAP_AUTOMATON.iter(normalized):
+            if len(key) > len(best_key):
+                best_key, target = key, key_target
+        return target or ""
+
+    best_key = max((m.group(1) for m in _AUTO_MAP_RE.finditer(normalized)), key=len, default="")
+    return _AUTO_MAP_NORM.get(best_key, "")
+
+
+# ==================== CSV LESER ====================
+
+def _read_csv_header(file_path: str, delimiter: str, encoding: str) -> List[str]:
+    """Liest nur die Kopfzeile einer CSV-Datei"""
+    with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        return [sys.intern(h) for h in next(csv.reader(f, delimiter=delimiter), [])]
+
+
+@contextmanager
+def _mmap_csv_lines(file_path: str, encoding: str):
+    """Liefert dekodierte Zeilen direkt aus dem Page-Cache (mmap statt gepuffertem Lesen)"""
+    with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Leere Dateien lassen sich nicht mappen
+            yield iter(())
+            return
+        try:
+            yield codecs.iterdecode(iter(mm.readline, b""), encoding, errors='replace')
+        finally:
+            mm.close()
+
+
+def _open_arrow_csv(source, delimiter: str, encoding: str, columns: List[str],
+                    include_columns: Optional[List[str]] = None):
+    """Öffnet einen pyarrow Streaming-Reader, alle (bzw. `include_columns`) Spalten als Text"""
+    return pacsv.open_csv(
+        source,
+        # Spaltennamen wie csv.DictReader, damit Mappings identisch bleiben
+        read_options=pacsv.ReadOptions(encoding=encoding, column_names=columns, skip_rows=1),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in columns},
+            include_columns=include_columns,
+        ),
+    )
+
+
+def read_csv_preview(file_path: str, delimiter: str, encoding: str,
+                     preview_rows: int = 500) -> Tuple[List[str], List[Dict], int]:
+    """
+    Liest Spalten, die ersten `preview_rows` Zeilen und die Gesamtanzahl.
+
+    Mit pyarrow wird blockweise in C++ geparst, sonst per csv.DictReader.
+
+    Returns: (Spalten, Vorschau-Zeilen, Zeilenanzahl)
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            columns = _read_csv_header(file_path, delimiter, encoding)
+            preview: List[Dict] = []
+            with pa.memory_map(file_path, 'r') as source:
+                for batch in _open_arrow_csv(source, delimiter, encoding, columns):
+                    preview.extend(batch.slice(0, preview_rows - len(preview)).to_pylist())
+                    if len(preview) >= preview_rows:
+                        break
+            # Zählen mit zweitem Reader, der nur die erste Spalte konvertiert -
+            # bei breiten Katalogen ein Vielfaches schneller als alle Spalten
+            total = 0
+            if len(preview) >= preview_rows and columns:
+                with pa.memory_map(file_path, 'r') as source:
+                    for batch in _open_arrow_csv(source, delimiter, encoding, columns, columns[:1]):
+                        total += batch.num_rows
+            return columns, preview, max(total, len(preview))
+        except Exception as e:
+            logger.warning(f"pyarrow CSV-Parsing fehlgeschlagen, verwende csv-Modul: {e}")
+
+    with _mmap_csv_lines(file_path, encoding) as lines:
+        reader = csv.DictReader(lines, delimiter=delimiter)
+        columns = [sys.intern(c) for c in reader.fieldnames or []]
+        reader.fieldnames = columns
+        preview = list(islice(reader, preview_rows))
+        # Restliche Zeilen nur zählen: direkt über den inneren csv.reader, ohne
+        # Dict je Zeile (Leerzeilen überspringt DictReader ebenfalls). Zeilen-
+        # umbrüche in Werten verbieten ein reines Zählen von b"\n".
+        total = len(preview) + sum(1 for row in reader.reader if row)
+    return columns, preview, total
+
+
+def iter_csv_rows(file_path: str, delimiter: str, encoding: str):
+    """Liefert CSV-Zeilen als Dicts (Generator) - mit pyarrow blockweise"""
+    done = 0
+    if PYARROW_AVAILABLE:
+        try:
+            columns = _read_csv_header(file_path, delimiter, encoding)
+            with pa.memory_map(file_path, 'r') as source:
+                for batch in _open_arrow_csv(source, delimiter, encoding, columns):
+                    for row in batch.to_pylist():
+                        yield row
+                        done += 1
+            return
+        except Exception as e:
+            # Bereits gelieferte Zeilen werden im Fallback übersprungen
+            logger.warning(f"pyarrow CSV-Parsing fehlgeschlagen, verwende csv-Modul: {e}")
+
+    with _mmap_csv_lines(file_path, encoding) as lines:
+        reader = csv.DictReader(lines, delimiter=delimiter)
+        if reader.fieldnames:
+            reader.fieldnames = [sys.intern(c) for c in reader.fieldnames]
+        for i, row in enumerate(reader):
+            if i >= done:
+                yield row
+
+
+# Datensätze pro Schreib-Block - zwischen den Blöcken wird der Fortschritt gemeldet
+EXPORT_WRITE_CHUNK = 5000
+
+
+def _export_chunks(rows: Iterable[Dict]) -> Iterator[List[Dict]]:
+    """Teilt Liste oder Iterator (gestreamter Export) in Schreib-Blöcke"""
+    if isinstance(rows, list):
+        for start in range(0, len(rows), EXPORT_WRITE_CHUNK):
+            yield rows[start:start + EXPORT_WRITE_CHUNK]
+        return
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, EXPORT_WRITE_CHUNK))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_export_csv(rows: Iterable[Dict], file_path: str, delimiter: str, encoding: str,
+                     progress_callback=None, fieldnames: Optional[List[str]] = None) -> int:
+    """
+    Schreibt Export-Datensätze als CSV (Listen/Dicts als JSON).
+
+    Spaltenfolge: übergebene fieldnames (z.B. gewählte Exportfelder) plus
+    weitere Schlüssel des ersten Datensatzes, sonst die Reihenfolge des
+    ersten Auftretens über alle Datensätze (bei einem Iterator: über den
+    ersten Block).
+
+    Immer per csv.writer (minimale Quotierung, \r\n) - das Dateiformat hängt
+    nicht davon ab, ob pyarrow installiert ist. Geschrieben wird blockweise,
+    progress_callback(geschrieben, gesamt) folgt nach jedem Block; gesamt ist
+    None, wenn rows ein Iterator ist.
+
+    Returns:
+        Anzahl geschriebener Datensätze
+    """
+    total = len(rows) if isinstance(rows, list) else None
+    with open(file_path, 'w', encoding=encoding, newline='') as f:
+        # Datei zuerst öffnen - schlägt das fehl, ist vom Iterator noch nichts verbraucht
+        chunks = _export_chunks(rows)
+        first = next(chunks, [])
+        sample = rows if total is not None else first
+
+        if fieldnames is not None:
+            known = set(fieldnames)
+            fieldnames = list(fieldnames) + [key for key in (first[0] if first else ()) if key not in known]
+        else:
+            fieldnames = list(dict.fromkeys(key for row in sample for key in row))
+
+        # Spalten einmal klassifizieren (erster gesetzter Wert) - nur Listen/Dict-Spalten
+        # brauchen die JSON-Prüfung je Zelle; ERPNext liefert je Feld einen festen Typ
+        json_columns = {
+            name for name in fieldnames
+            if isinstance(next((row[name] for row in sample if row.get(name) is not None), None),
+                          (list, dict))
+        }
+
+        def to_json(value):
+            return json_param(value) if isinstance(value, (list, dict)) else value
+
+        written = 0
+        json_indices = [i for i, name in enumerate(fieldnames) if name in json_columns]
+
+        def value_lists(chunk: List[Dict]):
+            # Feste Spaltenfolge - kein Zwischen-Dict je Zeile wie bei DictWriter
+            for row in chunk:
+                get = row.get
+                values = [get(name, "") for name in fieldnames]
+                for i in json_indices:
+                    values[i] = to_json(values[i])
+                yield values
+
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(fieldnames)
+        for chunk in chain((first,), chunks) if first else ():
+            writer.writerows(value_lists(chunk))
+            written += len(chunk)
+            if progress_callback:
+                progress_callback(written, total)
+        return written
+
+
+def write_export_json(rows: Iterable[Dict], file_path: str, encoding: str,
+                      progress_callback=None) -> int:
+    """
+    Schreibt Export-Datensätze als eingerücktes JSON-Array.
+
+    Jeder Block wird einzeln kodiert und ohne die umschließenden Klammern
+    angehängt - die Datei ist identisch zu json_dumps(rows, pretty=True),
+    ohne den gesamten Export als einen String im Speicher zu halten.
+    rows darf ein Iterator sein (gestreamter Export).
+
+    Returns:
+        Anzahl geschriebener Datensätze
+    """
+    total = len(rows) if isinstance(rows, list) else None
+    # json_dumps liefert UTF-8 Bytes - bei UTF-8 ohne Umweg über str direkt schreiben
+    if encoding in ("utf-8", "utf-8-sig"):
+        f = open(file_path, 'wb')
+        if encoding == "utf-8-sig":
+            f.write(codecs.BOM_UTF8)
+        write = f.write
+    else:
+        f = open(file_path, 'w', encoding=encoding)
+        write = lambda data: f.write(data.decode("utf-8"))
+
+    with f:
+        written = 0
+        for chunk in _export_chunks(rows):
+            write(b",\n" if written else b"[\n")
+            # "[\n" ... "\n]" des Blocks abschneiden
+            write(json_dumps(chunk, pretty=True)[2:-2])
+            written += len(chunk)
+            if progress_callback:
+                progress_callback(written, total)
+        write(b"\n]" if written else b"[]")
+    return written
+
 
 # ==================== BMECat PARSER ====================
 
@@ -676,77 +1254,134 @@ class BMECatParser:
     def __init__(self):
         self.products = []
         self.categories = []
+        self._tag_cache: Dict[str, str] = {}
+        self._tag_article = "ARTICLE"
+        self._tag_details = "ARTICLE_DETAILS"
+        self._tag_prices = "ARTICLE_PRICE_DETAILS"
+        self._tag_price = "ARTICLE_PRICE"
+        # Fehlerhafte Artikel: (laufende Nummer, Fehlermeldung)
+        self.errors: List[Tuple[int, str]] = []
     
     def parse(self, file_path: str) -> Tuple[List[Dict], List[Dict]]:
-        """Parst BMECat XML"""
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        """Parst BMECat XML (Streaming - Speicherbedarf unabhängig von Dateigröße)"""
+        self.products = list(self.iter_products(file_path))
+        return self.products, self.categories
+    
+    def iter_products(self, file_path: str) -> Iterator[Dict]:
+        """
+        Liefert die Produkte einzeln (Generator) - ohne Produktliste im Speicher.
         
-        ns = self._detect_namespace(root)
-        self.products = []
+        Für Vorschau und Import, die nur einen Teil bzw. jeden Artikel einmal brauchen.
+        """
+        ns = self._detect_namespace(file_path)
+        self._tag_cache = {}
+        # Qualifizierte Tags einmal bauen - Vergleich per == statt endswith()
+        self._tag_article = f"{ns}ARTICLE"
+        self._tag_details = f"{ns}ARTICLE_DETAILS"
+        self._tag_prices = f"{ns}ARTICLE_PRICE_DETAILS"
+        self._tag_price = f"{ns}ARTICLE_PRICE"
         self.categories = []
+        self.errors = []
         
-        # Produkte
-        for article in root.iter():
-            if article.tag.endswith('ARTICLE'):
-                product = self._parse_article(article, ns)
-                if product:
-                    self.products.append(product)
-        
-        return self.products, self.categories
+        # Produkte - jeder ARTICLE wird nach dem Parsen sofort freigegeben
+        if LXML_AVAILABLE:
+            # Tag-Filter läuft in libxml2 - nur ARTICLE-Elemente erreichen Python
+            events = LET.iterparse(file_path, events=("end",), tag=self._tag_article,
+                                   huge_tree=True)
+        else:
+            events = ET.iterparse(file_path, events=("end",))
+        # Ein try-Block für die ganze Schleife statt einem pro Artikel: nach einem
+        # Fehler wird der Fehler protokolliert und mit dem nächsten Artikel fortgesetzt
+        articles = iter(events)
+        index = 0
+        article = None
+        while True:
+            try:
+                for _, article in articles:
+                    if article.tag == self._tag_article:
+                        index += 1
+                        product = self._parse_article(article, ns)
+                        if product:
+                            yield product
+                        self._release(article)
+                return
+            except SyntaxError:
+                # XML-Syntaxfehler (ParseError/XMLSyntaxError) - Datei ist unbrauchbar
+                raise
+            except Exception as e:
+                logger.error(f"BMECat Parse Error (Artikel {index}): {e}")
+                self.errors.append((index, str(e)))
+                if article is not None:
+                    self._release(article)
+    
+    @staticmethod
+    def _release(article):
+        """Gibt einen verarbeiteten ARTICLE frei (Streaming-Speicherbedarf)"""
+        article.clear()
+        if LXML_AVAILABLE:
+            # Bereits verarbeitete Geschwister-Elemente entfernen
+            while article.getprevious() is not None:
+                del article.getparent()[0]
+        # ElementTree kennt kein getparent(): die geleerten ARTICLE-Hüllen bleiben
+        # im Elternelement - wenige Bytes je Artikel, für große Kataloge lxml nutzen
     
-    def _detect_namespace(self, root) -> str:
-        tag = root.tag
-        if '{' in tag:
-            return tag[tag.find('{'):tag.find('}')+1]
+    def _detect_namespace(self, file_path: str) -> str:
+        """Erkennt den XML-Namespace anhand des ersten Elements"""
+        etree = LET if LXML_AVAILABLE else ET
+        with open(file_path, 'rb') as f:
+            for _, root in etree.iterparse(f, events=("start",)):
+                tag = root.tag
+                if '{' in tag:
+                    return tag[tag.find('{'):tag.find('}')+1]
+                return ''
         return ''
     
     def _get_text(self, element, path: str, ns: str, default: str = "") -> str:
         if element is None:
             return default
         
-        # Suche mit und ohne Namespace
-        for search_path in [f'{ns}{path}', path, f'.//{ns}{path}', f'.//{path}']:
-            el = element.find(search_path)
-            if el is not None and el.text:
-                return el.text.strip()
+        # Qualifizierter Tag wird nur einmal pro Dokument gebaut
+        tag = self._tag_cache.get(path)
+        if tag is None:
+            tag = self._tag_cache[path] = f'{ns}{path}'
+        
+        el = element.find(tag)
+        if el is not None and el.text:
+            return el.text.strip()
         return default
     
     def _parse_article(self, article, ns: str) -> Optional[Dict]:
-        try:
-            # Suche nach Details-Elementen
-            details = None
-            prices = None
-            
-            for child in article:
-                if child.tag.endswith('ARTICLE_DETAILS'):
-                    details = child
-                elif child.tag.endswith('ARTICLE_PRICE_DETAILS'):
-                    prices = child
-            
-            supplier_aid = self._get_text(article, 'SUPPLIER_AID', ns)
-            
-            product = {
-                "artikelnummer": supplier_aid,
-                "artikelname": self._get_text(details, 'DESCRIPTION_SHORT', ns) if details else "",
-                "beschreibung": self._get_text(details, 'DESCRIPTION_LONG', ns) if details else "",
-                "ean": self._get_text(details, 'EAN', ns) if details else "",
-                "han": self._get_text(details, 'MANUFACTURER_AID', ns) if details else "",
-                "hersteller": self._get_text(details, 'MANUFACTURER_NAME', ns) if details else "",
-            }
-            
-            # Preise
-            if prices:
-                for price_el in prices:
-                    if price_el.tag.endswith('ARTICLE_PRICE'):
-                        product["preis"] = self._get_text(price_el, 'PRICE_AMOUNT', ns)
-                        break
-            
-            return product if product.get("artikelnummer") else None
-            
-        except Exception as e:
-            logger.error(f"BMECat Parse Error: {e}")
-            return None
+        """Parst einen einzelnen Artikel (ohne eigenes Fehler-Handling, siehe parse())"""
+        # Suche nach Details-Elementen
+        details = None
+        prices = None
+        
+        for child in article:
+            if child.tag == self._tag_details:
+                details = child
+            elif child.tag == self._tag_prices:
+                prices = child
+        
+        supplier_aid = self._get_text(article, 'SUPPLIER_AID', ns)
+        
+        # _get_text liefert "" wenn details fehlt (None)
+        product = {
+            "artikelnummer": supplier_aid,
+            "artikelname": self._get_text(details, 'DESCRIPTION_SHORT', ns),
+            "beschreibung": self._get_text(details, 'DESCRIPTION_LONG', ns),
+            "ean": self._get_text(details, 'EAN', ns),
+            "han": self._get_text(details, 'MANUFACTURER_AID', ns),
+            "hersteller": self._get_text(details, 'MANUFACTURER_NAME', ns),
+        }
+        
+        # Preise
+        if prices is not None:
+            for price_el in prices:
+                if price_el.tag == self._tag_price:
+                    product["preis"] = self._get_text(price_el, 'PRICE_AMOUNT', ns)
+                    break
+        
+        return product if product.get("artikelnummer") else None
     
     def get_columns(self) -> List[str]:
         if self.products:
@@ -886,16 +1521,160 @@ def netto_to_brutto(netto: float, tax_rate: float = 19.0) -> float:
     return round(netto * tax_multiplier, 2)
 
 
+# Typentabelle einmal beim Import laden statt beim ersten Upload
+mimetypes.init()
+
+
+@lru_cache(maxsize=64)
+def _guess_mime(ext: str) -> str:
+    """MIME-Typ je Dateiendung - Bildkataloge nutzen nur eine Handvoll Endungen"""
+    return mimetypes.guess_type("f" + ext)[0] or 'application/octet-stream'
+
+
+class LRUCache:
+    """Begrenzter, thread-sicherer Speicher-Cache - verdrängt die am längsten ungenutzten Einträge"""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def __setitem__(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, items: List[Tuple[str, str]]):
+        for key, value in items:
+            self[key] = value
+
+    def pop(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PersistentCache:
+    """
+    Persistenter Lookup-Cache (SQLite, WAL-Modus) für ERPNext-Namen.
+
+    Speichert Item-Namen pro ERPNext-Instanz, damit wiederholte Einzelabfragen
+    (get_item) ohne HTTP-Request beantwortet werden können. Item Groups bleiben
+    im Speicher-Cache - sie werden je Import ohnehin vollständig geladen.
+    Einträge verfallen nach `ttl` Sekunden.
+    """
+
+    DEFAULT_PATH = Path.home() / ".erpnext_importer_cache.db"
+    DEFAULT_TTL = 24 * 3600
+
+    def __init__(self, base_url: str, path: Optional[Path] = None, ttl: float = DEFAULT_TTL):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(str(path or self.DEFAULT_PATH), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "base_url TEXT, doctype TEXT, key TEXT, value TEXT, ts REAL, "
+                "PRIMARY KEY (base_url, doctype, key))"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Cache ist optional - ohne Datenbank wird nur im Speicher gecacht
+            logger.warning(f"Persistenter Cache nicht verfügbar: {e}")
+            self._conn = None
+
+    def get(self, doctype: str, key: str) -> Optional[str]:
+        """Gibt gecachten Wert zurück oder None (fehlt/abgelaufen)"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE base_url=? AND doctype=? AND key=? AND ts>=?",
+                (self.base_url, doctype, key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, doctype: str, key: str, value: str):
+        """Speichert einen einzelnen Wert"""
+        self.put_many(doctype, [(key, value)])
+
+    def put_many(self, doctype: str, items: List[Tuple[str, str]]):
+        """Speichert mehrere Werte in einer Transaktion"""
+        if self._conn is None or not items:
+            return
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (base_url, doctype, key, value, ts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(self.base_url, doctype, k, v, now) for k, v in items]
+                )
+
+    def delete(self, doctype: str, key: str):
+        """Entfernt einen Eintrag"""
+        if self._conn is None:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE base_url=? AND doctype=? AND key=?",
+                    (self.base_url, doctype, key)
+                )
+
+
+# Trennzeichen in Kategoriepfaden nach Priorität - es gilt nur das erste vorkommende,
+# damit Namen wie "Haus/Garten > Grill" oder "Audio | Hi-Fi > Boxen" nicht zerfallen
+_CATEGORY_SEPARATORS = (" > ", " -> ", " >> ", " / ", "/", ">", "|")
+
+# Standard-Feldlisten der Exporte - einmalig serialisiert
+_EXPORT_ITEM_GROUP_FIELDS_JSON = json_param(["name", "item_group_name", "parent_item_group",
+                                             "is_group", "description"])
+_EXPORT_ITEM_PRICE_FIELDS_JSON = json_param(["name", "item_code", "item_name", "price_list",
+                                             "price_list_rate", "currency", "valid_from", "valid_upto"])
+_EXPORT_STOCK_FIELDS_JSON = json_param(["name", "item_code", "warehouse", "actual_qty",
+                                        "reserved_qty", "projected_qty", "valuation_rate"])
+_EXPORT_ATTRIBUTE_FIELDS_JSON = json_param(["name", "attribute_name", "numeric_values",
+                                            "from_range", "to_range", "increment"])
+
+
 class ERPNextAPI:
     """ERPNext REST API Client - Vollständige Implementation mit verbesserter Fehlerbehandlung"""
+
+    POOL_CONNECTIONS = 50
+    POOL_MAXSIZE = 100
+    # Parallele Einzel-Requests (Export, Löschen) - bleibt unter POOL_MAXSIZE
+    PARALLEL_WORKERS = 16
     
     def __init__(self, config: ERPNextConfig):
         self.config = config
         self.session = self._create_session() if REQUESTS_AVAILABLE else None
-        self._item_cache: Dict[str, str] = {}
-        self._item_group_cache: Dict[str, str] = {}
+        self._item_cache = LRUCache()
+        # Negativ-Cache: in dieser Sitzung per 404 als nicht vorhanden erkannte Artikel
+        self._missing_items: Set[str] = set()
+        # Variantenvorlagen (has_variants, item_name) - eine Abfrage pro Vorlage
+        self._template_cache: Dict[str, Dict] = {}
+        self._item_group_cache = LRUCache()
         self._attribute_cache: Dict[str, bool] = {}
         self._uom_cache: Dict[str, str] = {}
+        self._persistent_cache = PersistentCache(config.base_url)
+        self._http2_client = None
+        self._http2_lock = threading.Lock()
         self._connection_healthy = False
         self._last_health_check = 0
     
@@ -907,25 +1686,46 @@ class ERPNextAPI:
             total=self.config.max_retries,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "POST"]
+            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "POST"],
+            respect_retry_after_header=True,
+            # Nach dem letzten Versuch die Antwort zurückgeben, damit
+            # _parse_error_response die Server-Meldung auswerten kann
+            raise_on_status=False
+        )
+        # Großer Pool, damit parallele Import-Threads nicht auf Verbindungen warten
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=retry_strategy
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         session.headers.update(self.config.auth_header)
+        session.headers["Connection"] = "keep-alive"
+        # Frappe liefert Listen-Antworten komprimiert, wenn der Client es anbietet
+        session.headers["Accept-Encoding"] = "gzip, deflate"
         return session
+
+    def close(self):
+        """Schließt die Keep-Alive-Verbindungen der Session (und des HTTP/2-Clients)"""
+        if self.session is not None:
+            self.session.close()
+        with self._http2_lock:
+            if self._http2_client is not None:
+                self._http2_client.close()
+                self._http2_client = None
     
     def _parse_error_response(self, response) -> str:
         """Extrahiert benutzerfreundliche Fehlermeldung aus API-Antwort"""
         try:
-            error_data = response.json()
+            error_data = json_loads(response.content)
             # ERPNext gibt Fehler in verschiedenen Formaten zurück
             if "message" in error_data:
                 return error_data["message"]
             if "_server_messages" in error_data:
-                messages = json.loads(error_data["_server_messages"])
+                messages = json_loads(error_data["_server_messages"])
                 if messages:
-                    msg = json.loads(messages[0])
+                    msg = json_loads(messages[0])
                     return msg.get("message", str(messages[0]))
             if "exc_type" in error_data:
                 exc_type = error_data["exc_type"]
@@ -938,10 +1738,32 @@ class ERPNextAPI:
                 return f"ERPNext Fehler: {exc_type}"
         except:
             pass
-        return f"HTTP {response.status_code}: {response.reason}"
+        # requests: reason, httpx: reason_phrase
+        reason = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+        return f"HTTP {response.status_code}: {reason}"
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-        """Führt API-Request aus mit verbesserter Fehlerbehandlung"""
+    def _get_http2_client(self):
+        """HTTP/2-Client (httpx) für parallele GETs - gemultiplext über wenige Verbindungen"""
+        if not HTTPX_AVAILABLE:
+            return None
+        with self._http2_lock:
+            if self._http2_client is None:
+                self._http2_client = httpx.Client(
+                    http2=True,
+                    headers=self.config.auth_header,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+                    timeout=self.config.request_timeout
+                )
+            return self._http2_client
+    
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      http2: bool = False) -> Dict:
+        """
+        Führt API-Request aus mit verbesserter Fehlerbehandlung.
+        
+        http2=True leitet GETs über den httpx-Client (falls installiert) - für
+        viele parallele Lese-Requests; Schreibzugriffe bleiben auf der Session.
+        """
         if not self.session:
             raise ERPNextAPIError(
                 "HTTP-Bibliothek nicht verfügbar",
@@ -952,12 +1774,15 @@ class ERPNextAPI:
         timeout = self.config.request_timeout
         
         try:
-            if method == "GET":
+            client = self._get_http2_client() if http2 and method == "GET" else None
+            if client is not None:
+                response = client.get(url, params=data)
+            elif method == "GET":
                 response = self.session.get(url, params=data, timeout=timeout)
             elif method == "POST":
-                response = self.session.post(url, json=data, timeout=timeout)
+                response = self.session.post(url, data=json_dumps(data or {}), timeout=timeout)
             elif method == "PUT":
-                response = self.session.put(url, json=data, timeout=timeout)
+                response = self.session.put(url, data=json_dumps(data or {}), timeout=timeout)
             elif method == "DELETE":
                 response = self.session.delete(url, timeout=timeout)
             else:
@@ -984,7 +1809,7 @@ class ERPNextAPI:
                     suggestion=suggestion
                 )
             
-            return response.json() if response.text else {}
+            return json_loads(response.content) if response.content else {}
             
         except requests.exceptions.Timeout:
             raise ERPNextAPIError(
@@ -1004,33 +1829,65 @@ class ERPNextAPI:
             raise ERPNextAPIError(f"Unerwarteter Fehler: {str(e)}", original_error=e)
     
     def _call_method(self, method_name: str, data: Optional[Dict] = None,
-                     files: Optional[Dict] = None) -> Dict:
-        """Ruft Frappe-Methode auf mit verbesserter Fehlerbehandlung"""
+                     files: Optional[Dict] = None, stream: bool = False) -> Dict:
+        """
+        Ruft Frappe-Methode auf mit verbesserter Fehlerbehandlung.
+        
+        Mit stream=True (und requests-toolbelt) wird der Multipart-Body beim
+        Senden blockweise aus den Dateien gelesen statt vorher im Speicher gebaut.
+        """
         if not self.session:
             raise ERPNextAPIError("HTTP-Bibliothek nicht verfügbar")
         
         url = f"{self.config.base_url}/api/method/{method_name}"
         
         try:
-            if files:
+            if files and stream and TOOLBELT_AVAILABLE:
+                fields = {k: str(v) for k, v in (data or {}).items()}
+                fields.update(files)
+                encoder = MultipartEncoder(fields=fields)
+                headers = {"Authorization": self.config.auth_header["Authorization"],
+                           "Content-Type": encoder.content_type}
+                response = self.session.post(url, data=encoder,
+                                            headers=headers, timeout=60)
+            elif files:
                 headers = {"Authorization": self.config.auth_header["Authorization"]}
                 response = self.session.post(url, data=data, files=files, 
                                             headers=headers, timeout=60)
             else:
-                response = self.session.post(url, json=data, 
+                body = json_dumps(data) if data is not None else None
+                response = self.session.post(url, data=body,
                                             timeout=self.config.request_timeout)
             
             if response.status_code >= 400:
                 error_msg = self._parse_error_response(response)
                 raise ERPNextAPIError(error_msg, error_code=str(response.status_code))
             
-            return response.json() if response.text else {}
+            return json_loads(response.content) if response.content else {}
         except ERPNextAPIError:
             raise
         except Exception as e:
             logger.error(f"Method Error {method_name}: {e}")
             raise ERPNextAPIError(f"Methodenaufruf fehlgeschlagen: {str(e)}", original_error=e)
     
+    def _map_parallel(self, func, args: List, callback=None) -> List:
+        """
+        Führt func(arg) für alle args parallel über den Session-Pool aus.
+        
+        func muss eigene Fehler abfangen. Ergebnisse in Eingabereihenfolge,
+        callback(erledigt, gesamt) wird im aufrufenden Thread je Ergebnis aufgerufen.
+        """
+        results = [None] * len(args)
+        if not args:
+            return results
+        with ThreadPoolExecutor(max_workers=min(len(args), self.PARALLEL_WORKERS)) as executor:
+            futures = {executor.submit(func, arg): idx for idx, arg in enumerate(args)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if callback:
+                    callback(done, len(args))
+        return results
+    
     def test_connection(self) -> Tuple[bool, str]:
         """Testet API-Verbindung mit detaillierten Fehlermeldungen"""
         if not REQUESTS_AVAILABLE:
@@ -1046,7 +1903,7 @@ class ERPNextAPI:
             response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 user = data.get('message', 'OK')
                 self._connection_healthy = True
                 self._last_health_check = time.time()
@@ -1109,7 +1966,7 @@ class ERPNextAPI:
         try:
             params = {
                 "fields": '["fieldname", "label", "fieldtype", "options", "reqd", "description", "default"]',
-                "filters": json.dumps([["dt", "=", doctype]]),
+                "filters": json_param([["dt", "=", doctype]]),
                 "limit_page_length": 0
             }
             result = self._make_request("GET", "Custom Field", params)
@@ -1181,12 +2038,12 @@ class ERPNextAPI:
             url = f"{self.config.base_url}/api/method/frappe.client.get_meta"
             response = self.session.post(
                 url, 
-                json={"doctype": doctype},
+                data=json_dumps({"doctype": doctype}),
                 timeout=self.config.request_timeout
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 return data.get("message", {})
             return {}
             
@@ -1243,49 +2100,126 @@ class ERPNextAPI:
     
     def get_item(self, item_code: str) -> Optional[Dict]:
         """Holt Item nach Code"""
-        if item_code in self._item_cache:
-            return {"name": self._item_cache[item_code]}
+        cached = self._item_cache.get(item_code)
+        if cached:
+            return {"name": cached}
+        if item_code in self._missing_items:
+            return None
+        cached = self._persistent_cache.get("Item", item_code)
+        if cached:
+            self._item_cache[item_code] = cached
+            return {"name": cached}
         try:
             result = self._make_request("GET", f"Item/{item_code}")
             if result.get("data"):
                 self._item_cache[item_code] = result["data"]["name"]
+                self._persistent_cache.put("Item", item_code, result["data"]["name"])
             return result.get("data")
+        except ERPNextAPIError as e:
+            if e.error_code == "404":
+                self._missing_items.add(item_code)
+            return None
         except:
             return None
     
+    EXISTS_CHUNK_SIZE = 500  # Artikelnummern pro name-in-Filter (POST-Body, keine URL-Grenze)
+    
+    def which_items_exist(self, codes: List[str]) -> Set[str]:
+        """
+        Prüft viele Artikelnummern mit wenigen Abfragen (name in [...]).
+        
+        Füllt _item_cache bzw. _missing_items, sodass get_item für diese
+        Codes ohne weiteren Request antwortet. Einträge des persistenten Caches
+        werden mitgeprüft - in ERPNext gelöschte Artikel fallen dabei heraus.
+        
+        Returns:
+            Set der existierenden Artikelnummern
+        """
+        existing: Set[str] = set()
+        unknown = []
+        for code in dict.fromkeys(codes):
+            if self._item_cache.get(code):
+                existing.add(code)
+            elif code not in self._missing_items:
+                unknown.append(code)
+        
+        for start in range(0, len(unknown), self.EXISTS_CHUNK_SIZE):
+            chunk = unknown[start:start + self.EXISTS_CHUNK_SIZE]
+            try:
+                # Filter im POST-Body - 500 Codes im Query-String überschreiten
+                # die Request-Line-Grenzen von gunicorn/nginx
+                result = self._call_method("frappe.client.get_list", data={
+                    "doctype": "Item",
+                    "fields": ["name"],
+                    "filters": [["name", "in", chunk]],
+                    "limit_page_length": 0
+                })
+            except ERPNextAPIError as e:
+                # Unbekannt lassen - get_item fragt dann einzeln
+                logger.warning(f"Existenzprüfung für {len(chunk)} Artikel fehlgeschlagen: {e}")
+                continue
+            
+            # Datenbank vergleicht ohne Groß-/Kleinschreibung - wie GET Item/<code>
+            names = {item["name"].lower(): item["name"] for item in result.get("message") or []}
+            fetched = []
+            for code in chunk:
+                name = names.get(code.lower())
+                if name:
+                    fetched.append((code, name))
+                    existing.add(code)
+                else:
+                    # Veraltete Einträge früherer Importe verwerfen
+                    self.forget_item(code)
+            self._item_cache.update(fetched)
+            self._persistent_cache.put_many("Item", fetched)
+        return existing
+    
+    def _prepare_item_doc(self, data: Dict):
+        """Ergänzt Pflichtfelder und Barcodes für einen neuen Artikel (in-place)"""
+        # Pflichtfelder sicherstellen
+        if "item_name" not in data:
+            data["item_name"] = data["item_code"]
+        if "item_group" not in data:
+            data["item_group"] = self.config.default_item_group
+        if "stock_uom" not in data:
+            data["stock_uom"] = "Stk"
+        
+        data["doctype"] = "Item"
+        data["is_sales_item"] = 1
+        data["is_purchase_item"] = 1
+        
+        # GTIN als Barcode
+        if "gtin" in data and data["gtin"]:
+            gtin = data.pop("gtin")
+            if gtin and gtin != "4017980000000":
+                data["barcodes"] = [{
+                    "barcode": gtin,
+                    "barcode_type": "EAN" if len(str(gtin)) == 13 else "UPC-A"
+                }]
+    
     def create_item(self, data: Dict) -> Tuple[bool, str]:
         """Erstellt neuen Artikel"""
         try:
-            # Pflichtfelder sicherstellen
             if "item_code" not in data:
                 return False, "item_code fehlt"
-            if "item_name" not in data:
-                data["item_name"] = data["item_code"]
-            if "item_group" not in data:
-                data["item_group"] = self.config.default_item_group
-            if "stock_uom" not in data:
-                data["stock_uom"] = "Stk"
-            
-            data["doctype"] = "Item"
-            data["is_sales_item"] = 1
-            data["is_purchase_item"] = 1
-            
-            # GTIN als Barcode
-            if "gtin" in data and data["gtin"]:
-                gtin = data.pop("gtin")
-                if gtin and gtin != "4017980000000":
-                    data["barcodes"] = [{
-                        "barcode": gtin,
-                        "barcode_type": "EAN" if len(str(gtin)) == 13 else "UPC-A"
-                    }]
+            self._prepare_item_doc(data)
             
             result = self._make_request("POST", "Item", data)
             name = result.get("data", {}).get("name", data["item_code"])
             self._item_cache[data["item_code"]] = name
+            self._missing_items.discard(data["item_code"])
+            self._persistent_cache.put("Item", data["item_code"], name)
             return True, f"Erstellt: {name}"
         except Exception as e:
             return False, str(e)
     
+    def forget_item(self, item_code: str):
+        """Verwirft alle Cache-Einträge eines Artikels und merkt ihn als nicht vorhanden"""
+        self._item_cache.pop(item_code, None)
+        self._persistent_cache.delete("Item", item_code)
+        self._missing_items.add(item_code)
+        self._template_cache.pop(item_code, None)
+    
     def update_item(self, item_code: str, data: Dict) -> Tuple[bool, str]:
         """Aktualisiert Artikel"""
         try:
@@ -1295,7 +2229,13 @@ class ERPNextAPI:
             data.pop("gtin", None)  # Barcodes separat
             
             self._make_request("PUT", f"Item/{item_code}", data)
+            self._template_cache.pop(item_code, None)
             return True, f"Aktualisiert: {item_code}"
+        except ERPNextAPIError as e:
+            if e.error_code == "404":
+                # Gecachter Artikel existiert nicht mehr (z.B. in ERPNext gelöscht)
+                self.forget_item(item_code)
+            return False, str(e)
         except Exception as e:
             return False, str(e)
     
@@ -1303,17 +2243,174 @@ class ERPNextAPI:
         """Löscht Artikel"""
         try:
             self._make_request("DELETE", f"Item/{item_code}")
-            self._item_cache.pop(item_code, None)
+            self.forget_item(item_code)
             return True, f"Gelöscht: {item_code}"
         except Exception as e:
             return False, str(e)
     
+    # ==================== BULK METHODS ====================
+    
+    BULK_CHUNK_SIZE = 100  # Frappe erlaubt max. 200 Dokumente pro insert_many
+    BULK_WORKERS = 4
+    
+    def bulk_insert(self, doctype: str, docs: List[Dict]) -> List[str]:
+        """
+        Legt mehrere Dokumente mit einem Request an (frappe.client.insert_many).
+        
+        Frappe fügt alle Dokumente eines Aufrufs in einer Transaktion ein -
+        schlägt eines fehl, wird der ganze Aufruf verworfen (ERPNextAPIError).
+        
+        Returns:
+            Liste der erstellten Namen (ungeordnet - nicht den docs zuordnen)
+        """
+        if not docs:
+            return []
+        payload = [dict(doc, doctype=doctype) for doc in docs]
+        result = self._call_method(
+            "frappe.client.insert_many",
+            data={"docs": json_dumps(payload).decode("utf-8")}
+        )
+        return result.get("message") or []
+    
+    def create_items_bulk(self, items: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Erstellt viele Artikel in Blöcken von BULK_CHUNK_SIZE (parallel).
+        
+        Schlägt ein Block fehl, werden dessen Artikel einzeln per create_item
+        angelegt, damit gültige Artikel nicht am Fehler eines anderen scheitern.
+        
+        Returns:
+            Ergebnis je Artikel in Eingabereihenfolge (wie create_item)
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(items)
+        indices = []
+        for idx, item in enumerate(items):
+            if "item_code" not in item:
+                results[idx] = (False, "item_code fehlt")
+                continue
+            self._prepare_item_doc(item)
+            indices.append(idx)
+        
+        def cache_names(docs: List[Dict]):
+            # Artikelname = Artikelnummer; die von insert_many gelieferten Namen
+            # sind ungeordnet (Frappe sammelt sie in einem set) und taugen nicht zur Zuordnung
+            cache_items = [(doc["item_code"], doc["item_code"]) for doc in docs]
+            self._item_cache.update(cache_items)
+            self._missing_items.difference_update(doc["item_code"] for doc in docs)
+            self._persistent_cache.put_many("Item", cache_items)
+        
+        created = self._bulk_create("Item", [items[idx] for idx in indices],
+                                    self.create_item, name_field="item_code",
+                                    on_created=cache_names)
+        for idx, result in zip(indices, created):
+            results[idx] = result
+        return results
+    
+    def update_items_bulk(self, updates: List[Tuple[str, Dict]]) -> List[Tuple[bool, str]]:
+        """
+        Aktualisiert viele Artikel in Blöcken von BULK_CHUNK_SIZE (frappe.client.bulk_update).
+        
+        Frappe speichert jedes Dokument einzeln und meldet fehlgeschlagene zurück.
+        Schlägt der ganze Aufruf fehl, wird der Block einzeln per update_item aktualisiert.
+        
+        Args:
+            updates: Liste von (item_code, Daten)
+        
+        Returns:
+            Ergebnis je Artikel in Eingabereihenfolge (wie update_item)
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(updates)
+        docs = []
+        for item_code, data in updates:
+            # Nicht-aktualisierbare Felder weglassen (wie update_item), Eingabe bleibt unverändert
+            doc = {k: v for k, v in data.items() if k not in ("item_code", "gtin", "doctype")}
+            docs.append(dict(doc, doctype="Item", docname=item_code))
+        
+        def update_chunk(start: int):
+            chunk = docs[start:start + self.BULK_CHUNK_SIZE]
+            try:
+                result = self._call_method(
+                    "frappe.client.bulk_update",
+                    data={"docs": json_dumps(chunk).decode("utf-8")}
+                )
+            except Exception as e:
+                logger.warning(f"bulk_update Item fehlgeschlagen ({e}) - "
+                               f"aktualisiere {len(chunk)} Artikel einzeln")
+                for pos in range(start, start + len(chunk)):
+                    item_code, data = updates[pos]
+                    results[pos] = self.update_item(item_code, dict(data))
+                return
+            failed = {}
+            for entry in (result.get("message") or {}).get("failed_docs", []):
+                doc = entry.get("doc") or {}
+                # Letzte Zeile des Tracebacks als Fehlermeldung
+                exc = (entry.get("exc") or "").strip()
+                failed[doc.get("docname")] = exc.splitlines()[-1] if exc else "Aktualisierung fehlgeschlagen"
+            for pos, doc in enumerate(chunk, start):
+                docname = doc["docname"]
+                self._template_cache.pop(docname, None)
+                if docname in failed:
+                    if "DoesNotExistError" in failed[docname]:
+                        self.forget_item(docname)
+                    results[pos] = (False, failed[docname])
+                else:
+                    results[pos] = (True, f"Aktualisiert: {docname}")
+        
+        starts = list(range(0, len(docs), self.BULK_CHUNK_SIZE))
+        if len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(starts), self.BULK_WORKERS)) as executor:
+                list(executor.map(update_chunk, starts))
+        else:
+            for start in starts:
+                update_chunk(start)
+        return results
+    
+    def _bulk_create(self, doctype: str, docs: List[Dict], fallback,
+                     name_field: Optional[str] = None,
+                     on_created=None) -> List[Tuple[bool, str]]:
+        """
+        Legt docs in Blöcken von BULK_CHUNK_SIZE per insert_many an (parallel).
+        
+        Schlägt ein Block fehl, wird fallback(doc) je Dokument aufgerufen.
+        on_created(block_docs) wird nach jedem erfolgreichen Block aufgerufen.
+        Die Erfolgsmeldung nennt doc[name_field] - insert_many liefert die Namen
+        ohne feste Reihenfolge zurück.
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(docs)
+        chunks = [list(range(start, min(start + self.BULK_CHUNK_SIZE, len(docs))))
+                  for start in range(0, len(docs), self.BULK_CHUNK_SIZE)]
+        
+        def insert_chunk(indices: List[int]):
+            chunk_docs = [docs[idx] for idx in indices]
+            try:
+                self.bulk_insert(doctype, chunk_docs)
+            except Exception as e:
+                logger.warning(f"insert_many {doctype} fehlgeschlagen ({e}) - "
+                               f"lege {len(chunk_docs)} Dokumente einzeln an")
+                for idx in indices:
+                    results[idx] = fallback(docs[idx])
+                return
+            if on_created:
+                on_created(chunk_docs)
+            for idx in indices:
+                name = docs[idx].get(name_field, "") if name_field else ""
+                results[idx] = (True, f"Erstellt: {name}" if name else "Erstellt")
+        
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), self.BULK_WORKERS)) as executor:
+                list(executor.map(insert_chunk, chunks))
+        else:
+            for indices in chunks:
+                insert_chunk(indices)
+        return results
+    
     # ==================== ITEM GROUP METHODS ====================
     
     def get_item_group(self, name: str) -> Optional[Dict]:
         """Holt Item Group"""
-        if name in self._item_group_cache:
-            return {"name": self._item_group_cache[name]}
+        cached = self._item_group_cache.get(name)
+        if cached:
+            return {"name": cached}
         try:
             result = self._make_request("GET", f"Item Group/{name}")
             if result.get("data"):
@@ -1322,13 +2419,67 @@ class ERPNextAPI:
         except:
             return None
     
-    def create_item_group(self, data: Dict) -> Tuple[bool, str]:
-        """Erstellt Kategorie"""
+    def get_item_groups_bulk(self, names: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Prüft mehrere Item Groups mit einer einzigen Abfrage (name in [...]).
+        
+        Der Server vergleicht ohne Groß-/Kleinschreibung (wie GET Item Group/<name>),
+        daher werden die Treffer über .lower() zugeordnet.
+        
+        Returns:
+            Dict name -> Item-Group-Name für alle existierenden Gruppen,
+            None wenn die Abfrage fehlschlug
+        """
+        found: Dict[str, str] = {}
+        missing = []
+        for name in names:
+            cached = self._item_group_cache.get(name)
+            if cached:
+                found[name] = cached
+            elif name not in missing:
+                missing.append(name)
+        if not missing:
+            return found
+        
+        try:
+            params = {
+                "fields": '["name"]',
+                "filters": json_param([["name", "in", missing]]),
+                "limit_page_length": 0
+            }
+            result = self._make_request("GET", "Item Group", params)
+        except:
+            return None
+        
+        names_lower = {g["name"].lower(): g["name"] for g in result.get("data", [])}
+        for name in missing:
+            group_name = names_lower.get(name.lower())
+            if group_name:
+                self._item_group_cache[name] = group_name
+                found[name] = group_name
+        return found
+    
+    def warm_item_group_cache(self) -> int:
+        """Lädt alle Item Groups einmalig in den Cache (vor dem Import)"""
+        try:
+            params = {
+                "fields": '["name"]',
+                "limit_page_length": 0
+            }
+            result = self._make_request("GET", "Item Group", params)
+        except:
+            return 0
+        fetched = [(g["name"], g["name"]) for g in result.get("data", [])]
+        self._item_group_cache.update(fetched)
+        return len(fetched)
+    
+    def create_item_group(self, data: Dict, check_exists: bool = True) -> Tuple[bool, str]:
+        """Erstellt Kategorie (check_exists=False wenn Existenz bereits geprüft)"""
         try:
             name = data.get("item_group_name", "")
 
             # Prüfen ob existiert
-            if self.get_item_group(name):
+            if check_exists and self.get_item_group(name):
                 return True, f"Existiert bereits: {name}"
 
             data["doctype"] = "Item Group"
@@ -1366,23 +2517,31 @@ class ERPNextAPI:
         parent = self.config.default_item_group
         last_category = parent
 
+        # Alle Ebenen mit einer Abfrage prüfen statt einer pro Ebene
+        existing_groups = self.get_item_groups_bulk(levels)
+        # Abfrage fehlgeschlagen: Existenz beim Anlegen je Ebene prüfen
+        verified = existing_groups is not None
+        if not verified:
+            existing_groups = {}
+
         for level_name in levels:
             # Prüfen ob Kategorie existiert
-            existing = self.get_item_group(level_name)
+            existing = existing_groups.get(level_name)
 
             if existing:
                 # Kategorie existiert bereits
-                last_category = level_name
-                parent = level_name
+                # Schreibweise aus ERPNext übernehmen ("elektronik" -> "Elektronik")
+                last_category = existing
+                parent = existing
                 if log_callback:
-                    log_callback(f"Kategorie existiert: {level_name}")
+                    log_callback(f"Kategorie existiert: {existing}")
             else:
                 # Kategorie erstellen mit parent_item_group
                 data = {
                     "item_group_name": level_name,
                     "parent_item_group": parent
                 }
-                success, msg = self.create_item_group(data)
+                success, msg = self.create_item_group(data, check_exists=not verified)
                 if success:
                     last_category = level_name
                     parent = level_name
@@ -1410,8 +2569,8 @@ class ERPNextAPI:
         if not path:
             return []
 
-        # Verschiedene Trennzeichen unterstützen
-        for sep in [" > ", " -> ", " >> ", " / ", "/", ">", "|"]:
+        # Nur am höchstpriorisierten vorhandenen Trennzeichen teilen
+        for sep in _CATEGORY_SEPARATORS:
             if sep in path:
                 return [p.strip() for p in path.split(sep) if p.strip()]
 
@@ -1420,14 +2579,14 @@ class ERPNextAPI:
     
     # ==================== FILE UPLOAD ====================
     
+    # Ab dieser Dateigröße wird der Upload gestreamt (requests-toolbelt)
+    STREAM_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+    
     def upload_file(self, file_path: str, doctype: str = None,
                     docname: str = None, is_private: bool = False) -> Optional[str]:
         """Lädt Datei hoch"""
-        if not os.path.exists(file_path):
-            return None
-        
         filename = os.path.basename(file_path)
-        mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        mime_type = _guess_mime(os.path.splitext(filename)[1].lower())
         
         data = {
             "is_private": 1 if is_private else 0,
@@ -1440,16 +2599,22 @@ class ERPNextAPI:
             data["attached_to_doctype"] = doctype
             data["attached_to_name"] = docname
         
+        # Fehlende Datei ohne vorherigen exists()-Aufruf erkennen
         try:
-            with open(file_path, 'rb') as f:
-                files = {'file': (filename, f, mime_type)}
-                result = self._call_method("upload_file", data=data, files=files)
-            
-            file_url = result.get("message", {}).get("file_url", "")
-            return file_url
-        except Exception as e:
-            logger.error(f"Upload Error: {e}")
+            f = open(file_path, 'rb')
+        except OSError:
             return None
+        
+        with f:
+            try:
+                files = {'file': (filename, f, mime_type)}
+                # Große Dateien streamen - kleine im Speicher, damit Retries den Body neu senden können
+                stream = os.fstat(f.fileno()).st_size > self.STREAM_UPLOAD_THRESHOLD
+                result = self._call_method("upload_file", data=data, files=files, stream=stream)
+                return result.get("message", {}).get("file_url", "")
+            except Exception as e:
+                logger.error(f"Upload Error: {e}")
+                return None
     
     def set_item_image(self, item_code: str, image_path: str) -> Tuple[bool, str]:
         """Setzt Hauptbild für Item"""
@@ -1470,38 +2635,72 @@ class ERPNextAPI:
             return True, f"Angehängt: {file_url}"
         return False, "Upload fehlgeschlagen"
     
+    # frappe.desk.reportview.delete_items löscht bis zu so vielen Einträgen synchron,
+    # darüber nur als Hintergrund-Job (ohne Rückmeldung über das Ergebnis)
+    SYNC_BULK_DELETE_LIMIT = 10
+    
+    def _item_attachment_names(self, item_code: str) -> List[str]:
+        """Namen aller File-Dokumente, die an einem Item hängen"""
+        params = {
+            "fields": '["name"]',
+            "filters": json_param([
+                ["attached_to_doctype", "=", "Item"],
+                ["attached_to_name", "=", item_code]
+            ]),
+            "limit_page_length": 0
+        }
+        result = self._make_request("GET", "File", params)
+        return [f["name"] for f in result.get("data", [])]
+    
     def delete_item_attachments(self, item_code: str) -> Tuple[bool, str]:
         """Löscht alle Anhänge eines Items"""
         try:
             # Hole alle Attachments
-            url = f"{self.config.base_url}/api/resource/File"
-            params = {
-                "filters": json.dumps([
-                    ["attached_to_doctype", "=", "Item"],
-                    ["attached_to_name", "=", item_code]
-                ]),
-                "limit_page_length": 0
-            }
-            response = self.session.get(url, params=params, timeout=30)
-            files = response.json().get("data", [])
+            names = self._item_attachment_names(item_code)
             
-            deleted = 0
-            for f in files:
+            def delete_file(name: str) -> bool:
                 try:
-                    self._make_request("DELETE", f"File/{f['name']}")
-                    deleted += 1
+                    self._make_request("DELETE", f"File/{name}")
+                    return True
                 except:
-                    pass
+                    return False
+            
+            deleted = 0
+            if 0 < len(names) <= self.SYNC_BULK_DELETE_LIMIT:
+                # Wenige Dateien mit einem Aufruf löschen - delete_bulk verschluckt
+                # Fehler je Datei, daher das Ergebnis per Abfrage bestätigen
+                try:
+                    self._call_method("frappe.desk.reportview.delete_items", data={
+                        "doctype": "File",
+                        "items": json_param(names)
+                    })
+                    remaining = set(self._item_attachment_names(item_code))
+                    deleted = sum(1 for name in names if name not in remaining)
+                except ERPNextAPIError as e:
+                    logger.warning(f"Bulk-Delete nicht möglich ({e}) - lösche Anhänge einzeln")
+                    deleted = sum(self._map_parallel(delete_file, names))
+            elif names:
+                # Mehr Dateien: einzeln (parallel) und synchron statt als Hintergrund-Job
+                deleted = sum(self._map_parallel(delete_file, names))
             
             # Bild-Feld leeren
             self._make_request("PUT", f"Item/{item_code}", {"image": ""})
             
+            if deleted < len(names):
+                return False, f"{deleted} von {len(names)} Anhängen gelöscht"
             return True, f"{deleted} Anhänge gelöscht"
         except Exception as e:
             return False, str(e)
     
     # ==================== ITEM ATTRIBUTES (Varianten) ====================
     
+    @staticmethod
+    def _attribute_value_rows(values: List[str]) -> List[Dict]:
+        """Baut Attributwert-Zeilen; Kürzel = erste drei Zeichen in Großbuchstaben"""
+        # Bewusst ohne NumPy/Numba: die Umwandlung nach "U3" und zurück kostet
+        # mehr als str.upper() selbst (gemessen mit 200k Werten)
+        return [{"attribute_value": v, "abbr": v[:3].upper()} for v in values]
+    
     def get_or_create_attribute(self, name: str, values: List[str] = None) -> Tuple[bool, str]:
         """Erstellt oder aktualisiert Item Attribute"""
         try:
@@ -1511,15 +2710,12 @@ class ERPNextAPI:
                 if result.get("data"):
                     # Werte hinzufügen falls nötig
                     if values:
-                        existing = [v.get("attribute_value") for v in 
-                                   result["data"].get("item_attribute_values", [])]
+                        current = result["data"].get("item_attribute_values", [])
+                        existing = {v.get("attribute_value") for v in current}
                         new_values = [v for v in values if v not in existing]
                         
                         if new_values:
-                            current = result["data"].get("item_attribute_values", [])
-                            for val in new_values:
-                                abbr = val[:3].upper() if len(val) >= 3 else val.upper()
-                                current.append({"attribute_value": val, "abbr": abbr})
+                            current.extend(self._attribute_value_rows(new_values))
                             self._make_request("PUT", f"Item Attribute/{name}", {
                                 "item_attribute_values": current
                             })
@@ -1531,38 +2727,41 @@ class ERPNextAPI:
             data = {
                 "doctype": "Item Attribute",
                 "attribute_name": name,
-                "item_attribute_values": []
+                "item_attribute_values": self._attribute_value_rows(values or [])
             }
             
-            if values:
-                for val in values:
-                    abbr = val[:3].upper() if len(val) >= 3 else val.upper()
-                    data["item_attribute_values"].append({
-                        "attribute_value": val,
-                        "abbr": abbr
-                    })
-            
             self._make_request("POST", "Item Attribute", data)
             return True, f"Attribut erstellt: {name}"
         except Exception as e:
             return False, str(e)
     
+    def _item_price_doc(self, item_code: str, price: float) -> Dict:
+        """Baut das Item-Price-Dokument für die Standard-Preisliste"""
+        return {
+            "doctype": "Item Price",
+            "item_code": item_code,
+            "price_list": self.config.default_price_list,
+            "price_list_rate": price,
+            "currency": "EUR",
+            "selling": 1
+        }
+    
     def create_item_price(self, item_code: str, price: float) -> Tuple[bool, str]:
         """Erstellt Item-Preis"""
         try:
-            data = {
-                "doctype": "Item Price",
-                "item_code": item_code,
-                "price_list": self.config.default_price_list,
-                "price_list_rate": price,
-                "currency": "EUR",
-                "selling": 1
-            }
-            self._make_request("POST", "Item Price", data)
+            self._make_request("POST", "Item Price", self._item_price_doc(item_code, price))
             return True, f"Preis erstellt: {price} EUR"
         except Exception as e:
             return False, str(e)
     
+    def create_item_prices_bulk(self, prices: List[Tuple[str, float]]) -> List[Tuple[bool, str]]:
+        """Erstellt viele Item-Preise per insert_many (Fallback: create_item_price)"""
+        docs = [self._item_price_doc(item_code, price) for item_code, price in prices]
+        return self._bulk_create(
+            "Item Price", docs,
+            lambda doc: self.create_item_price(doc["item_code"], doc["price_list_rate"])
+        )
+    
     def get_all_items(self, limit: int = 0) -> List[Dict]:
         """Holt alle Items"""
         try:
@@ -1579,49 +2778,98 @@ class ERPNextAPI:
 
     # ==================== EXPORT METHODS ====================
 
+    # Seitengröße für Listen-Exporte (eine Anfrage pro Seite statt pro Datensatz)
+    EXPORT_PAGE_SIZE = 500
+    # Export-Felder aus Child-Tabellen - nur im vollständigen Dokument enthalten
+    EXPORT_CHILD_FIELDS = {"gtin", "attributes"}
+
     def export_items(self, fields: List[str], filters: Dict = None,
                      limit: int = 0, callback=None) -> List[Dict]:
-        """Exportiert Artikel mit ausgewählten Feldern"""
+        """
+        Exportiert Artikel mit ausgewählten Feldern.
+
+        Normale Felder kommen seitenweise direkt aus der Listen-Abfrage.
+        Nur wenn Child-Tabellen-Felder (GTIN, Attribute) gewählt sind,
+        wird das vollständige Dokument je Artikel nachgeladen.
+        Große Exporte besser über export_items_iter streamen.
+        """
         try:
-            params = {
-                "fields": json.dumps(fields),
-                "limit_page_length": limit if limit > 0 else 0
-            }
+            return list(self.export_items_iter(fields, filters, limit, callback))
+        except Exception as e:
+            logger.error(f"Export Error: {e}")
+            return []
 
-            if filters:
-                filter_list = []
-                for key, value in filters.items():
-                    if value:
-                        filter_list.append([key, "like", f"%{value}%"])
-                if filter_list:
-                    params["filters"] = json.dumps(filter_list)
+    def export_items_iter(self, fields: List[str], filters: Dict = None,
+                          limit: int = 0, callback=None) -> Iterator[Dict]:
+        """
+        Wie export_items, liefert die Artikel aber als Generator Seite für Seite.
 
-            result = self._make_request("GET", "Item", params)
-            items = result.get("data", [])
+        Im Speicher liegt nur die aktuelle Seite; Child-Tabellen-Felder werden
+        je Seite parallel nachgeladen. Fehler gehen an den Aufrufer.
+        """
+        child_fields = [f for f in fields if f in self.EXPORT_CHILD_FIELDS]
+        list_fields = [f for f in fields if f not in self.EXPORT_CHILD_FIELDS]
+        if "name" not in list_fields:
+            list_fields.insert(0, "name")
+
+        # Feste Sortierung für limit_start-Seiten - Frappes Standard "modified desc"
+        # verschiebt die Seitengrenzen, wenn während des Exports Artikel geändert werden
+        params = {"fields": json_param(list_fields), "order_by": "name asc"}
+
+        if filters:
+            filter_list = []
+            for key, value in filters.items():
+                if value:
+                    filter_list.append([key, "like", f"%{value}%"])
+            if filter_list:
+                params["filters"] = json_param(filter_list)
+
+        # Child-Tabellen nur über das vollständige Dokument verfügbar
+        def fetch_doc(item: Dict) -> Dict:
+            try:
+                return self._make_request("GET", f"Item/{item['name']}", http2=True).get("data", {})
+            except:
+                return {}
 
-            # Vollständige Daten holen wenn nötig
-            full_items = []
-            for i, item in enumerate(items):
-                try:
-                    full_data = self._make_request("GET", f"Item/{item['name']}")
-                    full_items.append(full_data.get("data", item))
-                    if callback:
-                        callback(i + 1, len(items))
-                except:
-                    full_items.append(item)
+        loaded = 0
+        while True:
+            page_size = self.EXPORT_PAGE_SIZE
+            if limit > 0:
+                page_size = min(page_size, limit - loaded)
+            params["limit_start"] = loaded
+            params["limit_page_length"] = page_size
 
-            return full_items
-        except Exception as e:
-            logger.error(f"Export Error: {e}")
-            return []
+            result = self._make_request("GET", "Item", params)
+            page = result.get("data", [])
+            loaded += len(page)
+
+            if child_fields and page:
+                docs = self._map_parallel(fetch_doc, page)
+                for item, doc in zip(page, docs):
+                    self._apply_child_fields(item, doc, child_fields)
+
+            if callback:
+                callback(loaded, limit if limit > 0 else loaded)
+            yield from page
+
+            if len(page) < page_size or (limit > 0 and loaded >= limit):
+                break
+
+    @staticmethod
+    def _apply_child_fields(item: Dict, doc: Dict, child_fields: List[str]):
+        """Überträgt Child-Tabellen-Felder aus dem vollständigen Dokument"""
+        for field_name in child_fields:
+            if field_name == "gtin":
+                barcodes = doc.get("barcodes") or []
+                item["gtin"] = barcodes[0].get("barcode", "") if barcodes else ""
+            else:
+                item[field_name] = doc.get(field_name, [])
 
     def export_item_groups(self, fields: List[str] = None, limit: int = 0) -> List[Dict]:
         """Exportiert Kategorien"""
         try:
-            default_fields = ["name", "item_group_name", "parent_item_group",
-                            "is_group", "description"]
             params = {
-                "fields": json.dumps(fields or default_fields),
+                "fields": json_param(fields) if fields else _EXPORT_ITEM_GROUP_FIELDS_JSON,
                 "limit_page_length": limit if limit > 0 else 0
             }
 
@@ -1634,15 +2882,13 @@ class ERPNextAPI:
     def export_item_prices(self, price_list: str = None, limit: int = 0) -> List[Dict]:
         """Exportiert Preise"""
         try:
-            fields = ["name", "item_code", "item_name", "price_list",
-                     "price_list_rate", "currency", "valid_from", "valid_upto"]
             params = {
-                "fields": json.dumps(fields),
+                "fields": _EXPORT_ITEM_PRICE_FIELDS_JSON,
                 "limit_page_length": limit if limit > 0 else 0
             }
 
             if price_list:
-                params["filters"] = json.dumps([["price_list", "=", price_list]])
+                params["filters"] = json_param([["price_list", "=", price_list]])
 
             result = self._make_request("GET", "Item Price", params)
             return result.get("data", [])
@@ -1653,15 +2899,13 @@ class ERPNextAPI:
     def export_stock_levels(self, warehouse: str = None, limit: int = 0) -> List[Dict]:
         """Exportiert Lagerbestände"""
         try:
-            fields = ["name", "item_code", "warehouse", "actual_qty",
-                     "reserved_qty", "projected_qty", "valuation_rate"]
             params = {
-                "fields": json.dumps(fields),
+                "fields": _EXPORT_STOCK_FIELDS_JSON,
                 "limit_page_length": limit if limit > 0 else 0
             }
 
             if warehouse:
-                params["filters"] = json.dumps([["warehouse", "=", warehouse]])
+                params["filters"] = json_param([["warehouse", "=", warehouse]])
 
             result = self._make_request("GET", "Bin", params)
             return result.get("data", [])
@@ -1672,10 +2916,8 @@ class ERPNextAPI:
     def export_attributes(self, limit: int = 0) -> List[Dict]:
         """Exportiert Item Attributes"""
         try:
-            fields = ["name", "attribute_name", "numeric_values",
-                     "from_range", "to_range", "increment"]
             params = {
-                "fields": json.dumps(fields),
+                "fields": _EXPORT_ATTRIBUTE_FIELDS_JSON,
                 "limit_page_length": limit if limit > 0 else 0
             }
 
@@ -1683,15 +2925,16 @@ class ERPNextAPI:
             attributes = result.get("data", [])
 
             # Hole Attributwerte für jedes Attribut
-            for attr in attributes:
+            def fetch_values(attr: Dict) -> str:
                 try:
-                    full_data = self._make_request("GET", f"Item Attribute/{attr['name']}")
-                    attr_data = full_data.get("data", {})
-                    # Extrahiere Attributwerte
-                    values = attr_data.get("item_attribute_values", [])
-                    attr["attribute_values"] = ", ".join([v.get("attribute_value", "") for v in values])
+                    full_data = self._make_request("GET", f"Item Attribute/{attr['name']}", http2=True)
+                    values = full_data.get("data", {}).get("item_attribute_values", [])
+                    return ", ".join([v.get("attribute_value", "") for v in values])
                 except:
-                    attr["attribute_values"] = ""
+                    return ""
+
+            for attr, values in zip(attributes, self._map_parallel(fetch_values, attributes)):
+                attr["attribute_values"] = values
 
             return attributes
         except Exception as e:
@@ -1704,22 +2947,33 @@ class ERPNextAPI:
                         numeric: bool = False, from_range: float = None,
                         to_range: float = None, increment: float = None) -> Tuple[bool, str]:
         """Erstellt ein Item Attribute"""
-        try:
-            data = {
-                "attribute_name": attribute_name,
-                "numeric_values": 1 if numeric else 0,
-            }
+        return self._insert_attribute(self._attribute_doc(
+            attribute_name, values, numeric, from_range, to_range, increment
+        ))
+
+    def _attribute_doc(self, attribute_name: str, values: List[str] = None,
+                       numeric: bool = False, from_range: float = None,
+                       to_range: float = None, increment: float = None) -> Dict:
+        """Baut das Item-Attribute-Dokument"""
+        data = {
+            "attribute_name": attribute_name,
+            "numeric_values": 1 if numeric else 0,
+        }
 
-            if numeric and from_range is not None:
-                data["from_range"] = from_range
-                data["to_range"] = to_range or 100
-                data["increment"] = increment or 1
-            elif values:
-                data["item_attribute_values"] = [
-                    {"attribute_value": v.strip(), "abbr": v.strip()[:3].upper()}
-                    for v in values if v.strip()
-                ]
+        if numeric and from_range is not None:
+            data["from_range"] = from_range
+            data["to_range"] = to_range or 100
+            data["increment"] = increment or 1
+        elif values:
+            data["item_attribute_values"] = self._attribute_value_rows(
+                [v.strip() for v in values if v.strip()]
+            )
+        return data
 
+    def _insert_attribute(self, data: Dict) -> Tuple[bool, str]:
+        """Legt ein vorbereitetes Item Attribute einzeln an"""
+        attribute_name = data["attribute_name"]
+        try:
             self._make_request("POST", "Item Attribute", data)
             return True, f"Attribut '{attribute_name}' erstellt"
         except Exception as e:
@@ -1728,6 +2982,18 @@ class ERPNextAPI:
                 return True, f"Attribut '{attribute_name}' existiert bereits"
             return False, str(e)
 
+    def create_attributes_bulk(self, specs: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Erstellt viele Item Attributes per insert_many.
+
+        specs enthält je Attribut die Argumente von create_attribute. Existiert
+        ein Attribut bereits, schlägt der Block fehl und die Attribute werden
+        einzeln angelegt - bestehende gelten dabei als Erfolg.
+        """
+        docs = [self._attribute_doc(**spec) for spec in specs]
+        return self._bulk_create("Item Attribute", docs, self._insert_attribute,
+                                 name_field="attribute_name")
+
     def add_attribute_value(self, attribute_name: str, value: str) -> Tuple[bool, str]:
         """Fügt einen Wert zu einem bestehenden Attribut hinzu"""
         try:
@@ -1760,8 +3026,15 @@ class ERPNextAPI:
         """Erstellt eine Artikelvariante"""
         try:
             # Prüfe ob Template existiert und has_variants=1 hat
-            template = self._make_request("GET", f"Item/{template_item}")
-            template_data = template.get("data", {})
+            template_data = self._template_cache.get(template_item)
+            if template_data is None:
+                template = self._make_request("GET", f"Item/{template_item}")
+                full_data = template.get("data", {})
+                template_data = {
+                    "has_variants": full_data.get("has_variants"),
+                    "item_name": full_data.get("item_name", "")
+                }
+                self._template_cache[template_item] = template_data
 
             if not template_data.get("has_variants"):
                 return False, f"Artikel '{template_item}' ist keine Variantenvorlage"
@@ -1781,12 +3054,26 @@ class ERPNextAPI:
                 data.update(additional_data)
 
             self._make_request("POST", "Item", data)
+            self._missing_items.discard(variant_code)
             return True, f"Variante '{variant_code}' erstellt"
         except Exception as e:
             if "DuplicateEntryError" in str(e):
                 return True, f"Variante '{variant_code}' existiert bereits"
             return False, str(e)
 
+    def create_variants_bulk(self, variants: List[Tuple]) -> List[Tuple[bool, str]]:
+        """
+        Erstellt mehrere Varianten parallel über den Session-Pool.
+
+        Args:
+            variants: Liste von Argument-Tupeln für create_variant
+                (template_item, variant_code, attributes, item_name, additional_data)
+
+        Returns:
+            Ergebnis je Variante in Eingabereihenfolge (wie create_variant)
+        """
+        return self._map_parallel(lambda args: self.create_variant(*args), variants)
+
     def setup_template_attributes(self, item_code: str, attribute_names: List[str]) -> Tuple[bool, str]:
         """Fügt Attribute zu einem Vorlagenartikel hinzu"""
         try:
@@ -1801,6 +3088,7 @@ class ERPNextAPI:
             }
 
             self._make_request("PUT", f"Item/{item_code}", update_data)
+            self._template_cache.pop(item_code, None)
             return True, f"Attribute zu '{item_code}' hinzugefügt"
         except Exception as e:
             return False, str(e)
@@ -1903,12 +3191,167 @@ EXPORT_ATTRIBUTE_FIELDS = {
     "item_attribute_values": "Attributwerte (JSON)",
 }
 
+# Checkbox-Raster der Artikel-Exportfelder (3 pro Zeile) - hängt nur von den Konstanten ab
+EXPORT_ITEM_FIELD_ROWS = [
+    list(islice(EXPORT_ITEM_FIELDS.items(), i, i + 3))
+    for i in range(0, len(EXPORT_ITEM_FIELDS), 3)
+]
+EXPORT_DEFAULT_SELECTED = frozenset({"item_code", "item_name", "item_group", "standard_rate"})
+EXPORT_ITEM_FIELD_KEYS = tuple(EXPORT_ITEM_FIELDS)
+EXPORT_ITEM_FIELD_INDEX = {key: i for i, key in enumerate(EXPORT_ITEM_FIELD_KEYS)}
+
 
 # ==================== HAUPTANWENDUNG ====================
 
+class PreviewTable:
+    """
+    Vorschau-Tabelle mit Fenster-Rendering.
+    
+    Statt einer DataTable mit allen Zeilen enthält das ListView nur die
+    sichtbaren Zeilen plus Platzhalter in voller Höhe davor/danach - beim
+    Scrollen wird lediglich das Fenster neu aufgebaut.
+    """
+    
+    ROW_HEIGHT = 35
+    HEADER_HEIGHT = 40
+    WINDOW = 40  # Max. gleichzeitig gerenderte Zeilen
+    
+    def __init__(self, placeholder: str, height: int, col_width: int = 150,
+                 header_len: int = 18, value_len: int = 30):
+        self.col_width = col_width
+        self.header_len = header_len
+        self.value_len = value_len
+        self._columns: List[str] = []
+        self._data: List[Dict] = []
+        self._first = 0
+        # Gekürzte Anzeigewerte je Zeile - beim Zurückscrollen nicht erneut formatieren
+        self._display_cache: Dict[int, List[str]] = {}
+        
+        self.header = Row(spacing=0)
+        self.list_view = ListView(
+            spacing=0,
+            height=height - self.HEADER_HEIGHT,
+            on_scroll=self._on_scroll,
+        )
+        self.control = Column([
+            Container(
+                content=self.header,
+                height=self.HEADER_HEIGHT,
+                bgcolor=Colors.BLUE_GREY_900,
+            ),
+            self.list_view,
+        ], spacing=0)
+        self.set_placeholder(placeholder)
+    
+    def set_placeholder(self, text: str):
+        """Zeigt nur einen Hinweistext statt Daten"""
+        self._columns = []
+        self._data = []
+        self._display_cache = {}
+        self._render(0)
+        self.header.controls = [self._cell(Text(text), width=None)]
+        self.control.width = None
+        # Ohne feste Breite bekäme das vertikale ListView in der horizontal scrollenden
+        # Row eine unbegrenzte Breite (Flutter-Layoutfehler) - daher ausblenden
+        self.list_view.visible = False
+    
+    def set_data(self, columns: List[str], data: List[Dict]):
+        """Setzt Spalten und Zeilen - gerendert wird nur das erste Fenster"""
+        columns = list(columns)
+        self._data = data
+        self._display_cache = {}
+        # Kopfzeile nur bei geänderten Spalten neu aufbauen (z.B. nicht bei Filter-Änderung)
+        if columns != self._columns:
+            self._columns = columns
+            cut = self.header_len - 2
+            names = [col if len(col) <= self.header_len else col[:cut] + "..." for col in columns]
+            self.header.controls = [
+                self._cell(Text(name, weight=FontWeight.BOLD, size=10, color=Colors.BLUE_200))
+                for name in names
+            ]
+            self.control.width = len(columns) * self.col_width or None
+        self.list_view.visible = bool(self._columns)
+        self._render(0)
+    
+    def _cell(self, content, width: Optional[int] = -1) -> Container:
+        return Container(
+            content=content,
+            width=self.col_width if width == -1 else width,
+            padding=padding.symmetric(horizontal=8),
+            alignment=ft.alignment.center_left,
+        )
+    
+    def _display_values(self, index: int) -> List[str]:
+        """Gekürzte Zellwerte einer Zeile (einmal berechnet, dann aus dem Cache)"""
+        values = self._display_cache.get(index)
+        if values is None:
+            row_get = self._data[index].get
+            max_len = self.value_len
+            cut = max_len - 3
+            values = [str(row_get(col, "")) for col in self._columns]
+            values = [v if len(v) <= max_len else v[:cut] + "..." for v in values]
+            self._display_cache[index] = values
+        return values
+    
+    def _build_row(self, index: int) -> Container:
+        cell = self._cell
+        cells = [cell(Text(v, size=9, no_wrap=True)) for v in self._display_values(index)]
+        return Container(
+            content=Row(cells, spacing=0),
+            height=self.ROW_HEIGHT,
+            border=border.only(bottom=BorderSide(1, Colors.GREY_800)),
+        )
+    
+    def _render(self, first: int):
+        """Baut das Zeilenfenster ab `first` samt Höhen-Platzhaltern auf"""
+        total = len(self._data)
+        first = max(0, min(first, total - self.WINDOW))
+        last = min(total, first + self.WINDOW)
+        controls = []
+        if first:
+            controls.append(Container(height=first * self.ROW_HEIGHT))
+        controls.extend(self._build_row(i) for i in range(first, last))
+        if last < total:
+            controls.append(Container(height=(total - last) * self.ROW_HEIGHT))
+        self.list_view.controls = controls
+        self._first = first
+    
+    def _on_scroll(self, e):
+        # Fenster mit Puffer oberhalb; erst bei deutlicher Verschiebung neu rendern
+        first = int(e.pixels // self.ROW_HEIGHT) - self.WINDOW // 4
+        if abs(max(first, 0) - self._first) < self.WINDOW // 4:
+            return
+        self._render(first)
+        self.list_view.update()
+
+
 class ERPNextImporterApp:
     """Haupt-Anwendungsklasse"""
     
+    # Parallele Artikel beim Bilder-Import (Bilder eines Artikels bleiben sequentiell)
+    IMAGE_UPLOAD_WORKERS = 8
+    # Tupel für str.endswith - eine C-Schleife statt splitext je Datei
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+    IMAGE_LIST_LIMIT = 100  # Angezeigte Dateinamen im Bilder-Tab
+    # Log-Einträge innerhalb dieses Intervalls werden in einem Update übertragen
+    LOG_FLUSH_INTERVAL = 0.1
+    LOG_MAX_ENTRIES = 500
+    # Fortschrittsanzeige bei Import/Bilder-Import höchstens so oft aktualisieren (Sekunden)
+    PROGRESS_INTERVAL = 0.1
+    # Virtualisierte Mapping-Liste: feste Zeilenhöhe, max. gleichzeitig gerenderte Zeilen
+    MAPPING_ROW_HEIGHT = 58
+    MAPPING_WINDOW = 30
+    # (Schlüssel, Beschriftung) der Transformationen im Mapping
+    TRANSFORM_CHOICES = (
+        ("none", "Keine"),
+        ("trim", "Whitespace entfernen"),
+        ("uppercase", "GROSSBUCHSTABEN"),
+        ("lowercase", "kleinbuchstaben"),
+        ("number", "Als Zahl"),
+        ("bool", "Als Boolean"),
+        ("html_strip", "HTML entfernen"),
+    )
+    
     def __init__(self, page: ft.Page):
         self.page = page
         self.config = ERPNextConfig()
@@ -1922,6 +3365,15 @@ class ERPNextImporterApp:
         self.source_columns: List[str] = []
         self.total_rows: int = 0  # Gesamtanzahl Zeilen in der Datei
         self.field_mappings: Dict[str, FieldMapping] = {}
+        # Rückwärts-Index Zielfeld -> Quellspalten für die Duplikat-Prüfung
+        self._target_sources: Dict[str, Set[str]] = {}
+        # Zustand der virtualisierten Mapping-Liste
+        self.mapping_dropdowns: Dict[str, Dropdown] = {}  # Nur gerenderte Zeilen
+        # (Schlüssel, Beschriftung) der Zielfelder - einmal je Listen-Aufbau
+        self._mapping_target_choices: Tuple[Tuple[str, str], ...] = ()
+        # Gekürzter Beispielwert je Spalte (aus der ersten Zeile, je Parse-Lauf)
+        self._sample_by_col: Dict[str, str] = {}
+        self._mapping_first = 0
         
         # Custom Fields Cache (von ERPNext geladen)
         self.custom_fields_loaded: bool = False
@@ -1945,19 +3397,46 @@ class ERPNextImporterApp:
         
         # Log
         self.log_entries: List[str] = []
+        # Ringpuffer der angezeigten Log-Zeilen - wird erst beim UI-Update in
+        # log_list übernommen (kein Verschieben der Liste je Eintrag)
+        self._log_controls: deque = deque(maxlen=self.LOG_MAX_ENTRIES)
+        self._log_dirty = False
         
         # Import State
         self.is_importing = False
+        # Hintergrund-Threads, die self.api benutzen (Import, Export, Bilder, Custom Fields)
+        self._api_threads: List[threading.Thread] = []
+        
+        # Verbindung zum Flet-Client (False nach on_disconnect)
+        self._page_alive = True
+        # suspend=True innerhalb von _batched_update - je Thread, damit ein Block im
+        # UI-Thread nicht die Updates von Import-, Log- oder AI-Threads verschluckt
+        self._update_state = threading.local()
+        
+        # Verzögertes Neuladen bei Trennzeichen-/Zeichensatz-Wechsel
+        self._reload_timer: Optional[threading.Timer] = None
+        
+        # Gedrosseltes Log-Update (siehe log)
+        self._log_lock = threading.Lock()
+        self._log_flush_timer: Optional[threading.Timer] = None
+        self._last_log_flush = 0.0
+        
+        # Container der Export-Feld-Checkboxen (einmal erstellt, siehe _build_export_field_checkboxes)
+        self._field_containers: Dict[str, Container] = {}
+        
+        # Export-Verzeichnis einmal anlegen - _run_export legt es nur neu an, wenn es fehlt
+        self._export_dir = Path("exports")
+        try:
+            self._export_dir.mkdir(exist_ok=True)
+        except OSError:
+            pass  # Fehler meldet dann der Export selbst
         
         # Setup
         self.setup_page()
         self.build_ui()
         self.load_config()
         # Initial update nach UI-Aufbau
-        try:
-            self.page.update()
-        except:
-            pass
+        self._update()
     
     def setup_page(self):
         """Konfiguriert die Seite"""
@@ -1967,6 +3446,47 @@ class ERPNextImporterApp:
         self.page.scroll = None  # Kein Page-Scroll, Tabs haben eigenes Scrolling
         self.page.window.width = 1400
         self.page.window.height = 900
+        self.page.on_disconnect = self._on_disconnect
+    
+    def _on_disconnect(self, e=None):
+        """Client getrennt - Hintergrund-Threads senden keine Updates mehr"""
+        self._page_alive = False
+    
+    def _update(self, *controls):
+        """
+        Überträgt Änderungen an den Client - ohne Argumente die ganze Seite,
+        sonst nur die übergebenen Controls (noch nicht eingehängte werden übersprungen).
+        """
+        if not self._page_alive or getattr(self._update_state, "suspend", False):
+            return
+        if self._log_dirty:
+            self._log_dirty = False
+            self.log_list.controls = list(self._log_controls)
+        if not controls:
+            self.page.update()
+            return
+        attached = [c for c in controls if c.page is not None]
+        if attached:
+            self.page.update(*attached)
+
+    @contextmanager
+    def _batched_update(self, *controls):
+        """
+        Fasst die UI-Updates des aufrufenden Threads im Block zu einem Update
+        zusammen - ohne Argumente die ganze Seite, sonst nur die übergebenen Controls.
+        Updates anderer Threads (Import-Fortschritt, Log-Timer) laufen unverändert weiter.
+        """
+        state = self._update_state
+        if getattr(state, "suspend", False):
+            # Verschachtelt - der äußere Block aktualisiert
+            yield
+            return
+        state.suspend = True
+        try:
+            yield
+        finally:
+            state.suspend = False
+            self._update(*controls)
     
     def build_ui(self):
         """Baut die UI"""
@@ -1985,47 +3505,44 @@ class ERPNextImporterApp:
             margin=margin.only(bottom=20)
         )
         
-        # Tabs
+        # Tabs - alle Inhalte werden gebaut (Controls halten App-Zustand), aber erst
+        # beim ersten Öffnen eingehängt: page.add überträgt nur den Import-Tab
+        tab_specs = [
+            ("Datenimport", Icons.DOWNLOAD, self._build_import_tab),
+            ("Datenexport", Icons.UPLOAD, self._build_export_tab),
+            ("Feld-Mapping", Icons.SWAP_HORIZ, self._build_mapping_tab),
+            ("Bilder", Icons.IMAGE, self._build_images_tab),
+            ("Einstellungen", Icons.SETTINGS, self._build_settings_tab),
+            ("Protokoll", Icons.LIST_ALT, self._build_log_tab),
+        ]
+        self._tab_contents = [build() for _, _, build in tab_specs]
         self.tabs = Tabs(
             selected_index=0,
             animation_duration=300,
             tabs=[
-                Tab(
-                    text="Datenimport",
-                    icon=Icons.DOWNLOAD,
-                    content=self._build_import_tab()
-                ),
-                Tab(
-                    text="Datenexport",
-                    icon=Icons.UPLOAD,
-                    content=self._build_export_tab()
-                ),
-                Tab(
-                    text="Feld-Mapping",
-                    icon=Icons.SWAP_HORIZ,
-                    content=self._build_mapping_tab()
-                ),
-                Tab(
-                    text="Bilder",
-                    icon=Icons.IMAGE,
-                    content=self._build_images_tab()
-                ),
-                Tab(
-                    text="Einstellungen",
-                    icon=Icons.SETTINGS,
-                    content=self._build_settings_tab()
-                ),
-                Tab(
-                    text="Protokoll",
-                    icon=Icons.LIST_ALT,
-                    content=self._build_log_tab()
-                ),
+                Tab(text=text, icon=icon, content=Container())
+                for text, icon, _ in tab_specs
             ],
             expand=True,
+            on_change=self._on_tab_selected,
         )
+        self._attach_tab(0)
         
         self.page.add(header, self.tabs)
     
+    def _attach_tab(self, index: int) -> bool:
+        """Hängt den Tab-Inhalt beim ersten Öffnen ein - True wenn neu eingehängt"""
+        tab = self.tabs.tabs[index]
+        content = self._tab_contents[index]
+        if tab.content is content:
+            return False
+        tab.content = content
+        return True
+    
+    def _on_tab_selected(self, e):
+        if self._attach_tab(self.tabs.selected_index):
+            self._update(self.tabs)
+    
     def _build_connection_status(self) -> Container:
         """Verbindungsstatus"""
         self.connection_icon = ft.Icon(Icons.CIRCLE, size=12, color=Colors.GREY_600)
@@ -2092,7 +3609,7 @@ class ERPNextImporterApp:
                 dropdown.Option("|", "Pipe (|)"),
             ],
             width=200,
-            on_change=self.reload_file
+            on_change=self._debounced_reload
         )
         
         self.csv_encoding = Dropdown(
@@ -2105,7 +3622,7 @@ class ERPNextImporterApp:
                 dropdown.Option("iso-8859-1", "ISO-8859-1"),
             ],
             width=200,
-            on_change=self.reload_file
+            on_change=self._debounced_reload
         )
         
         self.skip_header = Checkbox(label="Erste Zeile ist Überschrift", value=True)
@@ -2207,16 +3724,9 @@ class ERPNextImporterApp:
         )
         
         # Vorschau
-        self.preview_table = DataTable(
-            columns=[DataColumn(Text("Keine Datei ausgewählt"))],
-            rows=[],
-            border=border.all(1, Colors.GREY_700),
-            heading_row_color=Colors.BLUE_GREY_900,
-            heading_row_height=40,
-            data_row_min_height=35,
-            column_spacing=15,
-            horizontal_lines=border.BorderSide(1, Colors.GREY_800),
-            show_checkbox_column=False,
+        self.preview_table = PreviewTable(
+            "Keine Datei ausgewählt", height=265, col_width=170,
+            header_len=20, value_len=35
         )
 
         self.preview_column_info = Text("", size=11, color=Colors.GREY_500)
@@ -2233,7 +3743,7 @@ class ERPNextImporterApp:
                     Divider(height=10, color=Colors.TRANSPARENT),
                     Container(
                         content=Row(
-                            controls=[self.preview_table],
+                            controls=[self.preview_table.control],
                             scroll=ScrollMode.ALWAYS,
                         ),
                         height=280,
@@ -2462,15 +3972,8 @@ class ERPNextImporterApp:
         )
 
         # Vorschau
-        self.export_preview_table = DataTable(
-            columns=[DataColumn(Text("Klicke 'Vorschau laden' für Datenvorschau"))],
-            rows=[],
-            border=border.all(1, Colors.GREY_700),
-            heading_row_color=Colors.BLUE_GREY_900,
-            heading_row_height=40,
-            data_row_min_height=35,
-            column_spacing=15,
-            horizontal_lines=border.BorderSide(1, Colors.GREY_800),
+        self.export_preview_table = PreviewTable(
+            "Klicke 'Vorschau laden' für Datenvorschau", height=205
         )
 
         self.export_preview_info = Text("", size=11, color=Colors.GREY_500)
@@ -2492,7 +3995,7 @@ class ERPNextImporterApp:
                     Divider(height=10, color=Colors.TRANSPARENT),
                     Container(
                         content=Row(
-                            controls=[self.export_preview_table],
+                            controls=[self.export_preview_table.control],
                             scroll=ScrollMode.ALWAYS,
                         ),
                         height=220,
@@ -2541,32 +4044,36 @@ class ERPNextImporterApp:
         )
 
     def _build_export_field_checkboxes(self):
-        """Erstellt Checkboxen für Export-Felder"""
-        self.export_fields_selected: Dict[str, Checkbox] = {}
-        self.export_field_checkboxes.controls.clear()
-
-        # Standard-Felder für Artikel
-        default_selected = {"item_code", "item_name", "item_group", "standard_rate"}
-
-        row_controls = []
-        for field_key, field_label in EXPORT_ITEM_FIELDS.items():
-            cb = Checkbox(
-                label=field_label,
-                value=field_key in default_selected,
-            )
-            self.export_fields_selected[field_key] = cb
-            row_controls.append(Container(content=cb, width=200))
+        """
+        Erstellt Checkboxen für Export-Felder.
 
-            if len(row_controls) == 3:
-                self.export_field_checkboxes.controls.append(
-                    Row(row_controls, spacing=10)
+        Checkboxen samt Container entstehen nur beim ersten Aufruf; danach
+        werden die vorhandenen Container (mit ihrer Auswahl) neu eingehängt.
+        """
+        if not self._field_containers:
+            self.export_fields_selected: Dict[str, Checkbox] = {}
+
+            # Gewählte Felder in Klick-Reihenfolge (bestimmt die Spaltenfolge im Export)
+            self._selected_fields: List[str] = [k for k in EXPORT_ITEM_FIELDS if k in EXPORT_DEFAULT_SELECTED]
+            self._selected_fields_tuple: Tuple[str, ...] = tuple(self._selected_fields)
+            # Auswahlstatus je Feld (Index aus EXPORT_ITEM_FIELD_INDEX) - ohne Checkbox-Properties lesbar
+            self._field_mask = bytearray(key in EXPORT_DEFAULT_SELECTED for key in EXPORT_ITEM_FIELD_KEYS)
+
+            for field_key, field_label in EXPORT_ITEM_FIELDS.items():
+                cb = Checkbox(
+                    label=field_label,
+                    value=field_key in EXPORT_DEFAULT_SELECTED,
+                    data=field_key,
+                    on_change=self._on_field_toggle,
                 )
-                row_controls = []
+                self.export_fields_selected[field_key] = cb
+                self._field_containers[field_key] = Container(content=cb, width=200)
 
-        if row_controls:
-            self.export_field_checkboxes.controls.append(
-                Row(row_controls, spacing=10)
-            )
+        # Zeilen lokal aufbauen und einmal zuweisen - ein Diff statt einem je Zeile
+        self.export_field_checkboxes.controls = [
+            Row([self._field_containers[field_key] for field_key, _ in field_row], spacing=10)
+            for field_row in EXPORT_ITEM_FIELD_ROWS
+        ]
 
     def on_export_type_changed(self, e):
         """Export-Typ geändert"""
@@ -2584,22 +4091,46 @@ class ERPNextImporterApp:
         if hasattr(self, 'export_field_checkboxes'):
             self.export_field_checkboxes.visible = export_type == "artikel"
 
-        try:
-            self.page.update()
-        except:
-            pass
+        # Nur die geänderten Controls übertragen statt des ganzen Seitenbaums
+        self._update(
+            self.export_price_list, self.export_warehouse,
+            self.export_filter_item_code, self.export_filter_item_name,
+            self.export_filter_item_group, self.export_filter_brand,
+            self.export_field_checkboxes,
+        )
+
+    def _on_field_toggle(self, e):
+        """Export-Feld an-/abgewählt - Auswahl-Liste nachführen statt bei jedem Export neu zu scannen"""
+        field_key = e.control.data
+        index = EXPORT_ITEM_FIELD_INDEX[field_key]
+        selected = 1 if e.control.value else 0
+        if self._field_mask[index] == selected:
+            return
+        self._field_mask[index] = selected
+        if selected:
+            self._selected_fields.append(field_key)
+        else:
+            self._selected_fields.remove(field_key)
+        self._selected_fields_tuple = tuple(self._selected_fields)
 
     def select_all_export_fields(self, e=None):
         """Alle Export-Felder auswählen"""
         for cb in self.export_fields_selected.values():
             cb.value = True
-        self.page.update()
+        # Bereits gewählte behalten ihre Position, der Rest folgt in Feld-Reihenfolge
+        self._selected_fields += [k for k, b in zip(EXPORT_ITEM_FIELD_KEYS, self._field_mask) if not b]
+        self._selected_fields_tuple = tuple(self._selected_fields)
+        self._field_mask[:] = b"\x01" * len(self._field_mask)
+        self.export_field_checkboxes.update()
 
     def deselect_all_export_fields(self, e=None):
         """Alle Export-Felder abwählen"""
         for cb in self.export_fields_selected.values():
             cb.value = False
-        self.page.update()
+        self._selected_fields.clear()
+        self._selected_fields_tuple = ()
+        self._field_mask[:] = bytes(len(self._field_mask))
+        self.export_field_checkboxes.update()
 
     def load_export_preview(self, e=None):
         """Lädt Vorschau der Export-Daten"""
@@ -2609,11 +4140,13 @@ class ERPNextImporterApp:
 
         self.log("Lade Export-Vorschau...")
         export_type = self.export_type.value
+        total_fields = None
 
         try:
             if export_type == "artikel":
-                # Ausgewählte Felder
-                fields = ["name"] + [k for k, cb in self.export_fields_selected.items() if cb.value]
+                # Vorschau nur mit den ersten gewählten Feldern - der Export nutzt alle
+                fields = ["name", *self._selected_fields_tuple[:self.PREVIEW_MAX_FIELDS - 1]]
+                total_fields = 1 + len(self._selected_fields_tuple)
 
                 # Filter
                 filters = {}
@@ -2643,7 +4176,7 @@ class ERPNextImporterApp:
             else:
                 data = []
 
-            self._update_export_preview(data)
+            self._update_export_preview(data, total_fields)
             self.log(f"Vorschau geladen: {len(data)} Datensätze")
 
         except Exception as ex:
@@ -2651,42 +4184,26 @@ class ERPNextImporterApp:
 
         self.page.update()
 
-    def _update_export_preview(self, data: List[Dict]):
-        """Aktualisiert die Export-Vorschau-Tabelle - alle Spalten mit Scroll"""
+    PREVIEW_MAX_FIELDS = 8  # Spalten der Artikel-Vorschau (inkl. name)
+
+    def _update_export_preview(self, data: List[Dict], total_fields: Optional[int] = None):
+        """Aktualisiert die Export-Vorschau-Tabelle - alle geladenen Spalten mit Scroll"""
         if not data:
-            self.export_preview_table.columns = [DataColumn(Text("Keine Daten"))]
-            self.export_preview_table.rows = []
-            if hasattr(self, 'export_preview_info'):
-                self.export_preview_info.value = ""
+            self.export_preview_table.set_placeholder("Keine Daten")
+            self.export_preview_info.value = ""
             return
 
         # Alle Spalten aus erstem Datensatz
         columns = list(data[0].keys())
 
-        # Info-Text aktualisieren
-        if hasattr(self, 'export_preview_info'):
-            self.export_preview_info.value = f"{len(columns)} Spalten | {len(data)} Datensätze"
-
-        # Spalten erstellen
-        self.export_preview_table.columns = []
-        for col in columns:
-            display_name = col if len(col) <= 18 else col[:16] + "..."
-            self.export_preview_table.columns.append(
-                DataColumn(
-                    Text(display_name, weight=FontWeight.BOLD, size=10, color=Colors.BLUE_200)
-                )
-            )
-
-        rows = []
-        for row_data in data[:10]:
-            cells = []
-            for col in columns:
-                value = str(row_data.get(col, ""))
-                display_value = value if len(value) <= 30 else value[:27] + "..."
-                cells.append(DataCell(Text(display_value, size=9)))
-            rows.append(DataRow(cells=cells))
+        # Info-Text aktualisieren (Tabs werden in __init__ aufgebaut)
+        if total_fields and total_fields > len(columns):
+            column_info = f"{len(columns)} von {total_fields} Spalten (Vorschau)"
+        else:
+            column_info = f"{len(columns)} Spalten"
+        self.export_preview_info.value = f"{column_info} | {len(data)} Datensätze"
 
-        self.export_preview_table.rows = rows
+        self.export_preview_table.set_data(columns, data)
 
     def start_export(self, e=None):
         """Startet den Export"""
@@ -2700,8 +4217,7 @@ class ERPNextImporterApp:
         self.export_status.value = "Exportiere..."
         self.page.update()
 
-        thread = threading.Thread(target=self._run_export)
-        thread.start()
+        self._start_api_thread(self._run_export)
 
     def _run_export(self):
         """Export-Thread"""
@@ -2717,16 +4233,16 @@ class ERPNextImporterApp:
         self.log(f"=== Export gestartet: {export_type} ===")
 
         try:
+            # Artikel werden seitenweise gestreamt statt komplett geladen
+            streamed = False
+
             # Daten holen
             def progress_callback(current, total):
                 self.export_status.value = f"Lade {current}/{total}..."
-                try:
-                    self.page.update()
-                except:
-                    pass
+                self._update(self.export_status)
 
             if export_type == "artikel":
-                fields = ["name"] + [k for k, cb in self.export_fields_selected.items() if cb.value]
+                fields = ["name", *self._selected_fields_tuple]
                 filters = {}
                 if self.export_filter_item_code.value:
                     filters["item_code"] = self.export_filter_item_code.value
@@ -2735,7 +4251,8 @@ class ERPNextImporterApp:
                 if self.export_filter_item_group.value:
                     filters["item_group"] = self.export_filter_item_group.value
 
-                data = self.api.export_items(fields, filters, limit, progress_callback)
+                data = self.api.export_items_iter(fields, filters, limit, progress_callback)
+                streamed = True
 
             elif export_type == "kategorien":
                 data = self.api.export_item_groups(limit=limit)
@@ -2754,6 +4271,14 @@ class ERPNextImporterApp:
             else:
                 data = []
 
+            # Artikel: Spalten in der Reihenfolge der gewählten Felder
+            fieldnames = fields if export_type == "artikel" else None
+
+            if streamed:
+                # Erste Seite abwarten - ein leerer Export legt keine Datei an
+                first = next(data, None)
+                data = chain((first,), data) if first is not None else []
+
             if not data:
                 self.log("Keine Daten zum Exportieren!", error=True)
                 self._finish_export()
@@ -2766,47 +4291,58 @@ class ERPNextImporterApp:
             else:
                 filename = f"export_{export_type}_{timestamp}.csv"
 
-            filepath = os.path.join("exports", filename)
-            os.makedirs("exports", exist_ok=True)
+            filepath = self._export_dir / filename
+
+            # Exportieren - Fortschritt höchstens ~10x pro Sekunde an die UI
+            last_ui = 0.0
+
+            def write_progress(written, total):
+                nonlocal last_ui
+                now = time.monotonic()
+                if now - last_ui < 0.1 and (total is None or written < total):
+                    return
+                last_ui = now
+                # Gestreamt ist die Gesamtzahl vorab unbekannt
+                self.export_status.value = (f"Schreibe {written}/{total}..." if total is not None
+                                            else f"Schreibe {written}...")
+                self._update(self.export_status)
+
+            # CSV-Trennzeichen
+            if export_format == "csv":
+                delimiter = ";"
+            elif export_format == "csv_comma":
+                delimiter = ","
+            else:  # tsv (bei JSON ungenutzt)
+                delimiter = "\t"
+
+            # Erst in *.part schreiben - bricht der Stream ab, bleibt keine halbe Exportdatei liegen
+            part_path = filepath.with_name(filename + ".part")
+
+            def write_file() -> int:
+                if export_format == "json":
+                    return write_export_json(data, part_path, encoding, write_progress)
+                return write_export_csv(data, part_path, delimiter, encoding, write_progress, fieldnames)
 
-            # Exportieren
-            if export_format == "json":
-                with open(filepath, 'w', encoding=encoding) as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-            else:
-                # CSV
-                if export_format == "csv":
-                    delimiter = ";"
-                elif export_format == "csv_comma":
-                    delimiter = ","
-                else:  # tsv
-                    delimiter = "\t"
-
-                with open(filepath, 'w', encoding=encoding, newline='') as f:
-                    if data:
-                        # Alle Schlüssel sammeln
-                        all_keys = set()
-                        for row in data:
-                            all_keys.update(row.keys())
-                        fieldnames = sorted(all_keys)
-
-                        writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter)
-                        writer.writeheader()
-
-                        for row in data:
-                            # Werte bereinigen
-                            clean_row = {}
-                            for k, v in row.items():
-                                if isinstance(v, (list, dict)):
-                                    clean_row[k] = json.dumps(v, ensure_ascii=False)
-                                else:
-                                    clean_row[k] = v
-                            writer.writerow(clean_row)
+            try:
+                try:
+                    count = write_file()
+                except FileNotFoundError:
+                    # Export-Verzeichnis fehlt (gelöscht/nicht anlegbar) - anlegen und erneut schreiben;
+                    # die Writer öffnen die Datei vor dem ersten Datensatz, der Stream ist noch unberührt
+                    self._export_dir.mkdir(parents=True, exist_ok=True)
+                    count = write_file()
+                os.replace(part_path, filepath)
+            except BaseException:
+                try:
+                    part_path.unlink()
+                except OSError:
+                    pass
+                raise
 
             self.log(f"Export erfolgreich: {filepath}")
-            self.log(f"Exportiert: {len(data)} Datensätze")
+            self.log(f"Exportiert: {count} Datensätze")
 
-            self.export_status.value = f"Exportiert: {len(data)} Datensätze -> {filename}"
+            self.export_status.value = f"Exportiert: {count} Datensätze -> {filename}"
 
         except Exception as ex:
             self.log(f"Export-Fehler: {ex}", error=True)
@@ -2818,18 +4354,17 @@ class ERPNextImporterApp:
         """Beendet Export"""
         self.export_button.disabled = False
         self.export_progress.visible = False
-        try:
-            self.page.update()
-        except:
-            pass
+        self._update()
 
     def _build_mapping_tab(self) -> Container:
         """Mapping-Tab"""
 
+        # Virtualisiert: nur das sichtbare Zeilenfenster wird gerendert
         self.mapping_list = ListView(
             expand=True,
-            spacing=5,
+            spacing=0,
             padding=10,
+            on_scroll=self._on_mapping_scroll,
         )
 
         auto_map_btn = ElevatedButton(
@@ -2911,7 +4446,8 @@ class ERPNextImporterApp:
         """Bilder-Tab"""
         
         self.image_folder_text = Text("Kein Ordner ausgewählt", italic=True)
-        self.image_file_list = ListView(expand=True, spacing=5)
+        # Feste Zeilenhöhe: Flutter baut die Einträge lazy nach Index
+        self.image_file_list = ListView(expand=True, spacing=0, item_extent=28)
         self.image_count_text = Text("", size=12)
         
         self.image_mode = RadioGroup(
@@ -3321,30 +4857,26 @@ class ERPNextImporterApp:
             ext = os.path.splitext(self.source_file)[1].lower()
 
             if ext == ".xml":
-                parser = BMECatParser()
-                self.source_data, _ = parser.parse(self.source_file)
-                self.source_columns = parser.get_columns() if self.source_data else []
-                self.total_rows = len(self.source_data)
-                self.file_info_text.value = f"BMECat: {self.total_rows} Produkte"
+                # Streaming: nur die Vorschau-Produkte behalten, den Rest nur zählen
+                self.source_data = []
+                self.total_rows = 0
+                for product in BMECatParser().iter_products(self.source_file):
+                    if self.total_rows < 500:
+                        self.source_data.append(product)
+                    self.total_rows += 1
+                self.source_columns = list(self.source_data[0].keys()) if self.source_data else []
+                if self.total_rows > 500:
+                    self.file_info_text.value = f"BMECat: {self.total_rows} Produkte (Vorschau: 500)"
+                else:
+                    self.file_info_text.value = f"BMECat: {self.total_rows} Produkte"
             else:
                 delimiter = self.csv_delimiter.value
                 encoding = self.csv_encoding.value
 
                 # Optimierung: Lade nur erste 500 Zeilen für Vorschau + Zähle Gesamtanzahl
-                with open(self.source_file, 'r', encoding=encoding, errors='replace') as f:
-                    reader = csv.DictReader(f, delimiter=delimiter)
-                    self.source_columns = reader.fieldnames or []
-
-                    # Lade nur erste 500 Zeilen für Vorschau
-                    preview_data = []
-                    row_count = 0
-                    for row in reader:
-                        row_count += 1
-                        if row_count <= 500:
-                            preview_data.append(row)
-
-                    self.source_data = preview_data
-                    self.total_rows = row_count
+                self.source_columns, self.source_data, self.total_rows = read_csv_preview(
+                    self.source_file, delimiter, encoding, preview_rows=500
+                )
 
                 if self.total_rows > 500:
                     self.file_info_text.value = f"CSV: {self.total_rows} Zeilen, {len(self.source_columns)} Spalten (Vorschau: 500 Zeilen)"
@@ -3356,6 +4888,11 @@ class ERPNextImporterApp:
             else:
                 self.log(f"Geparst: {self.total_rows} Datensätze, {len(self.source_columns)} Spalten")
 
+            first_row = self.source_data[0] if self.source_data else {}
+            self._sample_by_col = {
+                col: str(first_row.get(col, ""))[:35] for col in self.source_columns
+            }
+
             self.update_preview_table()
             self.update_mapping_list()
             self.start_button.disabled = False
@@ -3372,6 +4909,16 @@ class ERPNextImporterApp:
         if self.source_file:
             self.parse_source_file()
     
+    RELOAD_DEBOUNCE = 0.3  # Sekunden
+    
+    def _debounced_reload(self, e=None):
+        """Lädt erst neu, wenn die Auswahl kurz unverändert bleibt - schnelles Durchklicken parst nur einmal"""
+        if self._reload_timer:
+            self._reload_timer.cancel()
+        self._reload_timer = threading.Timer(self.RELOAD_DEBOUNCE, self.reload_file)
+        self._reload_timer.daemon = True
+        self._reload_timer.start()
+    
     def update_preview_table(self):
         """Aktualisiert Vorschau - zeigt alle Spalten mit horizontalem Scroll"""
         if not self.source_columns:
@@ -3382,38 +4929,14 @@ class ERPNextImporterApp:
         total_cols = len(self.source_columns)
 
         # Info-Text aktualisieren mit Gesamtanzahl
-        if hasattr(self, 'preview_column_info'):
-            preview_count = min(15, len(self.source_data))
-            self.preview_column_info.value = f"{total_cols} Spalten | {self.total_rows} Zeilen gesamt (Vorschau: {preview_count})"
-
-        # Spalten erstellen
-        self.preview_table.columns = []
-        for col in display_cols:
-            # Kürze lange Spaltennamen
-            display_name = col if len(col) <= 20 else col[:18] + "..."
-            self.preview_table.columns.append(
-                DataColumn(
-                    Text(display_name, weight=FontWeight.BOLD, size=10, color=Colors.BLUE_200),
-                )
-            )
+        preview_count = len(self.source_data)
+        self.preview_column_info.value = f"{total_cols} Spalten | {self.total_rows} Zeilen gesamt (Vorschau: {preview_count})"
 
-        rows = []
-        for row_data in self.source_data[:15]:
-            cells = []
-            for col in display_cols:
-                value = str(row_data.get(col, ""))
-                # Kürze lange Werte
-                display_value = value if len(value) <= 35 else value[:32] + "..."
-                cells.append(DataCell(Text(display_value, size=9)))
-            rows.append(DataRow(cells=cells))
-
-        self.preview_table.rows = rows
+        # Alle geladenen Vorschauzeilen - gerendert wird nur das sichtbare Fenster
+        self.preview_table.set_data(display_cols, self.source_data)
     
-    def update_mapping_list(self):
-        """Aktualisiert Mapping-Liste"""
-        self.mapping_list.controls.clear()
-        self.mapping_dropdowns: Dict[str, Dropdown] = {}  # Speichere Dropdown-Referenzen
-
+    def _mapping_choices(self) -> Tuple[Tuple[str, str], ...]:
+        """(Schlüssel, Beschriftung) der Zielfelder für den aktuellen Import-Typ"""
         import_type = self.import_type.value
 
         # Wähle Zielfelder basierend auf Import-Typ
@@ -3432,54 +4955,83 @@ class ERPNextImporterApp:
             if self.custom_fields_loaded and self.custom_item_fields:
                 target_fields.update(self.custom_item_fields)
 
+        return (("", "-- Nicht importieren --"),) + tuple(
+            (field_key, field_info["label"]) for field_key, field_info in target_fields.items()
+        )
+
+    def update_mapping_list(self):
+        """Aktualisiert Mapping-Liste"""
+        self._mapping_target_choices = self._mapping_choices()
+
+        # Auto-Mapping für alle Spalten vorab - der Zustand liegt in field_mappings,
+        # damit ausgeblendete Zeilen beim erneuten Rendern ihre Werte behalten
         for col in self.source_columns:
-            row = self._create_mapping_row(col, target_fields)
-            self.mapping_list.controls.append(row)
+            auto_target = auto_map(col)
+            if auto_target:
+                self.field_mappings[col] = FieldMapping(
+                    source_column=col,
+                    target_field=auto_target
+                )
+        self._reindex_mappings()
 
+        self._render_mapping_window(0)
         self.page.update()
 
+    def _render_mapping_window(self, first: int):
+        """Baut nur das Fenster ab `first` auf, davor/danach Höhen-Platzhalter"""
+        total = len(self.source_columns)
+        window = self.MAPPING_WINDOW
+        row_height = self.MAPPING_ROW_HEIGHT
+        first = max(0, min(first, total - window))
+        last = min(total, first + window)
+
+        # Dropdown-Referenzen nur für gerenderte Zeilen
+        self.mapping_dropdowns = {}
+        controls = []
+        if first:
+            controls.append(Container(height=first * row_height))
+        controls.extend(
+            self._create_mapping_row(col)
+            for col in self.source_columns[first:last]
+        )
+        if last < total:
+            controls.append(Container(height=(total - last) * row_height))
+        self.mapping_list.controls = controls
+        self._mapping_first = first
+
+    def _on_mapping_scroll(self, e):
+        # Wie PreviewTable: Puffer oberhalb, erst bei deutlicher Verschiebung neu rendern
+        step = self.MAPPING_WINDOW // 4
+        first = int(max(e.pixels - 10, 0) // self.MAPPING_ROW_HEIGHT) - step
+        if abs(max(first, 0) - self._mapping_first) < step:
+            return
+        self._render_mapping_window(first)
+        self._update(self.mapping_list)
+
     def on_import_type_changed(self, e=None):
         """Import-Typ geändert - aktualisiere Mapping"""
         if self.source_columns:
-            self.field_mappings.clear()
-            self.update_mapping_list()
+            # Gleiche Zielfelder (z.B. Artikel <-> Preise): Mappings bleiben gültig,
+            # die Liste muss nicht neu aufgebaut werden
+            if self._mapping_choices() != self._mapping_target_choices:
+                self.field_mappings.clear()
+                self.update_mapping_list()
             self.log(f"Import-Typ geändert auf: {self.import_type.value}")
     
-    def _create_mapping_row(self, source_col: str, target_fields: Dict) -> Container:
+    def _create_mapping_row(self, source_col: str) -> Container:
         """Erstellt Mapping-Zeile"""
         
-        target_options = [dropdown.Option("", "-- Nicht importieren --")]
-        for field_key, field_info in target_fields.items():
-            label = field_info["label"]
-            target_options.append(dropdown.Option(field_key, label))
-        
-        # Auto-Mapping
-        auto_target = ""
-        col_lower = source_col.lower().replace(" ", "_").replace("-", "_")
-        col_normalized = re.sub(r'[^a-z0-9_]', '', col_lower)
-        
-        # Direkte Suche
-        if col_lower in AUTO_MAPPING_RULES:
-            auto_target = AUTO_MAPPING_RULES[col_lower]
-        elif col_normalized in AUTO_MAPPING_RULES:
-            auto_target = AUTO_MAPPING_RULES[col_normalized]
-        else:
-            # Fuzzy-Suche
-            for rule_key, rule_target in AUTO_MAPPING_RULES.items():
-                if rule_key in col_lower or col_lower in rule_key:
-                    auto_target = rule_target
-                    break
+        # Flet-Controls brauchen eigene Instanzen je Dropdown - nur die
+        # (Schlüssel, Beschriftung)-Paare werden vorab einmal berechnet
+        option = dropdown.Option
+        target_options = [option(key, label) for key, label in self._mapping_target_choices]
         
-        # Mapping speichern wenn auto-zugeordnet
-        if auto_target:
-            self.field_mappings[source_col] = FieldMapping(
-                source_column=source_col,
-                target_field=auto_target
-            )
+        # Werte aus dem gespeicherten Mapping (Zeile kann neu gerendert werden)
+        mapping = self.field_mappings.get(source_col)
         
         target_dropdown = Dropdown(
             options=target_options,
-            value=auto_target,
+            value=mapping.target_field if mapping else "",
             width=250,
             dense=True,
             on_change=lambda e, col=source_col: self.on_mapping_changed(col, e.control.value)
@@ -3489,31 +5041,22 @@ class ERPNextImporterApp:
         self.mapping_dropdowns[source_col] = target_dropdown
         
         transform_dropdown = Dropdown(
-            options=[
-                dropdown.Option("none", "Keine"),
-                dropdown.Option("trim", "Whitespace entfernen"),
-                dropdown.Option("uppercase", "GROSSBUCHSTABEN"),
-                dropdown.Option("lowercase", "kleinbuchstaben"),
-                dropdown.Option("number", "Als Zahl"),
-                dropdown.Option("bool", "Als Boolean"),
-                dropdown.Option("html_strip", "HTML entfernen"),
-            ],
-            value="none",
+            options=[option(key, label) for key, label in self.TRANSFORM_CHOICES],
+            value=mapping.transform if mapping else "none",
             width=180,
             dense=True,
             on_change=lambda e, col=source_col: self.on_transform_changed(col, e.control.value)
         )
         
         default_field = TextField(
+            value=mapping.default_value if mapping else "",
             hint_text="Standardwert",
             width=150,
             dense=True,
             on_change=lambda e, col=source_col: self.on_default_changed(col, e.control.value)
         )
         
-        sample = ""
-        if self.source_data:
-            sample = str(self.source_data[0].get(source_col, ""))[:35]
+        sample = self._sample_by_col.get(source_col, "")
         
         return Container(
             content=Row([
@@ -3533,37 +5076,50 @@ class ERPNextImporterApp:
                     width=150
                 ),
             ], spacing=10),
-            padding=5
+            padding=5,
+            height=self.MAPPING_ROW_HEIGHT,
         )
     
+    def _reindex_mappings(self):
+        """Baut den Rückwärts-Index nach Massenänderungen an field_mappings neu auf"""
+        index: Dict[str, Set[str]] = {}
+        for col, mapping in self.field_mappings.items():
+            index.setdefault(mapping.target_field, set()).add(col)
+        self._target_sources = index
+
     def on_mapping_changed(self, source_col: str, target_field: str):
         """Mapping geändert - verhindert Duplikate"""
+        # Bisheriges Zielfeld dieser Spalte aus dem Index austragen
+        previous = self.field_mappings.get(source_col)
+        if previous is not None:
+            self._target_sources.get(previous.target_field, set()).discard(source_col)
+
         if target_field:
-            # Prüfe ob dieses Zielfeld bereits von einer anderen Spalte verwendet wird
-            for other_col, mapping in list(self.field_mappings.items()):
-                if other_col != source_col and mapping.target_field == target_field:
-                    # Entferne das alte Mapping und setze Dropdown zurück
-                    del self.field_mappings[other_col]
-                    if hasattr(self, 'mapping_dropdowns') and other_col in self.mapping_dropdowns:
-                        self.mapping_dropdowns[other_col].value = ""
-                    self.log(f"Feld '{target_field}' war bereits vergeben - altes Mapping entfernt")
-
-            # Setze neues Mapping
-            if source_col not in self.field_mappings:
+            # Spalten, die dieses Zielfeld bereits verwenden (Index statt Scan)
+            owners = self._target_sources.setdefault(target_field, set())
+            if owners:
+                # Nur zurückgesetzte Dropdowns und Log übertragen, nicht die ganze Seite
+                stale = [self.mapping_dropdowns[c] for c in owners if c in self.mapping_dropdowns]
+                with self._batched_update(self.log_list, *stale):
+                    for other_col in list(owners):
+                        # Entferne das alte Mapping und setze Dropdown zurück
+                        owners.discard(other_col)
+                        self.field_mappings.pop(other_col, None)
+                        if other_col in self.mapping_dropdowns:
+                            self.mapping_dropdowns[other_col].value = ""
+                        self.log(f"Feld '{target_field}' war bereits vergeben - altes Mapping entfernt")
+
+            # Setze neues Mapping - das geänderte Dropdown zeigt den Wert bereits
+            if previous is None:
                 self.field_mappings[source_col] = FieldMapping(source_column=source_col, target_field=target_field)
             else:
-                self.field_mappings[source_col].target_field = target_field
-        elif source_col in self.field_mappings:
+                previous.target_field = target_field
+            owners.add(source_col)
+        elif previous is not None:
             del self.field_mappings[source_col]
-
-        # UI aktualisieren
-        try:
-            self.page.update()
-        except:
-            pass
     
     def on_transform_changed(self, source_col: str, transform: str):
-        """Transform geändert"""
+        """Transform geändert (kein UI-Update nötig - das Control hält seinen Wert)"""
         if source_col in self.field_mappings:
             self.field_mappings[source_col].transform = transform
     
@@ -3574,50 +5130,39 @@ class ERPNextImporterApp:
     
     def auto_map_fields(self, e=None):
         """Auto-Mapping - ohne Duplikate"""
-        mapped_count = 0
-        used_targets = set()  # Verhindert Duplikate
-
-        for i, control in enumerate(self.mapping_list.controls):
-            row = control.content
-            source_text = row.controls[0].content.value
-            dropdown_ctrl = row.controls[2]
-
-            col_lower = source_text.lower().replace(" ", "_").replace("-", "_")
-            col_normalized = re.sub(r'[^a-z0-9_]', '', col_lower)
-
-            target = ""
-            if col_lower in AUTO_MAPPING_RULES:
-                target = AUTO_MAPPING_RULES[col_lower]
-            elif col_normalized in AUTO_MAPPING_RULES:
-                target = AUTO_MAPPING_RULES[col_normalized]
-            else:
-                for rule_key, rule_target in AUTO_MAPPING_RULES.items():
-                    if rule_key in col_lower:
-                        target = rule_target
-                        break
+        # Ein Durchlauf: erste Spalte je Zielfeld gewinnt (auto_map ist gecacht)
+        winners: Dict[str, str] = {}
+        for source_text in self.source_columns:
+            target = auto_map(source_text)
+            if target:
+                winners.setdefault(target, source_text)
+
+        for target, source_text in winners.items():
+            # Andere Spalten mit diesem Zielfeld (z.B. manuell zugeordnet) freigeben
+            for other_col in self._target_sources.get(target, ()):
+                if other_col != source_text:
+                    self.field_mappings.pop(other_col, None)
+            self.field_mappings[source_text] = FieldMapping(
+                source_column=source_text,
+                target_field=target
+            )
+        mapped_count = len(winners)
 
-            # Nur zuordnen wenn Zielfeld noch nicht verwendet
-            if target and target not in used_targets:
-                dropdown_ctrl.value = target
-                self.field_mappings[source_text] = FieldMapping(
-                    source_column=source_text,
-                    target_field=target
-                )
-                used_targets.add(target)
-                mapped_count += 1
+        self._reindex_mappings()
 
-        self.log(f"Auto-Mapping: {mapped_count} Felder zugeordnet")
-        self.page.update()
+        # Neu gerenderte Zeilen und Log-Eintrag in einem Update
+        with self._batched_update():
+            self.log(f"Auto-Mapping: {mapped_count} Felder zugeordnet")
+            self._render_mapping_window(self._mapping_first)
     
     def clear_mappings(self, e=None):
         """Löscht alle Mappings"""
         self.field_mappings.clear()
-        for control in self.mapping_list.controls:
-            row = control.content
-            dropdown_ctrl = row.controls[2]
-            dropdown_ctrl.value = ""
-        self.log("Alle Mappings gelöscht")
-        self.page.update()
+        self._target_sources.clear()
+        with self._batched_update():
+            for dropdown_ctrl in self.mapping_dropdowns.values():
+                dropdown_ctrl.value = ""
+            self.log("Alle Mappings gelöscht")
 
     def load_custom_fields_from_erpnext(self, e=None):
         """Lädt Custom Fields von ERPNext und aktualisiert die Mapping-Liste"""
@@ -3635,8 +5180,7 @@ class ERPNextImporterApp:
         self.page.update()
         
         # In separatem Thread ausführen
-        thread = threading.Thread(target=self._run_load_custom_fields)
-        thread.start()
+        self._start_api_thread(self._run_load_custom_fields)
     
     def _run_load_custom_fields(self):
         """Lädt Custom Fields in separatem Thread"""
@@ -3725,10 +5269,7 @@ class ERPNextImporterApp:
     def _finish_load_custom_fields(self):
         """Beendet Custom Fields Laden"""
         self.load_custom_fields_btn.disabled = False
-        try:
-            self.page.update()
-        except:
-            pass
+        self._update()
 
     def ai_smart_map_fields(self, e=None):
         """AI-basiertes Smart-Mapping mit Gemini"""
@@ -3754,7 +5295,12 @@ class ERPNextImporterApp:
         thread.start()
 
     def _run_ai_mapping(self):
-        """Führt AI-Mapping in separatem Thread aus"""
+        """
+        Führt AI-Mapping in separatem Thread aus.
+
+        Jeder Abschnitt (Start, Ergebnis, Fehler) überträgt seine Änderungen
+        gesammelt in einem einzigen Update.
+        """
         try:
             import_type = self.import_type.value
             
@@ -3771,9 +5317,10 @@ class ERPNextImporterApp:
             # Sample-Daten für bessere Erkennung
             sample_data = self.source_data[:5] if self.source_data else None
 
-            self.log("Starte Gemini AI Smart-Mapping...")
-            if self.custom_fields_loaded:
-                self.log(f"Inkl. {len(self.custom_item_fields)} Custom Fields")
+            with self._batched_update(self.log_list):
+                self.log("Starte Gemini AI Smart-Mapping...")
+                if self.custom_fields_loaded:
+                    self.log(f"Inkl. {len(self.custom_item_fields)} Custom Fields")
 
             # AI Mapping anfordern
             ai_mappings = self.gemini.smart_map_fields(
@@ -3783,26 +5330,24 @@ class ERPNextImporterApp:
             )
 
             if not ai_mappings:
-                self.log("AI konnte keine Mappings ermitteln", error=True)
-                self.ai_mapping_status.value = "Keine Mappings gefunden"
-                self.ai_mapping_status.color = Colors.ORANGE_400
-                self._finish_ai_mapping()
+                with self._batched_update():
+                    self.log("AI konnte keine Mappings ermitteln", error=True)
+                    self.ai_mapping_status.value = "Keine Mappings gefunden"
+                    self.ai_mapping_status.color = Colors.ORANGE_400
+                    self._finish_ai_mapping()
                 return
 
             # Mappings in UI übernehmen - ohne Duplikate
             mapped_count = 0
             used_targets = set()  # Verhindert Duplikate
 
-            for control in self.mapping_list.controls:
-                row = control.content
-                source_text = row.controls[0].content.value
-                dropdown_ctrl = row.controls[2]
-
+            for source_text in self.source_columns:
                 if source_text in ai_mappings:
                     target = ai_mappings[source_text]
                     # Nur zuordnen wenn Zielfeld noch nicht verwendet
                     if target not in used_targets:
-                        dropdown_ctrl.value = target
+                        if source_text in self.mapping_dropdowns:
+                            self.mapping_dropdowns[source_text].value = target
                         self.field_mappings[source_text] = FieldMapping(
                             source_column=source_text,
                             target_field=target
@@ -3810,24 +5355,27 @@ class ERPNextImporterApp:
                         used_targets.add(target)
                         mapped_count += 1
 
-            self.log(f"AI Smart-Mapping: {mapped_count} Felder intelligent zugeordnet (keine Duplikate)")
-            self.ai_mapping_status.value = f"{mapped_count} Felder gemappt"
-            self.ai_mapping_status.color = Colors.GREEN_400
+            self._reindex_mappings()
 
-        except Exception as ex:
-            self.log(f"AI Mapping Fehler: {ex}", error=True)
-            self.ai_mapping_status.value = "Fehler"
-            self.ai_mapping_status.color = Colors.RED_400
+            # Log, Status und Button-Freigabe in einem Update
+            with self._batched_update():
+                self.log(f"AI Smart-Mapping: {mapped_count} Felder intelligent zugeordnet (keine Duplikate)")
+                self.ai_mapping_status.value = f"{mapped_count} Felder gemappt"
+                self.ai_mapping_status.color = Colors.GREEN_400
+                self._finish_ai_mapping()
+            return
 
-        self._finish_ai_mapping()
+        except Exception as ex:
+            with self._batched_update():
+                self.log(f"AI Mapping Fehler: {ex}", error=True)
+                self.ai_mapping_status.value = "Fehler"
+                self.ai_mapping_status.color = Colors.RED_400
+                self._finish_ai_mapping()
 
     def _finish_ai_mapping(self):
         """Beendet AI-Mapping"""
         self.ai_map_btn.disabled = False
-        try:
-            self.page.update()
-        except:
-            pass
+        self._update()
 
     def on_image_folder_picked(self, e: FilePickerResultEvent):
         """Bildordner ausgewählt"""
@@ -3838,26 +5386,32 @@ class ERPNextImporterApp:
         self.image_folder_text.value = e.path
         self.image_folder_text.italic = False
         
-        self.image_file_list.controls.clear()
+        # scandir liefert den Dateityp aus dem Verzeichniseintrag (kein stat je Datei),
+        # die Endung wird vor is_file() geprüft
+        extensions = self.IMAGE_EXTENSIONS
+        with os.scandir(e.path) as entries:
+            self.image_files = [
+                entry.name for entry in entries
+                if entry.name.lower().endswith(extensions) and entry.is_file()
+            ]
         
-        extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
-        self.image_files = []
-        
-        for f in os.listdir(e.path):
-            if os.path.splitext(f)[1].lower() in extensions:
-                self.image_files.append(f)
-        
-        for img in sorted(self.image_files)[:100]:
+        # Nur die ersten Namen anzeigen - Teil-Sortierung statt alle zu sortieren
+        self.image_file_list.controls = [
+            Row([
+                ft.Icon(Icons.IMAGE, size=16, color=Colors.BLUE_400),
+                Text(img, size=12),
+            ], spacing=10)
+            for img in heapq.nsmallest(self.IMAGE_LIST_LIMIT, self.image_files)
+        ]
+        hidden = len(self.image_files) - self.IMAGE_LIST_LIMIT
+        if hidden > 0:
             self.image_file_list.controls.append(
-                Row([
-                    ft.Icon(Icons.IMAGE, size=16, color=Colors.BLUE_400),
-                    Text(img, size=12),
-                ], spacing=10)
+                Text(f"... und {hidden} weitere", size=12, italic=True, color=Colors.GREY_500)
             )
         
-        self.image_count_text.value = f"{len(self.image_files)} Bilder gefunden"
-        self.log(f"Bildordner: {len(self.image_files)} Bilder gefunden")
-        self.page.update()
+        with self._batched_update():
+            self.image_count_text.value = f"{len(self.image_files)} Bilder gefunden"
+            self.log(f"Bildordner: {len(self.image_files)} Bilder gefunden")
     
     def on_template_loaded(self, e: FilePickerResultEvent):
         """Vorlage geladen"""
@@ -3865,8 +5419,8 @@ class ERPNextImporterApp:
             return
         
         try:
-            with open(e.files[0].path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(e.files[0].path, 'rb') as f:
+                data = json_loads(f.read())
             
             self.current_template = ImportTemplate.from_dict(data)
             
@@ -3878,6 +5432,7 @@ class ERPNextImporterApp:
             self.field_mappings.clear()
             for mapping in self.current_template.mappings:
                 self.field_mappings[mapping.source_column] = mapping
+            self._reindex_mappings()
             
             self.log(f"Vorlage geladen: {self.current_template.name}")
             
@@ -3910,8 +5465,8 @@ class ERPNextImporterApp:
             filepath = os.path.join("templates", filename)
             os.makedirs("templates", exist_ok=True)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(template.to_dict(), f, indent=2, ensure_ascii=False)
+            with open(filepath, 'wb') as f:
+                f.write(json_dumps(template.to_dict(), pretty=True))
             
             self.log(f"Vorlage gespeichert: {filepath}")
             self.page.close(dlg)
@@ -3968,8 +5523,7 @@ class ERPNextImporterApp:
         dry_run = self.dry_run.value
         self.log(f"=== Import gestartet ({'DRY RUN' if dry_run else 'LIVE'}) ===")
         
-        thread = threading.Thread(target=self._run_import, args=(dry_run,))
-        thread.start()
+        self._start_api_thread(self._run_import, dry_run)
     
     def _run_import(self, dry_run: bool):
         """Import-Thread - Optimiert für große Dateien"""
@@ -3979,6 +5533,8 @@ class ERPNextImporterApp:
 
         mode = self.import_mode.value
         import_type = self.import_type.value
+        # Typ-Prüfungen einmal je Import statt je Zeile
+        is_item_import = import_type in ("artikel", "preise")
 
         # Generator-Funktion zum zeilenweisen Lesen
         def read_data():
@@ -3986,91 +5542,286 @@ class ERPNextImporterApp:
             ext = os.path.splitext(self.source_file)[1].lower()
 
             if ext == ".xml":
-                # XML: Verwende bereits geladene Daten
-                for row in self.source_data:
-                    yield row
+                # XML: erneut streamen - source_data enthält nur die Vorschau
+                yield from BMECatParser().iter_products(self.source_file)
             else:
                 # CSV: Lese komplett neu für den Import (Generator-Pattern)
                 delimiter = self.csv_delimiter.value
                 encoding = self.csv_encoding.value
-                with open(self.source_file, 'r', encoding=encoding, errors='replace') as f:
-                    reader = csv.DictReader(f, delimiter=delimiter)
-                    for row in reader:
-                        yield row
+                yield from iter_csv_rows(self.source_file, delimiter, encoding)
 
         total = self.total_rows
 
-        for i, row in enumerate(read_data()):
+        # Neue Artikel und Attribute sammeln und blockweise per insert_many anlegen
+        batch_size = 200
+        pending_items: List[Dict] = []
+        pending_codes = set()
+        pending_updates: List[Tuple[str, Dict]] = []
+        pending_update_codes = set()
+        pending_attributes: List[Dict] = []
+        pending_variants: List[Tuple] = []
+
+        def flush_items() -> Tuple[int, int]:
+            """Legt gesammelte Artikel samt Standardpreis an, liefert (erfolgreich, fehler)"""
+            if not pending_items:
+                return 0, 0
+            ok_count = err_count = 0
+            prices = []
+            for item, (ok, msg) in zip(pending_items, self.api.create_items_bulk(pending_items)):
+                if ok:
+                    ok_count += 1
+                    if "standard_rate" in item:
+                        prices.append((item["item_code"], item["standard_rate"]))
+                else:
+                    err_count += 1
+                    self.log(f"Fehler {item.get('item_code', '')}: {msg}", error=True)
+            if prices:
+                self.api.create_item_prices_bulk(prices)
+            pending_items.clear()
+            pending_codes.clear()
+            return ok_count, err_count
+
+        def flush_updates() -> Tuple[int, int]:
+            """Aktualisiert gesammelte bestehende Artikel, liefert (erfolgreich, fehler)"""
+            if not pending_updates:
+                return 0, 0
+            ok_count = err_count = 0
+            recreate = False
+            for (code, data), (ok, msg) in zip(pending_updates,
+                                               self.api.update_items_bulk(pending_updates)):
+                if ok:
+                    ok_count += 1
+                elif mode == "upsert" and self.api.get_item(code) is None:
+                    # Veralteter Cache-Eintrag: Artikel wurde in ERPNext gelöscht - neu anlegen
+                    pending_items.append(data)
+                    pending_codes.add(code)
+                    recreate = True
+                else:
+                    err_count += 1
+                    self.log(f"Fehler {code}: {msg}", error=True)
+            pending_updates.clear()
+            pending_update_codes.clear()
+            if recreate:
+                created_ok, created_err = flush_items()
+                ok_count += created_ok
+                err_count += created_err
+            return ok_count, err_count
+
+        def flush_variants() -> Tuple[int, int]:
+            """Legt gesammelte Varianten parallel an, liefert (erfolgreich, fehler)"""
+            if not pending_variants:
+                return 0, 0
+            ok_count = err_count = 0
+            # HTTP parallel in Worker-Threads, Auswertung/Log hier in Eingabereihenfolge
+            for spec, (ok, msg) in zip(pending_variants,
+                                       self.api.create_variants_bulk(pending_variants)):
+                if ok:
+                    ok_count += 1
+                    self.log(f"Variante: {msg}")
+                else:
+                    err_count += 1
+                    self.log(f"Fehler Variante {spec[1]}: {msg}", error=True)
+            pending_variants.clear()
+            return ok_count, err_count
+
+        def flush_attributes() -> Tuple[int, int]:
+            """Legt gesammelte Attribute an, liefert (erfolgreich, fehler)"""
+            if not pending_attributes:
+                return 0, 0
+            ok_count = err_count = 0
+            for spec, (ok, msg) in zip(pending_attributes,
+                                       self.api.create_attributes_bulk(pending_attributes)):
+                if ok:
+                    ok_count += 1
+                    self.log(f"Attribut: {msg}")
+                else:
+                    err_count += 1
+                    self.log(f"Fehler Attribut {spec['attribute_name']}: {msg}", error=True)
+            pending_attributes.clear()
+            return ok_count, err_count
+
+        # Kategorie-Cache einmalig füllen - Hierarchie-Prüfungen pro Zeile ohne Request
+        if self.api and not dry_run and any(
+                ERPNEXT_ITEM_FIELDS.get(m.target_field, {}).get("hierarchy")
+                for m in self.field_mappings.values()):
+            self.api.warm_item_group_cache()
+        # Aufgelöste Hierarchien je Import - gleiche Kategorie-Pfade nur einmal prüfen/anlegen
+        category_cache: Dict[Tuple[str, ...], str] = {}
+
+        # Mapping einmal in Tupel auflösen - die Zeilenschleife braucht weder
+        # Attributzugriffe noch die if/elif-Kette der Transformationen
+        compiled_mappings = [
+            (source_col, mapping.target_field, TRANSFORMS.get(mapping.transform), mapping.default_value)
+            for source_col, mapping in self.field_mappings.items()
+        ]
+
+        def map_fields(row: Dict) -> Dict:
+            """Wendet Feld-Mapping und Transformationen auf eine Quellzeile an"""
+            item_data = {}
+            row_get = row.get
+            for source_col, target_field, transform, default_value in compiled_mappings:
+                value = row_get(source_col, "") or default_value
+                if transform is not None:
+                    value = transform(value)
+                if value:
+                    item_data[target_field] = value
+            return item_data
+
+        # Existenzprüfung blockweise vorab - get_item beantwortet danach aus dem Cache
+        probe_items = bool(self.api) and not dry_run and is_item_import
+
+        def mapped_rows():
+            """Liefert (Zeile, gemappte Daten) und prüft Artikelnummern je Block gesammelt"""
+            rows = iter(read_data())
+            block_size = self.api.EXISTS_CHUNK_SIZE if probe_items else batch_size
+            while True:
+                block = [(row, map_fields(row)) for row in islice(rows, block_size)]
+                if not block:
+                    return
+                if probe_items:
+                    self.api.which_items_exist([data["item_code"] for _, data in block if data.get("item_code")])
+                yield from block
+
+        # Zeilen-Handler je Import-Typ - liefern (erfolgreich, fehler, übersprungen)
+        def handle_item(i: int, identifier: str, item_data: Dict) -> Tuple[int, int, int]:
+            ok_total = err_total = 0
+            # Artikelnummer doppelt in der Datei: erst den Block anlegen
+            if item_data.get("item_code", "") in pending_codes:
+                ok_total, err_total = flush_items()
+            # Ebenso bei Updates: Blöcke laufen parallel, die letzte Zeile soll gewinnen
+            if item_data.get("item_code", "") in pending_update_codes:
+                ok_count, err_count = flush_updates()
+                ok_total += ok_count
+                err_total += err_count
+
+            existing = self.api.get_item(item_data.get("item_code", ""))
+
+            if existing and mode == "create":
+                return ok_total, err_total, 1
+            if not existing and mode == "update":
+                return ok_total, err_total, 1
+            if existing:
+                pending_updates.append((item_data["item_code"], item_data))
+                pending_update_codes.add(item_data["item_code"])
+                if len(pending_updates) >= batch_size:
+                    ok_count, err_count = flush_updates()
+                    ok_total += ok_count
+                    err_total += err_count
+            else:
+                pending_items.append(item_data)
+                pending_codes.add(item_data.get("item_code", ""))
+                if len(pending_items) >= batch_size:
+                    ok_count, err_count = flush_items()
+                    ok_total += ok_count
+                    err_total += err_count
+            return ok_total, err_total, 0
+
+        def handle_category(i: int, identifier: str, item_data: Dict) -> Tuple[int, int, int]:
+            ok, msg = self.api.create_item_group(item_data)
+            if ok:
+                return 1, 0, 0
+            self.log(f"Fehler {identifier}: {msg}", error=True)
+            return 0, 1, 0
+
+        def handle_attribute(i: int, identifier: str, item_data: Dict) -> Tuple[int, int, int]:
+            attr_name = item_data.get("attribute_name", "")
+            if not attr_name:
+                self.log(f"Zeile {i+1}: Kein Attribut-Name", error=True)
+                return 0, 1, 0
+
+            values_str = item_data.get("attribute_values", "")
+            values = [v.strip() for v in values_str.split(",") if v.strip()] if values_str else []
+
+            numeric = item_data.get("numeric_values", False)
+            if isinstance(numeric, str):
+                numeric = numeric.lower() in ("1", "true", "ja", "yes")
+
+            pending_attributes.append({
+                "attribute_name": attr_name,
+                "values": values,
+                "numeric": numeric,
+                "from_range": item_data.get("from_range"),
+                "to_range": item_data.get("to_range"),
+                "increment": item_data.get("increment")
+            })
+            if len(pending_attributes) >= batch_size:
+                ok_count, err_count = flush_attributes()
+                return ok_count, err_count, 0
+            return 0, 0, 0
+
+        def handle_variant(i: int, identifier: str, item_data: Dict) -> Tuple[int, int, int]:
+            variant_code = item_data.get("item_code", "")
+            template = item_data.get("variant_of", "")
+
+            if not variant_code or not template:
+                self.log(f"Zeile {i+1}: Varianten-Code oder Vorlage fehlt", error=True)
+                return 0, 1, 0
+
+            # Sammle Attribute
+            attributes = {}
+            # Standard-Attribute
+            if item_data.get("attribute_color"):
+                attributes["Farbe"] = item_data["attribute_color"]
+            if item_data.get("attribute_size"):
+                attributes["Größe"] = item_data["attribute_size"]
+            if item_data.get("attribute_material"):
+                attributes["Material"] = item_data["attribute_material"]
+
+            # Dynamische Attribute (Name:Wert Format)
+            for key in ["attribute_1", "attribute_2", "attribute_3"]:
+                if item_data.get(key) and ":" in str(item_data[key]):
+                    parts = str(item_data[key]).split(":", 1)
+                    attributes[parts[0].strip()] = parts[1].strip()
+
+            if not attributes:
+                self.log(f"Zeile {i+1}: Keine Attribute für Variante", error=True)
+                return 0, 1, 0
+
+            # Zusätzliche Daten
+            extra_data = {}
+            if item_data.get("standard_rate"):
+                extra_data["standard_rate"] = item_data["standard_rate"]
+            if item_data.get("gtin"):
+                extra_data["gtin"] = item_data["gtin"]
+
+            pending_variants.append((
+                template,
+                variant_code,
+                attributes,
+                item_data.get("item_name"),
+                extra_data
+            ))
+            if len(pending_variants) >= batch_size:
+                ok_count, err_count = flush_variants()
+                return ok_count, err_count, 0
+            return 0, 0, 0
+
+        # Handler einmal wählen - die Zeilenschleife verzweigt nicht mehr nach Typ
+        handle_row = {
+            "artikel": handle_item,
+            "preise": handle_item,
+            "kategorien": handle_category,
+            "attribute": handle_attribute,
+            "varianten": handle_variant,
+        }.get(import_type) if self.api else None
+
+        # JTL-Nachbearbeitung einmal zusammenstellen - Brutto-Divisor aus dem Steuersatz der Config
+        postprocess_steps = build_jtl_postprocess(
+            {target_field for _, target_field, _, _ in compiled_mappings},
+            1 + (self.config.default_tax_rate / 100)
+        )
+
+        last_ui = 0.0
+        for i, (row, item_data) in enumerate(mapped_rows()):
             try:
-                # Daten transformieren
-                item_data = {}
-                for source_col, mapping in self.field_mappings.items():
-                    value = row.get(source_col, "") or mapping.default_value
-                    
-                    # Transformation
-                    if mapping.transform == "trim":
-                        value = str(value).strip()
-                    elif mapping.transform == "uppercase":
-                        value = str(value).upper()
-                    elif mapping.transform == "lowercase":
-                        value = str(value).lower()
-                    elif mapping.transform == "number":
-                        try:
-                            value = float(str(value).replace(",", ".").replace(" ", ""))
-                        except:
-                            value = 0.0
-                    elif mapping.transform == "bool":
-                        value = str(value).lower() in ("1", "true", "ja", "yes", "y")
-                    elif mapping.transform == "html_strip":
-                        value = re.sub(r'<[^>]+>', '', str(value))
-                    
-                    if value:
-                        item_data[mapping.target_field] = value
-
-                # ==================== JTL-SPEZIFISCHE FELDVERARBEITUNG ====================
-
-                # VK Brutto -> standard_rate (Netto konvertieren mit konfigurierbarem Steuersatz)
-                if "standard_rate_brutto" in item_data:
-                    brutto = item_data.pop("standard_rate_brutto")
-                    try:
-                        brutto_val = float(str(brutto).replace(",", ".").replace(" ", ""))
-                        # Brutto zu Netto (Steuersatz aus Config)
-                        tax_rate = self.config.default_tax_rate
-                        tax_divisor = 1 + (tax_rate / 100)
-                        netto = round(brutto_val / tax_divisor, 2)
-                        item_data["standard_rate"] = netto
-                    except:
-                        pass
-
-                # Barcode/EAN -> gtin (wird in create_item in barcodes-Tabelle konvertiert)
-                if "barcode" in item_data:
-                    barcode = item_data.pop("barcode")
-                    if barcode and str(barcode).strip():
-                        # Leere oder ungültige Barcodes filtern
-                        barcode_str = str(barcode).strip()
-                        if len(barcode_str) >= 8 and barcode_str not in ("0", ""):
-                            item_data["gtin"] = barcode_str
-
-                # Aktiv-Status invertieren (JTL: aktiv=1 -> ERPNext: disabled=0)
-                if "disabled" in item_data:
-                    aktiv = item_data["disabled"]
-                    if isinstance(aktiv, str):
-                        # Wenn "aktiv" gemappt wurde, invertieren
-                        is_aktiv = aktiv.lower() in ("1", "true", "ja", "yes", "y", "aktiv")
-                        item_data["disabled"] = 0 if is_aktiv else 1
-                    elif isinstance(aktiv, bool):
-                        item_data["disabled"] = 0 if aktiv else 1
-
-                # description_html -> description (Alias)
-                if "description_html" in item_data and "description" not in item_data:
-                    item_data["description"] = item_data.pop("description_html")
-                elif "description_html" in item_data:
-                    item_data.pop("description_html")
+                # JTL-spezifische Feldverarbeitung (nur die Schritte der gemappten Felder)
+                for step in postprocess_steps:
+                    step(item_data)
 
                 identifier = item_data.get("item_code") or item_data.get("item_group_name", f"Row {i+1}")
 
                 # Kategorie-Hierarchie verarbeiten (für Artikel-Import)
-                if import_type in ["artikel", "preise"]:
+                if is_item_import:
                     category_levels = []
 
                     # Prüfen auf category_level_1, category_level_2, etc.
@@ -4089,10 +5840,17 @@ class ERPNextImporterApp:
 
                     # Wenn Kategorie-Hierarchie vorhanden, erstellen und item_group setzen
                     if category_levels and self.api and not dry_run:
-                        final_category = self.api.ensure_category_hierarchy(
-                            category_levels,
-                            log_callback=self.log
-                        )
+                        key = tuple(category_levels)
+                        final_category = category_cache.get(key)
+                        if final_category is None:
+                            final_category = self.api.ensure_category_hierarchy(
+                                category_levels,
+                                log_callback=self.log
+                            )
+                            # Nur vollständig aufgelöste Pfade merken - bei einem Fehler liefert
+                            # ensure_category_hierarchy die Elterngruppe, die nächste Zeile versucht es erneut
+                            if final_category.lower() == str(category_levels[-1]).strip().lower():
+                                category_cache[key] = final_category
                         item_data["item_group"] = final_category
                     elif category_levels and dry_run:
                         self.log(f"[DRY] Kategorie-Hierarchie: {' > '.join(category_levels)}")
@@ -4102,139 +5860,36 @@ class ERPNextImporterApp:
                 if dry_run:
                     self.log(f"[DRY] {identifier}: {list(item_data.keys())}")
                     success += 1
+                elif handle_row is not None:
+                    ok_count, err_count, skip_count = handle_row(i, identifier, item_data)
+                    success += ok_count
+                    errors += err_count
+                    skipped += skip_count
                 else:
-                    if self.api:
-                        if import_type in ["artikel", "preise"]:
-                            existing = self.api.get_item(item_data.get("item_code", ""))
-
-                            if existing and mode == "create":
-                                skipped += 1
-                            elif not existing and mode == "update":
-                                skipped += 1
-                            elif existing:
-                                ok, msg = self.api.update_item(item_data["item_code"], item_data)
-                                if ok:
-                                    success += 1
-                                else:
-                                    errors += 1
-                                    self.log(f"Fehler {identifier}: {msg}", error=True)
-                            else:
-                                ok, msg = self.api.create_item(item_data)
-                                if ok:
-                                    success += 1
-                                    # Preis erstellen
-                                    if "standard_rate" in item_data:
-                                        self.api.create_item_price(
-                                            item_data["item_code"],
-                                            item_data["standard_rate"]
-                                        )
-                                else:
-                                    errors += 1
-                                    self.log(f"Fehler {identifier}: {msg}", error=True)
-
-                        elif import_type == "kategorien":
-                            ok, msg = self.api.create_item_group(item_data)
-                            if ok:
-                                success += 1
-                            else:
-                                errors += 1
-                                self.log(f"Fehler {identifier}: {msg}", error=True)
-
-                        elif import_type == "attribute":
-                            # Attribut-Import
-                            attr_name = item_data.get("attribute_name", "")
-                            if not attr_name:
-                                errors += 1
-                                self.log(f"Zeile {i+1}: Kein Attribut-Name", error=True)
-                                continue
-
-                            values_str = item_data.get("attribute_values", "")
-                            values = [v.strip() for v in values_str.split(",") if v.strip()] if values_str else []
-
-                            numeric = item_data.get("numeric_values", False)
-                            if isinstance(numeric, str):
-                                numeric = numeric.lower() in ("1", "true", "ja", "yes")
-
-                            ok, msg = self.api.create_attribute(
-                                attr_name,
-                                values=values,
-                                numeric=numeric,
-                                from_range=item_data.get("from_range"),
-                                to_range=item_data.get("to_range"),
-                                increment=item_data.get("increment")
-                            )
-                            if ok:
-                                success += 1
-                                self.log(f"Attribut: {msg}")
-                            else:
-                                errors += 1
-                                self.log(f"Fehler Attribut {attr_name}: {msg}", error=True)
-
-                        elif import_type == "varianten":
-                            # Varianten-Import
-                            variant_code = item_data.get("item_code", "")
-                            template = item_data.get("variant_of", "")
-
-                            if not variant_code or not template:
-                                errors += 1
-                                self.log(f"Zeile {i+1}: Varianten-Code oder Vorlage fehlt", error=True)
-                                continue
-
-                            # Sammle Attribute
-                            attributes = {}
-                            # Standard-Attribute
-                            if item_data.get("attribute_color"):
-                                attributes["Farbe"] = item_data["attribute_color"]
-                            if item_data.get("attribute_size"):
-                                attributes["Größe"] = item_data["attribute_size"]
-                            if item_data.get("attribute_material"):
-                                attributes["Material"] = item_data["attribute_material"]
-
-                            # Dynamische Attribute (Name:Wert Format)
-                            for key in ["attribute_1", "attribute_2", "attribute_3"]:
-                                if item_data.get(key) and ":" in str(item_data[key]):
-                                    parts = str(item_data[key]).split(":", 1)
-                                    attributes[parts[0].strip()] = parts[1].strip()
-
-                            if not attributes:
-                                errors += 1
-                                self.log(f"Zeile {i+1}: Keine Attribute für Variante", error=True)
-                                continue
-
-                            # Zusätzliche Daten
-                            extra_data = {}
-                            if item_data.get("standard_rate"):
-                                extra_data["standard_rate"] = item_data["standard_rate"]
-                            if item_data.get("gtin"):
-                                extra_data["gtin"] = item_data["gtin"]
-
-                            ok, msg = self.api.create_variant(
-                                template,
-                                variant_code,
-                                attributes,
-                                item_data.get("item_name"),
-                                extra_data
-                            )
-                            if ok:
-                                success += 1
-                                self.log(f"Variante: {msg}")
-                            else:
-                                errors += 1
-                                self.log(f"Fehler Variante {variant_code}: {msg}", error=True)
-                    else:
-                        self.log(f"[NO API] {identifier}")
-                        success += 1
+                    self.log(f"[NO API] {identifier}")
+                    success += 1
 
-                # Progress - Optimiert: Update nur alle 10 Zeilen (bei großen Dateien)
-                if (i + 1) % 10 == 0 or (i + 1) == total:
+                # Progress - zeitbasiert gedrosselt statt je Zeile bzw. alle N Zeilen
+                now = time.monotonic()
+                if now - last_ui >= self.PROGRESS_INTERVAL or (i + 1) == total:
+                    last_ui = now
                     progress = (i + 1) / total
                     self.progress_bar.value = progress
                     self.progress_text.value = f"{i + 1}/{total} ({int(progress * 100)}%)"
-                    self.page.update()
+                    self._update()
 
             except Exception as ex:
                 errors += 1
                 self.log(f"Fehler Zeile {i+1}: {ex}", error=True)
+
+        # Restliche gesammelte Datensätze anlegen
+        for flush in (flush_items, flush_updates, flush_attributes, flush_variants):
+            try:
+                ok_count, err_count = flush()
+                success += ok_count
+                errors += err_count
+            except Exception as ex:
+                self.log(f"Fehler beim Bulk-Import: {ex}", error=True)
         
         self.log(f"=== Import abgeschlossen ===")
         self.log(f"✓ Erfolgreich: {success} | ✗ Fehler: {errors} | ⊘ Übersprungen: {skipped}")
@@ -4257,8 +5912,7 @@ class ERPNextImporterApp:
         self.image_progress.visible = True
         self.image_progress.value = 0
         
-        thread = threading.Thread(target=self._run_image_import)
-        thread.start()
+        self._start_api_thread(self._run_image_import)
     
     def _run_image_import(self):
         """Bilder-Import Thread"""
@@ -4271,58 +5925,50 @@ class ERPNextImporterApp:
         
         self.log(f"=== Bilder-Import gestartet ({mode}) ===")
         
-        # Gruppiere Bilder nach Artikelnummer
-        article_images: Dict[str, List[str]] = {}
-
+        # Gruppiere Bilder nach Artikelnummer - Zuordnungsregel einmal wählen
+        def jtl_article_nr(basename: str) -> str:
+            # JTL-Format: 0130287-300S10000-1.jpg -> 0130287-300S10000
+            # Das letzte -N ist die Bildnummer, sonst gesamter Dateiname
+            head, sep, tail = basename.rpartition("-")
+            return head if sep and tail.isdigit() else basename
+
+        extract_article_nr = {
+            # Exakter Match: Dateiname = Artikelnummer
+            "artikelnummer": lambda basename: basename,
+            # ART123_1.jpg -> ART123
+            "artikelnummer_prefix": lambda basename: basename.rsplit("_", 1)[0],
+            "jtl_format": jtl_article_nr,
+        }.get(match_mode,
+              # artikelnummer_dash: ART123-1.jpg -> ART123
+              lambda basename: basename.rsplit("-", 1)[0])
+
+        splitext = os.path.splitext
+        article_images: Dict[str, List[str]] = defaultdict(list)
         for img_file in self.image_files:
-            basename = os.path.splitext(img_file)[0]
-
-            if match_mode == "artikelnummer":
-                # Exakter Match: Dateiname = Artikelnummer
-                article_nr = basename
-            elif match_mode == "artikelnummer_prefix":
-                # ART123_1.jpg -> ART123
-                article_nr = basename.rsplit("_", 1)[0]
-            elif match_mode == "jtl_format":
-                # JTL-Format: 0130287-300S10000-1.jpg -> 0130287-300S10000
-                # Das letzte -N ist die Bildnummer
-                parts = basename.rsplit("-", 1)
-                if len(parts) == 2 and parts[1].isdigit():
-                    article_nr = parts[0]
-                else:
-                    # Fallback: Gesamter Dateiname
-                    article_nr = basename
-            else:
-                # artikelnummer_dash: ART123-1.jpg -> ART123
-                article_nr = basename.rsplit("-", 1)[0]
-
-            if article_nr not in article_images:
-                article_images[article_nr] = []
-            article_images[article_nr].append(img_file)
+            article_images[extract_article_nr(splitext(img_file)[0])].append(img_file)
         
-        processed = 0
-        for article_nr, images in article_images.items():
+        # Existenz blockweise beim Server bestätigen - get_item antwortet danach aus dem Speicher
+        # statt aus dem persistenten Cache, der in ERPNext gelöschte Artikel noch enthalten kann
+        self.api.which_items_exist(list(article_images))
+        
+        def process_article(article_nr: str, images: List[str]) -> Tuple[int, int, int, List[str]]:
+            """Lädt die Bilder eines Artikels hoch: (erfolgreich, fehler, verarbeitet, Fehlermeldungen)"""
+            ok_count = err_count = done = 0
+            messages: List[str] = []
             try:
                 # Prüfe ob Artikel existiert
                 if not self.api.get_item(article_nr):
-                    self.log(f"Artikel nicht gefunden: {article_nr}", error=True)
-                    errors += len(images)
-                    processed += len(images)
-                    continue
+                    return 0, len(images), len(images), [f"Artikel nicht gefunden: {article_nr}"]
                 
                 # Bei replace: Erst alte löschen
                 if mode == "replace":
                     self.api.delete_item_attachments(article_nr)
                 elif mode == "delete":
                     ok, msg = self.api.delete_item_attachments(article_nr)
-                    if ok:
-                        success += 1
-                    processed += 1
-                    continue
+                    return (1 if ok else 0), 0, 1, []
                 
-                # Bilder hochladen
-                images_sorted = sorted(images)
-                for idx, img_file in enumerate(images_sorted):
+                # Bilder hochladen (je Artikel der Reihe nach - das erste wird Hauptbild)
+                for idx, img_file in enumerate(sorted(images)):
                     img_path = os.path.join(self.image_folder, img_file)
                     
                     if idx == 0:
@@ -4333,23 +5979,39 @@ class ERPNextImporterApp:
                         ok, msg = self.api.attach_file(article_nr, img_path)
                     
                     if ok:
-                        success += 1
+                        ok_count += 1
                     else:
-                        errors += 1
-                        self.log(f"Fehler {img_file}: {msg}", error=True)
-                    
-                    processed += 1
-                    
-                    # Progress
-                    progress = processed / total
-                    self.image_progress.value = progress
-                    self.image_status.value = f"{processed}/{total}"
-                    self.page.update()
-                    
+                        err_count += 1
+                        messages.append(f"Fehler {img_file}: {msg}")
+                    done += 1
             except Exception as ex:
-                errors += len(images)
-                processed += len(images)
-                self.log(f"Fehler {article_nr}: {ex}", error=True)
+                err_count += len(images) - done
+                done = len(images)
+                messages.append(f"Fehler {article_nr}: {ex}")
+            return ok_count, err_count, done, messages
+        
+        # Artikel parallel verarbeiten - Upload-Latenz statt Dateizugriff dominiert
+        processed = 0
+        last_ui = 0.0
+        workers = max(1, min(self.IMAGE_UPLOAD_WORKERS, len(article_images)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_article, article_nr, images)
+                       for article_nr, images in article_images.items()]
+            for future in as_completed(futures):
+                ok_count, err_count, done, messages = future.result()
+                success += ok_count
+                errors += err_count
+                processed += done
+                for message in messages:
+                    self.log(message, error=True)
+                
+                # Progress - zeitbasiert gedrosselt, das Ende meldet der Abschluss unten
+                now = time.monotonic()
+                if now - last_ui >= self.PROGRESS_INTERVAL:
+                    last_ui = now
+                    self.image_progress.value = processed / total
+                    self.image_status.value = f"{processed}/{total}"
+                    self._update()
         
         self.log(f"=== Bilder-Import abgeschlossen ===")
         self.log(f"✓ Erfolgreich: {success} | ✗ Fehler: {errors}")
@@ -4365,8 +6027,8 @@ class ERPNextImporterApp:
         config_path = "erpnext_config.json"
         if os.path.exists(config_path):
             try:
-                with open(config_path, 'r') as f:
-                    data = json.load(f)
+                with open(config_path, 'rb') as f:
+                    data = json_loads(f.read())
                 # Filter out None values to use dataclass defaults instead
                 filtered_data = {k: v for k, v in data.items() if v is not None}
                 self.config = ERPNextConfig(**filtered_data)
@@ -4431,8 +6093,8 @@ class ERPNextImporterApp:
             "request_timeout": self.config.request_timeout,
         }
 
-        with open("erpnext_config.json", 'w') as f:
-            json.dump(config_data, f, indent=2)
+        with open("erpnext_config.json", 'wb') as f:
+            f.write(json_dumps(config_data, pretty=True))
 
         # Gemini API initialisieren wenn Key vorhanden
         if self.config.gemini_api_key:
@@ -4530,9 +6192,21 @@ class ERPNextImporterApp:
 
         self.page.update()
     
+    def _start_api_thread(self, target, *args):
+        """Startet einen Hintergrund-Job, der self.api benutzt, und merkt ihn sich"""
+        thread = threading.Thread(target=target, args=args)
+        self._api_threads = [t for t in self._api_threads if t.is_alive()]
+        self._api_threads.append(thread)
+        thread.start()
+    
     def test_connection(self, e=None):
         """Testet Verbindung"""
         self.save_config()
+        # Verbindungspool der alten Instanz nur freigeben, wenn kein Hintergrund-Job
+        # sie noch benutzt - sonst räumt der Garbage Collector sie später ab
+        self._api_threads = [t for t in self._api_threads if t.is_alive()]
+        if self.api and not self._api_threads:
+            self.api.close()
         self.api = ERPNextAPI(self.config)
 
         success, msg = self.api.test_connection()
@@ -4566,26 +6240,45 @@ class ERPNextImporterApp:
         entry = f"[{timestamp}] {message}"
         self.log_entries.append(entry)
 
-        self.log_list.controls.append(
+        self._log_controls.append(
             Row([
                 ft.Icon(icon, size=14, color=icon_color),
                 Text(entry, size=12, color=color, selectable=True, expand=True),
             ], spacing=8)
         )
+        self._log_dirty = True
 
-        if len(self.log_list.controls) > 500:
-            self.log_list.controls.pop(0)
-
-        # Auto-update wenn nicht im Import - mit Fehlerbehandlung
+        # Auto-update wenn nicht im Import - gedrosselt
         if not self.is_importing:
-            try:
-                self.page.update()
-            except:
-                pass
+            self._schedule_log_flush()
+    
+    def _schedule_log_flush(self):
+        """
+        Erster Eintrag wird sofort übertragen, weitere Einträge innerhalb von
+        LOG_FLUSH_INTERVAL sammelt ein Timer zu einem einzigen Update.
+        """
+        with self._log_lock:
+            now = time.monotonic()
+            flush_now = now - self._last_log_flush >= self.LOG_FLUSH_INTERVAL
+            if flush_now:
+                self._last_log_flush = now
+            elif self._log_flush_timer is None:
+                self._log_flush_timer = threading.Timer(self.LOG_FLUSH_INTERVAL, self._flush_log)
+                self._log_flush_timer.daemon = True
+                self._log_flush_timer.start()
+        if flush_now:
+            self._update()
+    
+    def _flush_log(self):
+        with self._log_lock:
+            self._log_flush_timer = None
+            self._last_log_flush = time.monotonic()
+        self._update()
     
     def clear_log(self, e=None):
         """Leert Log"""
         self.log_entries.clear()
+        self._log_controls.clear()
         self.log_list.controls.clear()
         self.page.update()
     
@@ -4595,8 +6288,9 @@ class ERPNextImporterApp:
         filepath = os.path.join("logs", filename)
         os.makedirs("logs", exist_ok=True)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write("\n".join(self.log_entries))
+        # Zeilenweise in einen großen Puffer statt einen Gesamt-String aufzubauen
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(entry + "\n" for entry in self.log_entries)
         
         self.log(f"Log exportiert: {filepath}")
 
@@ -2,16 +2,21 @@
 ERPNext REST API Client mit verbesserter Fehlerbehandlung
 """
 
-import json
 import time
 import logging
 import os
 import mimetypes
-from typing import Optional, Dict, List, Tuple, Any
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, List, Set, Tuple, Any, Iterator
 
+from .cache import LRUCache, PersistentCache
 from .config import ERPNextConfig
 from .fields import ERPNEXT_ITEM_FIELDS, UOM_MAPPING
-from .utils import is_valid_barcode, detect_barcode_type
+from .utils import (
+    is_valid_barcode, detect_barcode_type, json_loads, json_dumps, json_param
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,21 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# Optional requests-toolbelt für gestreamte Datei-Uploads (Fallback: Body im Speicher)
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+# Optional httpx mit HTTP/2 (h2) für parallele Lese-Requests über eine Verbindung
+try:
+    import httpx
+    import h2  # noqa: F401 - von httpx für http2=True benötigt
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 
 class ERPNextAPIError(Exception):
     """Spezifische Fehlerklasse für ERPNext API Fehler mit benutzerfreundlichen Meldungen"""
@@ -45,16 +65,45 @@ class ERPNextAPIError(Exception):
         return " | ".join(parts)
 
 
+# Typentabelle einmal beim Import laden statt beim ersten Upload
+mimetypes.init()
+
+
+@lru_cache(maxsize=64)
+def _guess_mime(ext: str) -> str:
+    """MIME-Typ je Dateiendung - Bildkataloge nutzen nur eine Handvoll Endungen"""
+    return mimetypes.guess_type("f" + ext)[0] or 'application/octet-stream'
+
+
+# Trennzeichen in Kategoriepfaden nach Priorität - es gilt nur das erste vorkommende,
+# damit Namen wie "Haus/Garten > Grill" oder "Audio | Hi-Fi > Boxen" nicht zerfallen
+_CATEGORY_SEPARATORS = (" > ", " -> ", " >> ", " / ", "/", ">", "|")
+
+# Standard-Feldlisten der Exporte - einmalig serialisiert
+_EXPORT_ITEM_GROUP_FIELDS_JSON = json_param(["name", "item_group_name", "parent_item_group",
+                                             "is_group", "description"])
+
+
 class ERPNextAPI:
     """ERPNext REST API Client - Vollständige Implementation mit verbesserter Fehlerbehandlung"""
+
+    POOL_CONNECTIONS = 50
+    POOL_MAXSIZE = 100
+    # Parallele Einzel-Requests (Export, Löschen) - bleibt unter POOL_MAXSIZE
+    PARALLEL_WORKERS = 16
     
     def __init__(self, config: ERPNextConfig):
         self.config = config
         self.session = self._create_session() if REQUESTS_AVAILABLE else None
-        self._item_cache: Dict[str, str] = {}
-        self._item_group_cache: Dict[str, str] = {}
+        self._item_cache = LRUCache()
+        # Negativ-Cache: in dieser Sitzung per 404 als nicht vorhanden erkannte Artikel
+        self._missing_items: Set[str] = set()
+        self._item_group_cache = LRUCache()
         self._attribute_cache: Dict[str, bool] = {}
         self._uom_cache: Dict[str, str] = {}
+        self._persistent_cache = PersistentCache(config.base_url)
+        self._http2_client = None
+        self._http2_lock = threading.Lock()
         self._connection_healthy = False
         self._last_health_check = 0
     
@@ -66,24 +115,45 @@ class ERPNextAPI:
             total=self.config.max_retries,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "POST"]
+            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "POST"],
+            respect_retry_after_header=True,
+            # Nach dem letzten Versuch die Antwort zurückgeben, damit
+            # _parse_error_response die Server-Meldung auswerten kann
+            raise_on_status=False
+        )
+        # Großer Pool, damit parallele Import-Threads nicht auf Verbindungen warten
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=retry_strategy
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         session.headers.update(self.config.auth_header)
+        session.headers["Connection"] = "keep-alive"
+        # Frappe liefert Listen-Antworten komprimiert, wenn der Client es anbietet
+        session.headers["Accept-Encoding"] = "gzip, deflate"
         return session
+
+    def close(self):
+        """Schließt die Keep-Alive-Verbindungen der Session (und des HTTP/2-Clients)"""
+        if self.session is not None:
+            self.session.close()
+        with self._http2_lock:
+            if self._http2_client is not None:
+                self._http2_client.close()
+                self._http2_client = None
     
     def _parse_error_response(self, response) -> str:
         """Extrahiert benutzerfreundliche Fehlermeldung aus API-Antwort"""
         try:
-            error_data = response.json()
+            error_data = json_loads(response.content)
             if "message" in error_data:
                 return error_data["message"]
             if "_server_messages" in error_data:
-                messages = json.loads(error_data["_server_messages"])
+                messages = json_loads(error_data["_server_messages"])
                 if messages:
-                    msg = json.loads(messages[0])
+                    msg = json_loads(messages[0])
                     return msg.get("message", str(messages[0]))
             if "exc_type" in error_data:
                 exc_type = error_data["exc_type"]
@@ -96,10 +166,32 @@ class ERPNextAPI:
                 return f"ERPNext Fehler: {exc_type}"
         except:
             pass
-        return f"HTTP {response.status_code}: {response.reason}"
+        # requests: reason, httpx: reason_phrase
+        reason = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+        return f"HTTP {response.status_code}: {reason}"
+    
+    def _get_http2_client(self):
+        """HTTP/2-Client (httpx) für parallele GETs - gemultiplext über wenige Verbindungen"""
+        if not HTTPX_AVAILABLE:
+            return None
+        with self._http2_lock:
+            if self._http2_client is None:
+                self._http2_client = httpx.Client(
+                    http2=True,
+                    headers=self.config.auth_header,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+                    timeout=self.config.request_timeout
+                )
+            return self._http2_client
     
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
-        """Führt API-Request aus mit verbesserter Fehlerbehandlung"""
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      http2: bool = False) -> Dict:
+        """
+        Führt API-Request aus mit verbesserter Fehlerbehandlung.
+        
+        http2=True leitet GETs über den httpx-Client (falls installiert) - für
+        viele parallele Lese-Requests; Schreibzugriffe bleiben auf der Session.
+        """
         if not self.session:
             raise ERPNextAPIError(
                 "HTTP-Bibliothek nicht verfügbar",
@@ -110,12 +202,15 @@ class ERPNextAPI:
         timeout = self.config.request_timeout
         
         try:
-            if method == "GET":
+            client = self._get_http2_client() if http2 and method == "GET" else None
+            if client is not None:
+                response = client.get(url, params=data)
+            elif method == "GET":
                 response = self.session.get(url, params=data, timeout=timeout)
             elif method == "POST":
-                response = self.session.post(url, json=data, timeout=timeout)
+                response = self.session.post(url, data=json_dumps(data or {}), timeout=timeout)
             elif method == "PUT":
-                response = self.session.put(url, json=data, timeout=timeout)
+                response = self.session.put(url, data=json_dumps(data or {}), timeout=timeout)
             elif method == "DELETE":
                 response = self.session.delete(url, timeout=timeout)
             else:
@@ -135,7 +230,7 @@ class ERPNextAPI:
                 
                 raise ERPNextAPIError(error_msg, error_code=str(response.status_code), suggestion=suggestion)
             
-            return response.json() if response.text else {}
+            return json_loads(response.content) if response.content else {}
             
         except requests.exceptions.Timeout:
             raise ERPNextAPIError(
@@ -155,33 +250,65 @@ class ERPNextAPI:
             raise ERPNextAPIError(f"Unerwarteter Fehler: {str(e)}", original_error=e)
     
     def _call_method(self, method_name: str, data: Optional[Dict] = None,
-                     files: Optional[Dict] = None) -> Dict:
-        """Ruft Frappe-Methode auf mit verbesserter Fehlerbehandlung"""
+                     files: Optional[Dict] = None, stream: bool = False) -> Dict:
+        """
+        Ruft Frappe-Methode auf mit verbesserter Fehlerbehandlung.
+        
+        Mit stream=True (und requests-toolbelt) wird der Multipart-Body beim
+        Senden blockweise aus den Dateien gelesen statt vorher im Speicher gebaut.
+        """
         if not self.session:
             raise ERPNextAPIError("HTTP-Bibliothek nicht verfügbar")
         
         url = f"{self.config.base_url}/api/method/{method_name}"
         
         try:
-            if files:
+            if files and stream and TOOLBELT_AVAILABLE:
+                fields = {k: str(v) for k, v in (data or {}).items()}
+                fields.update(files)
+                encoder = MultipartEncoder(fields=fields)
+                headers = {"Authorization": self.config.auth_header["Authorization"],
+                           "Content-Type": encoder.content_type}
+                response = self.session.post(url, data=encoder,
+                                            headers=headers, timeout=60)
+            elif files:
                 headers = {"Authorization": self.config.auth_header["Authorization"]}
                 response = self.session.post(url, data=data, files=files, 
                                             headers=headers, timeout=60)
             else:
-                response = self.session.post(url, json=data, 
+                body = json_dumps(data) if data is not None else None
+                response = self.session.post(url, data=body,
                                             timeout=self.config.request_timeout)
             
             if response.status_code >= 400:
                 error_msg = self._parse_error_response(response)
                 raise ERPNextAPIError(error_msg, error_code=str(response.status_code))
             
-            return response.json() if response.text else {}
+            return json_loads(response.content) if response.content else {}
         except ERPNextAPIError:
             raise
         except Exception as e:
             logger.error(f"Method Error {method_name}: {e}")
             raise ERPNextAPIError(f"Methodenaufruf fehlgeschlagen: {str(e)}", original_error=e)
     
+    def _map_parallel(self, func, args: List, callback=None) -> List:
+        """
+        Führt func(arg) für alle args parallel über den Session-Pool aus.
+        
+        func muss eigene Fehler abfangen. Ergebnisse in Eingabereihenfolge,
+        callback(erledigt, gesamt) wird im aufrufenden Thread je Ergebnis aufgerufen.
+        """
+        results = [None] * len(args)
+        if not args:
+            return results
+        with ThreadPoolExecutor(max_workers=min(len(args), self.PARALLEL_WORKERS)) as executor:
+            futures = {executor.submit(func, arg): idx for idx, arg in enumerate(args)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if callback:
+                    callback(done, len(args))
+        return results
+    
     def test_connection(self) -> Tuple[bool, str]:
         """Testet API-Verbindung mit detaillierten Fehlermeldungen"""
         if not REQUESTS_AVAILABLE:
@@ -196,7 +323,7 @@ class ERPNextAPI:
             response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 user = data.get('message', 'OK')
                 self._connection_healthy = True
                 self._last_health_check = time.time()
@@ -246,7 +373,7 @@ class ERPNextAPI:
         try:
             params = {
                 "fields": '["fieldname", "label", "fieldtype", "options", "reqd", "description", "default"]',
-                "filters": json.dumps([["dt", "=", doctype]]),
+                "filters": json_param([["dt", "=", doctype]]),
                 "limit_page_length": 0
             }
             result = self._make_request("GET", "Custom Field", params)
@@ -298,47 +425,123 @@ class ERPNextAPI:
     
     def get_item(self, item_code: str) -> Optional[Dict]:
         """Holt Item nach Code"""
-        if item_code in self._item_cache:
-            return {"name": self._item_cache[item_code]}
+        cached = self._item_cache.get(item_code)
+        if cached:
+            return {"name": cached}
+        if item_code in self._missing_items:
+            return None
+        cached = self._persistent_cache.get("Item", item_code)
+        if cached:
+            self._item_cache[item_code] = cached
+            return {"name": cached}
         try:
             result = self._make_request("GET", f"Item/{item_code}")
             if result.get("data"):
                 self._item_cache[item_code] = result["data"]["name"]
+                self._persistent_cache.put("Item", item_code, result["data"]["name"])
             return result.get("data")
+        except ERPNextAPIError as e:
+            if e.error_code == "404":
+                self._missing_items.add(item_code)
+            return None
         except:
             return None
     
+    EXISTS_CHUNK_SIZE = 500  # Artikelnummern pro name-in-Filter (POST-Body, keine URL-Grenze)
+    
+    def which_items_exist(self, codes: List[str]) -> Set[str]:
+        """
+        Prüft viele Artikelnummern mit wenigen Abfragen (name in [...]).
+        
+        Füllt _item_cache bzw. _missing_items, sodass get_item für diese
+        Codes ohne weiteren Request antwortet. Einträge des persistenten Caches
+        werden mitgeprüft - in ERPNext gelöschte Artikel fallen dabei heraus.
+        
+        Returns:
+            Set der existierenden Artikelnummern
+        """
+        existing: Set[str] = set()
+        unknown = []
+        for code in dict.fromkeys(codes):
+            if self._item_cache.get(code):
+                existing.add(code)
+            elif code not in self._missing_items:
+                unknown.append(code)
+        
+        for start in range(0, len(unknown), self.EXISTS_CHUNK_SIZE):
+            chunk = unknown[start:start + self.EXISTS_CHUNK_SIZE]
+            try:
+                # Filter im POST-Body - 500 Codes im Query-String überschreiten
+                # die Request-Line-Grenzen von gunicorn/nginx
+                result = self._call_method("frappe.client.get_list", data={
+                    "doctype": "Item",
+                    "fields": ["name"],
+                    "filters": [["name", "in", chunk]],
+                    "limit_page_length": 0
+                })
+            except ERPNextAPIError as e:
+                # Unbekannt lassen - get_item fragt dann einzeln
+                logger.warning(f"Existenzprüfung für {len(chunk)} Artikel fehlgeschlagen: {e}")
+                continue
+            
+            # Datenbank vergleicht ohne Groß-/Kleinschreibung - wie GET Item/<code>
+            names = {item["name"].lower(): item["name"] for item in result.get("message") or []}
+            fetched = []
+            for code in chunk:
+                name = names.get(code.lower())
+                if name:
+                    fetched.append((code, name))
+                    existing.add(code)
+                else:
+                    # Veraltete Einträge früherer Importe verwerfen
+                    self.forget_item(code)
+            self._item_cache.update(fetched)
+            self._persistent_cache.put_many("Item", fetched)
+        return existing
+    
+    def _prepare_item_doc(self, data: Dict):
+        """Ergänzt Pflichtfelder und Barcodes für einen neuen Artikel (in-place)"""
+        if "item_name" not in data:
+            data["item_name"] = data["item_code"]
+        if "item_group" not in data:
+            data["item_group"] = self.config.default_item_group
+        if "stock_uom" not in data:
+            data["stock_uom"] = "Stk"
+        
+        data["doctype"] = "Item"
+        data["is_sales_item"] = 1
+        data["is_purchase_item"] = 1
+        
+        if "gtin" in data and data["gtin"]:
+            gtin = data.pop("gtin")
+            if gtin and is_valid_barcode(str(gtin)):
+                data["barcodes"] = [{
+                    "barcode": gtin,
+                    "barcode_type": detect_barcode_type(str(gtin))
+                }]
+    
     def create_item(self, data: Dict) -> Tuple[bool, str]:
         """Erstellt neuen Artikel"""
         try:
             if "item_code" not in data:
                 return False, "item_code fehlt"
-            if "item_name" not in data:
-                data["item_name"] = data["item_code"]
-            if "item_group" not in data:
-                data["item_group"] = self.config.default_item_group
-            if "stock_uom" not in data:
-                data["stock_uom"] = "Stk"
-            
-            data["doctype"] = "Item"
-            data["is_sales_item"] = 1
-            data["is_purchase_item"] = 1
-            
-            if "gtin" in data and data["gtin"]:
-                gtin = data.pop("gtin")
-                if gtin and is_valid_barcode(str(gtin)):
-                    data["barcodes"] = [{
-                        "barcode": gtin,
-                        "barcode_type": detect_barcode_type(str(gtin))
-                    }]
+            self._prepare_item_doc(data)
             
             result = self._make_request("POST", "Item", data)
             name = result.get("data", {}).get("name", data["item_code"])
             self._item_cache[data["item_code"]] = name
+            self._missing_items.discard(data["item_code"])
+            self._persistent_cache.put("Item", data["item_code"], name)
             return True, f"Erstellt: {name}"
         except Exception as e:
             return False, str(e)
     
+    def forget_item(self, item_code: str):
+        """Verwirft alle Cache-Einträge eines Artikels und merkt ihn als nicht vorhanden"""
+        self._item_cache.pop(item_code, None)
+        self._persistent_cache.delete("Item", item_code)
+        self._missing_items.add(item_code)
+    
     def update_item(self, item_code: str, data: Dict) -> Tuple[bool, str]:
         """Aktualisiert Artikel"""
         try:
@@ -348,6 +551,11 @@ class ERPNextAPI:
             
             self._make_request("PUT", f"Item/{item_code}", data)
             return True, f"Aktualisiert: {item_code}"
+        except ERPNextAPIError as e:
+            if e.error_code == "404":
+                # Gecachter Artikel existiert nicht mehr (z.B. in ERPNext gelöscht)
+                self.forget_item(item_code)
+            return False, str(e)
         except Exception as e:
             return False, str(e)
     
@@ -355,17 +563,173 @@ class ERPNextAPI:
         """Löscht Artikel"""
         try:
             self._make_request("DELETE", f"Item/{item_code}")
-            self._item_cache.pop(item_code, None)
+            self.forget_item(item_code)
             return True, f"Gelöscht: {item_code}"
         except Exception as e:
             return False, str(e)
 
+    # ==================== BULK METHODS ====================
+    
+    BULK_CHUNK_SIZE = 100  # Frappe erlaubt max. 200 Dokumente pro insert_many
+    BULK_WORKERS = 4
+    
+    def bulk_insert(self, doctype: str, docs: List[Dict]) -> List[str]:
+        """
+        Legt mehrere Dokumente mit einem Request an (frappe.client.insert_many).
+        
+        Frappe fügt alle Dokumente eines Aufrufs in einer Transaktion ein -
+        schlägt eines fehl, wird der ganze Aufruf verworfen (ERPNextAPIError).
+        
+        Returns:
+            Liste der erstellten Namen (ungeordnet - nicht den docs zuordnen)
+        """
+        if not docs:
+            return []
+        payload = [dict(doc, doctype=doctype) for doc in docs]
+        result = self._call_method(
+            "frappe.client.insert_many",
+            data={"docs": json_dumps(payload).decode("utf-8")}
+        )
+        return result.get("message") or []
+    
+    def create_items_bulk(self, items: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Erstellt viele Artikel in Blöcken von BULK_CHUNK_SIZE (parallel).
+        
+        Schlägt ein Block fehl, werden dessen Artikel einzeln per create_item
+        angelegt, damit gültige Artikel nicht am Fehler eines anderen scheitern.
+        
+        Returns:
+            Ergebnis je Artikel in Eingabereihenfolge (wie create_item)
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(items)
+        indices = []
+        for idx, item in enumerate(items):
+            if "item_code" not in item:
+                results[idx] = (False, "item_code fehlt")
+                continue
+            self._prepare_item_doc(item)
+            indices.append(idx)
+        
+        def cache_names(docs: List[Dict]):
+            # Artikelname = Artikelnummer; die von insert_many gelieferten Namen
+            # sind ungeordnet (Frappe sammelt sie in einem set) und taugen nicht zur Zuordnung
+            cache_items = [(doc["item_code"], doc["item_code"]) for doc in docs]
+            self._item_cache.update(cache_items)
+            self._missing_items.difference_update(doc["item_code"] for doc in docs)
+            self._persistent_cache.put_many("Item", cache_items)
+        
+        created = self._bulk_create("Item", [items[idx] for idx in indices],
+                                    self.create_item, name_field="item_code",
+                                    on_created=cache_names)
+        for idx, result in zip(indices, created):
+            results[idx] = result
+        return results
+    
+    def update_items_bulk(self, updates: List[Tuple[str, Dict]]) -> List[Tuple[bool, str]]:
+        """
+        Aktualisiert viele Artikel in Blöcken von BULK_CHUNK_SIZE (frappe.client.bulk_update).
+        
+        Frappe speichert jedes Dokument einzeln und meldet fehlgeschlagene zurück.
+        Schlägt der ganze Aufruf fehl, wird der Block einzeln per update_item aktualisiert.
+        
+        Args:
+            updates: Liste von (item_code, Daten)
+        
+        Returns:
+            Ergebnis je Artikel in Eingabereihenfolge (wie update_item)
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(updates)
+        docs = []
+        for item_code, data in updates:
+            # Nicht-aktualisierbare Felder weglassen (wie update_item), Eingabe bleibt unverändert
+            doc = {k: v for k, v in data.items() if k not in ("item_code", "gtin", "doctype")}
+            docs.append(dict(doc, doctype="Item", docname=item_code))
+        
+        def update_chunk(start: int):
+            chunk = docs[start:start + self.BULK_CHUNK_SIZE]
+            try:
+                result = self._call_method(
+                    "frappe.client.bulk_update",
+                    data={"docs": json_dumps(chunk).decode("utf-8")}
+                )
+            except Exception as e:
+                logger.warning(f"bulk_update Item fehlgeschlagen ({e}) - "
+                               f"aktualisiere {len(chunk)} Artikel einzeln")
+                for pos in range(start, start + len(chunk)):
+                    item_code, data = updates[pos]
+                    results[pos] = self.update_item(item_code, dict(data))
+                return
+            failed = {}
+            for entry in (result.get("message") or {}).get("failed_docs", []):
+                doc = entry.get("doc") or {}
+                # Letzte Zeile des Tracebacks als Fehlermeldung
+                exc = (entry.get("exc") or "").strip()
+                failed[doc.get("docname")] = exc.splitlines()[-1] if exc else "Aktualisierung fehlgeschlagen"
+            for pos, doc in enumerate(chunk, start):
+                docname = doc["docname"]
+                if docname in failed:
+                    if "DoesNotExistError" in failed[docname]:
+                        self.forget_item(docname)
+                    results[pos] = (False, failed[docname])
+                else:
+                    results[pos] = (True, f"Aktualisiert: {docname}")
+        
+        starts = list(range(0, len(docs), self.BULK_CHUNK_SIZE))
+        if len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(starts), self.BULK_WORKERS)) as executor:
+                list(executor.map(update_chunk, starts))
+        else:
+            for start in starts:
+                update_chunk(start)
+        return results
+    
+    def _bulk_create(self, doctype: str, docs: List[Dict], fallback,
+                     name_field: Optional[str] = None,
+                     on_created=None) -> List[Tuple[bool, str]]:
+        """
+        Legt docs in Blöcken von BULK_CHUNK_SIZE per insert_many an (parallel).
+        
+        Schlägt ein Block fehl, wird fallback(doc) je Dokument aufgerufen.
+        on_created(block_docs) wird nach jedem erfolgreichen Block aufgerufen.
+        Die Erfolgsmeldung nennt doc[name_field] - insert_many liefert die Namen
+        ohne feste Reihenfolge zurück.
+        """
+        results: List[Tuple[bool, str]] = [(False, "")] * len(docs)
+        chunks = [list(range(start, min(start + self.BULK_CHUNK_SIZE, len(docs))))
+                  for start in range(0, len(docs), self.BULK_CHUNK_SIZE)]
+        
+        def insert_chunk(indices: List[int]):
+            chunk_docs = [docs[idx] for idx in indices]
+            try:
+                self.bulk_insert(doctype, chunk_docs)
+            except Exception as e:
+                logger.warning(f"insert_many {doctype} fehlgeschlagen ({e}) - "
+                               f"lege {len(chunk_docs)} Dokumente einzeln an")
+                for idx in indices:
+                    results[idx] = fallback(docs[idx])
+                return
+            if on_created:
+                on_created(chunk_docs)
+            for idx in indices:
+                name = docs[idx].get(name_field, "") if name_field else ""
+                results[idx] = (True, f"Erstellt: {name}" if name else "Erstellt")
+        
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), self.BULK_WORKERS)) as executor:
+                list(executor.map(insert_chunk, chunks))
+        else:
+            for indices in chunks:
+                insert_chunk(indices)
+        return results
+    
     # ==================== ITEM GROUP METHODS ====================
     
     def get_item_group(self, name: str) -> Optional[Dict]:
         """Holt Item Group"""
-        if name in self._item_group_cache:
-            return {"name": self._item_group_cache[name]}
+        cached = self._item_group_cache.get(name)
+        if cached:
+            return {"name": cached}
         try:
             result = self._make_request("GET", f"Item Group/{name}")
             if result.get("data"):
@@ -374,11 +738,65 @@ class ERPNextAPI:
         except:
             return None
     
-    def create_item_group(self, data: Dict) -> Tuple[bool, str]:
-        """Erstellt Kategorie"""
+    def get_item_groups_bulk(self, names: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Prüft mehrere Item Groups mit einer einzigen Abfrage (name in [...]).
+        
+        Der Server vergleicht ohne Groß-/Kleinschreibung (wie GET Item Group/<name>),
+        daher werden die Treffer über .lower() zugeordnet.
+        
+        Returns:
+            Dict name -> Item-Group-Name für alle existierenden Gruppen,
+            None wenn die Abfrage fehlschlug
+        """
+        found: Dict[str, str] = {}
+        missing = []
+        for name in names:
+            cached = self._item_group_cache.get(name)
+            if cached:
+                found[name] = cached
+            elif name not in missing:
+                missing.append(name)
+        if not missing:
+            return found
+        
+        try:
+            params = {
+                "fields": '["name"]',
+                "filters": json_param([["name", "in", missing]]),
+                "limit_page_length": 0
+            }
+            result = self._make_request("GET", "Item Group", params)
+        except:
+            return None
+        
+        names_lower = {g["name"].lower(): g["name"] for g in result.get("data", [])}
+        for name in missing:
+            group_name = names_lower.get(name.lower())
+            if group_name:
+                self._item_group_cache[name] = group_name
+                found[name] = group_name
+        return found
+    
+    def warm_item_group_cache(self) -> int:
+        """Lädt alle Item Groups einmalig in den Cache (vor dem Import)"""
+        try:
+            params = {
+                "fields": '["name"]',
+                "limit_page_length": 0
+            }
+            result = self._make_request("GET", "Item Group", params)
+        except:
+            return 0
+        fetched = [(g["name"], g["name"]) for g in result.get("data", [])]
+        self._item_group_cache.update(fetched)
+        return len(fetched)
+    
+    def create_item_group(self, data: Dict, check_exists: bool = True) -> Tuple[bool, str]:
+        """Erstellt Kategorie (check_exists=False wenn Existenz bereits geprüft)"""
         try:
             name = data.get("item_group_name", "")
-            if self.get_item_group(name):
+            if check_exists and self.get_item_group(name):
                 return True, f"Existiert bereits: {name}"
 
             data["doctype"] = "Item Group"
@@ -405,20 +823,28 @@ class ERPNextAPI:
         parent = self.config.default_item_group
         last_category = parent
 
+        # Alle Ebenen mit einer Abfrage prüfen statt einer pro Ebene
+        existing_groups = self.get_item_groups_bulk(levels)
+        # Abfrage fehlgeschlagen: Existenz beim Anlegen je Ebene prüfen
+        verified = existing_groups is not None
+        if not verified:
+            existing_groups = {}
+
         for level_name in levels:
-            existing = self.get_item_group(level_name)
+            existing = existing_groups.get(level_name)
 
             if existing:
-                last_category = level_name
-                parent = level_name
+                # Schreibweise aus ERPNext übernehmen ("elektronik" -> "Elektronik")
+                last_category = existing
+                parent = existing
                 if log_callback:
-                    log_callback(f"Kategorie existiert: {level_name}")
+                    log_callback(f"Kategorie existiert: {existing}")
             else:
                 data = {
                     "item_group_name": level_name,
                     "parent_item_group": parent
                 }
-                success, msg = self.create_item_group(data)
+                success, msg = self.create_item_group(data, check_exists=not verified)
                 if success:
                     last_category = level_name
                     parent = level_name
@@ -436,22 +862,24 @@ class ERPNextAPI:
         if not path:
             return []
 
-        for sep in [" > ", " -> ", " >> ", " / ", "/", ">", "|"]:
+        # Nur am höchstpriorisierten vorhandenen Trennzeichen teilen
+        for sep in _CATEGORY_SEPARATORS:
             if sep in path:
                 return [p.strip() for p in path.split(sep) if p.strip()]
 
+        # Kein Trennzeichen gefunden - einzelne Kategorie
         return [path.strip()] if path.strip() else []
 
     # ==================== FILE UPLOAD ====================
     
+    # Ab dieser Dateigröße wird der Upload gestreamt (requests-toolbelt)
+    STREAM_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+    
     def upload_file(self, file_path: str, doctype: str = None,
                     docname: str = None, is_private: bool = False) -> Optional[str]:
         """Lädt Datei hoch"""
-        if not os.path.exists(file_path):
-            return None
-        
         filename = os.path.basename(file_path)
-        mime_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        mime_type = _guess_mime(os.path.splitext(filename)[1].lower())
         
         data = {
             "is_private": 1 if is_private else 0,
@@ -464,16 +892,22 @@ class ERPNextAPI:
             data["attached_to_doctype"] = doctype
             data["attached_to_name"] = docname
         
+        # Fehlende Datei ohne vorherigen exists()-Aufruf erkennen
         try:
-            with open(file_path, 'rb') as f:
-                files = {'file': (filename, f, mime_type)}
-                result = self._call_method("upload_file", data=data, files=files)
-            
-            file_url = result.get("message", {}).get("file_url", "")
-            return file_url
-        except Exception as e:
-            logger.error(f"Upload Error: {e}")
+            f = open(file_path, 'rb')
+        except OSError:
             return None
+        
+        with f:
+            try:
+                files = {'file': (filename, f, mime_type)}
+                # Große Dateien streamen - kleine im Speicher, damit Retries den Body neu senden können
+                stream = os.fstat(f.fileno()).st_size > self.STREAM_UPLOAD_THRESHOLD
+                result = self._call_method("upload_file", data=data, files=files, stream=stream)
+                return result.get("message", {}).get("file_url", "")
+            except Exception as e:
+                logger.error(f"Upload Error: {e}")
+                return None
     
     def set_item_image(self, item_code: str, image_path: str) -> Tuple[bool, str]:
         """Setzt Hauptbild für Item"""
@@ -494,36 +928,68 @@ class ERPNextAPI:
             return True, f"Angehängt: {file_url}"
         return False, "Upload fehlgeschlagen"
     
+    # frappe.desk.reportview.delete_items löscht bis zu so vielen Einträgen synchron,
+    # darüber nur als Hintergrund-Job (ohne Rückmeldung über das Ergebnis)
+    SYNC_BULK_DELETE_LIMIT = 10
+    
+    def _item_attachment_names(self, item_code: str) -> List[str]:
+        """Namen aller File-Dokumente, die an einem Item hängen"""
+        params = {
+            "fields": '["name"]',
+            "filters": json_param([
+                ["attached_to_doctype", "=", "Item"],
+                ["attached_to_name", "=", item_code]
+            ]),
+            "limit_page_length": 0
+        }
+        result = self._make_request("GET", "File", params)
+        return [f["name"] for f in result.get("data", [])]
+    
     def delete_item_attachments(self, item_code: str) -> Tuple[bool, str]:
         """Löscht alle Anhänge eines Items"""
         try:
-            url = f"{self.config.base_url}/api/resource/File"
-            params = {
-                "filters": json.dumps([
-                    ["attached_to_doctype", "=", "Item"],
-                    ["attached_to_name", "=", item_code]
-                ]),
-                "limit_page_length": 0
-            }
-            response = self.session.get(url, params=params, timeout=30)
-            files = response.json().get("data", [])
+            names = self._item_attachment_names(item_code)
             
-            deleted = 0
-            for f in files:
+            def delete_file(name: str) -> bool:
                 try:
-                    self._make_request("DELETE", f"File/{f['name']}")
-                    deleted += 1
+                    self._make_request("DELETE", f"File/{name}")
+                    return True
                 except:
-                    pass
+                    return False
+            
+            deleted = 0
+            if 0 < len(names) <= self.SYNC_BULK_DELETE_LIMIT:
+                # Wenige Dateien mit einem Aufruf löschen - delete_bulk verschluckt
+                # Fehler je Datei, daher das Ergebnis per Abfrage bestätigen
+                try:
+                    self._call_method("frappe.desk.reportview.delete_items", data={
+                        "doctype": "File",
+                        "items": json_param(names)
+                    })
+                    remaining = set(self._item_attachment_names(item_code))
+                    deleted = sum(1 for name in names if name not in remaining)
+                except ERPNextAPIError as e:
+                    logger.warning(f"Bulk-Delete nicht möglich ({e}) - lösche Anhänge einzeln")
+                    deleted = sum(self._map_parallel(delete_file, names))
+            elif names:
+                # Mehr Dateien: einzeln (parallel) und synchron statt als Hintergrund-Job
+                deleted = sum(self._map_parallel(delete_file, names))
             
             self._make_request("PUT", f"Item/{item_code}", {"image": ""})
             
+            if deleted < len(names):
+                return False, f"{deleted} von {len(names)} Anhängen gelöscht"
             return True, f"{deleted} Anhänge gelöscht"
         except Exception as e:
             return False, str(e)
 
     # ==================== ITEM ATTRIBUTES ====================
     
+    @staticmethod
+    def _attribute_value_rows(values: List[str]) -> List[Dict]:
+        """Baut Attributwert-Zeilen; Kürzel = erste drei Zeichen in Großbuchstaben"""
+        return [{"attribute_value": v, "abbr": v[:3].upper()} for v in values]
+    
     def get_or_create_attribute(self, name: str, values: List[str] = None) -> Tuple[bool, str]:
         """Erstellt oder aktualisiert Item Attribute"""
         try:
@@ -531,15 +997,12 @@ class ERPNextAPI:
                 result = self._make_request("GET", f"Item Attribute/{name}")
                 if result.get("data"):
                     if values:
-                        existing = [v.get("attribute_value") for v in 
-                                   result["data"].get("item_attribute_values", [])]
+                        current = result["data"].get("item_attribute_values", [])
+                        existing = {v.get("attribute_value") for v in current}
                         new_values = [v for v in values if v not in existing]
                         
                         if new_values:
-                            current = result["data"].get("item_attribute_values", [])
-                            for val in new_values:
-                                abbr = val[:3].upper() if len(val) >= 3 else val.upper()
-                                current.append({"attribute_value": val, "abbr": abbr})
+                            current.extend(self._attribute_value_rows(new_values))
                             self._make_request("PUT", f"Item Attribute/{name}", {
                                 "item_attribute_values": current
                             })
@@ -550,38 +1013,41 @@ class ERPNextAPI:
             data = {
                 "doctype": "Item Attribute",
                 "attribute_name": name,
-                "item_attribute_values": []
+                "item_attribute_values": self._attribute_value_rows(values or [])
             }
             
-            if values:
-                for val in values:
-                    abbr = val[:3].upper() if len(val) >= 3 else val.upper()
-                    data["item_attribute_values"].append({
-                        "attribute_value": val,
-                        "abbr": abbr
-                    })
-            
             self._make_request("POST", "Item Attribute", data)
             return True, f"Attribut erstellt: {name}"
         except Exception as e:
             return False, str(e)
     
+    def _item_price_doc(self, item_code: str, price: float) -> Dict:
+        """Baut das Item-Price-Dokument für die Standard-Preisliste"""
+        return {
+            "doctype": "Item Price",
+            "item_code": item_code,
+            "price_list": self.config.default_price_list,
+            "price_list_rate": price,
+            "currency": "EUR",
+            "selling": 1
+        }
+    
     def create_item_price(self, item_code: str, price: float) -> Tuple[bool, str]:
         """Erstellt Item-Preis"""
         try:
-            data = {
-                "doctype": "Item Price",
-                "item_code": item_code,
-                "price_list": self.config.default_price_list,
-                "price_list_rate": price,
-                "currency": "EUR",
-                "selling": 1
-            }
-            self._make_request("POST", "Item Price", data)
+            self._make_request("POST", "Item Price", self._item_price_doc(item_code, price))
             return True, f"Preis erstellt: {price} EUR"
         except Exception as e:
             return False, str(e)
     
+    def create_item_prices_bulk(self, prices: List[Tuple[str, float]]) -> List[Tuple[bool, str]]:
+        """Erstellt viele Item-Preise per insert_many (Fallback: create_item_price)"""
+        docs = [self._item_price_doc(item_code, price) for item_code, price in prices]
+        return self._bulk_create(
+            "Item Price", docs,
+            lambda doc: self.create_item_price(doc["item_code"], doc["price_list_rate"])
+        )
+    
     def get_all_items(self, limit: int = 0) -> List[Dict]:
         """Holt alle Items"""
         try:
@@ -598,48 +1064,98 @@ class ERPNextAPI:
 
     # ==================== EXPORT METHODS ====================
 
+    # Seitengröße für Listen-Exporte (eine Anfrage pro Seite statt pro Datensatz)
+    EXPORT_PAGE_SIZE = 500
+    # Export-Felder aus Child-Tabellen - nur im vollständigen Dokument enthalten
+    EXPORT_CHILD_FIELDS = {"gtin", "attributes"}
+
     def export_items(self, fields: List[str], filters: Dict = None,
                      limit: int = 0, callback=None) -> List[Dict]:
-        """Exportiert Artikel mit ausgewählten Feldern"""
+        """
+        Exportiert Artikel mit ausgewählten Feldern.
+
+        Normale Felder kommen seitenweise direkt aus der Listen-Abfrage.
+        Nur wenn Child-Tabellen-Felder (GTIN, Attribute) gewählt sind,
+        wird das vollständige Dokument je Artikel nachgeladen.
+        Große Exporte besser über export_items_iter streamen.
+        """
         try:
-            params = {
-                "fields": json.dumps(fields),
-                "limit_page_length": limit if limit > 0 else 0
-            }
+            return list(self.export_items_iter(fields, filters, limit, callback))
+        except Exception as e:
+            logger.error(f"Export Error: {e}")
+            return []
+
+    def export_items_iter(self, fields: List[str], filters: Dict = None,
+                          limit: int = 0, callback=None) -> Iterator[Dict]:
+        """
+        Wie export_items, liefert die Artikel aber als Generator Seite für Seite.
+
+        Im Speicher liegt nur die aktuelle Seite; Child-Tabellen-Felder werden
+        je Seite parallel nachgeladen. Fehler gehen an den Aufrufer.
+        """
+        child_fields = [f for f in fields if f in self.EXPORT_CHILD_FIELDS]
+        list_fields = [f for f in fields if f not in self.EXPORT_CHILD_FIELDS]
+        if "name" not in list_fields:
+            list_fields.insert(0, "name")
+
+        # Feste Sortierung für limit_start-Seiten - Frappes Standard "modified desc"
+        # verschiebt die Seitengrenzen, wenn während des Exports Artikel geändert werden
+        params = {"fields": json_param(list_fields), "order_by": "name asc"}
+
+        if filters:
+            filter_list = []
+            for key, value in filters.items():
+                if value:
+                    filter_list.append([key, "like", f"%{value}%"])
+            if filter_list:
+                params["filters"] = json_param(filter_list)
 
-            if filters:
-                filter_list = []
-                for key, value in filters.items():
-                    if value:
-                        filter_list.append([key, "like", f"%{value}%"])
-                if filter_list:
-                    params["filters"] = json.dumps(filter_list)
+        # Child-Tabellen nur über das vollständige Dokument verfügbar
+        def fetch_doc(item: Dict) -> Dict:
+            try:
+                return self._make_request("GET", f"Item/{item['name']}", http2=True).get("data", {})
+            except:
+                return {}
+
+        loaded = 0
+        while True:
+            page_size = self.EXPORT_PAGE_SIZE
+            if limit > 0:
+                page_size = min(page_size, limit - loaded)
+            params["limit_start"] = loaded
+            params["limit_page_length"] = page_size
 
             result = self._make_request("GET", "Item", params)
-            items = result.get("data", [])
+            page = result.get("data", [])
+            loaded += len(page)
 
-            full_items = []
-            for i, item in enumerate(items):
-                try:
-                    full_data = self._make_request("GET", f"Item/{item['name']}")
-                    full_items.append(full_data.get("data", item))
-                    if callback:
-                        callback(i + 1, len(items))
-                except:
-                    full_items.append(item)
+            if child_fields and page:
+                docs = self._map_parallel(fetch_doc, page)
+                for item, doc in zip(page, docs):
+                    self._apply_child_fields(item, doc, child_fields)
 
-            return full_items
-        except Exception as e:
-            logger.error(f"Export Error: {e}")
-            return []
+            if callback:
+                callback(loaded, limit if limit > 0 else loaded)
+            yield from page
+
+            if len(page) < page_size or (limit > 0 and loaded >= limit):
+                break
+
+    @staticmethod
+    def _apply_child_fields(item: Dict, doc: Dict, child_fields: List[str]):
+        """Überträgt Child-Tabellen-Felder aus dem vollständigen Dokument"""
+        for field_name in child_fields:
+            if field_name == "gtin":
+                barcodes = doc.get("barcodes") or []
+                item["gtin"] = barcodes[0].get("barcode", "") if barcodes else ""
+            else:
+                item[field_name] = doc.get(field_name, [])
 
     def export_item_groups(self, fields: List[str] = None, limit: int = 0) -> List[Dict]:
         """Exportiert Kategorien"""
         try:
-            default_fields = ["name", "item_group_name", "parent_item_group",
-                            "is_group", "description"]
             params = {
-                "fields": json.dumps(fields or default_fields),
+                "fields": json_param(fields) if fields else _EXPORT_ITEM_GROUP_FIELDS_JSON,
                 "limit_page_length": limit if limit > 0 else 0
             }
 
@@ -0,0 +1,120 @@
+"""
+Lookup-Caches für den ERPNext Importer (Speicher-LRU und persistenter SQLite-Cache)
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Begrenzter, thread-sicherer Speicher-Cache - verdrängt die am längsten ungenutzten Einträge"""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def __setitem__(self, key: str, value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, items: List[Tuple[str, str]]):
+        for key, value in items:
+            self[key] = value
+
+    def pop(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PersistentCache:
+    """
+    Persistenter Lookup-Cache (SQLite, WAL-Modus) für ERPNext-Namen.
+
+    Speichert Item-Namen pro ERPNext-Instanz, damit wiederholte Einzelabfragen
+    (get_item) ohne HTTP-Request beantwortet werden können. Item Groups bleiben
+    im Speicher-Cache - sie werden je Import ohnehin vollständig geladen.
+    Einträge verfallen nach `ttl` Sekunden.
+    """
+
+    DEFAULT_PATH = Path.home() / ".erpnext_importer_cache.db"
+    DEFAULT_TTL = 24 * 3600
+
+    def __init__(self, base_url: str, path: Optional[Path] = None, ttl: float = DEFAULT_TTL):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(str(path or self.DEFAULT_PATH), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "base_url TEXT, doctype TEXT, key TEXT, value TEXT, ts REAL, "
+                "PRIMARY KEY (base_url, doctype, key))"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # Cache ist optional - ohne Datenbank wird nur im Speicher gecacht
+            logger.warning(f"Persistenter Cache nicht verfügbar: {e}")
+            self._conn = None
+
+    def get(self, doctype: str, key: str) -> Optional[str]:
+        """Gibt gecachten Wert zurück oder None (fehlt/abgelaufen)"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE base_url=? AND doctype=? AND key=? AND ts>=?",
+                (self.base_url, doctype, key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, doctype: str, key: str, value: str):
+        """Speichert einen einzelnen Wert"""
+        self.put_many(doctype, [(key, value)])
+
+    def put_many(self, doctype: str, items: List[Tuple[str, str]]):
+        """Speichert mehrere Werte in einer Transaktion"""
+        if self._conn is None or not items:
+            return
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (base_url, doctype, key, value, ts) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(self.base_url, doctype, k, v, now) for k, v in items]
+                )
+
+    def delete(self, doctype: str, key: str):
+        """Entfernt einen Eintrag"""
+        if self._conn is None:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE base_url=? AND doctype=? AND key=?",
+                    (self.base_url, doctype, key)
+                )
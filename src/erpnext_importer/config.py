@@ -2,7 +2,8 @@
 Konfiguration und Datenmodelle für den ERPNext Importer
 """
 
-from dataclasses import dataclass, field, asdict
+import sys
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 
 
@@ -84,6 +85,21 @@ class FieldMapping:
     transform: str = "none"
     default_value: str = ""
 
+    def __post_init__(self):
+        # Schlüssel internieren: Zeilen-Dicts und Literale wie "standard_rate_brutto"
+        # teilen dann dasselbe Objekt, Dict-Zugriffe treffen per Identitätsvergleich
+        self.source_column = sys.intern(self.source_column)
+        self.target_field = sys.intern(self.target_field)
+
+    def to_dict(self) -> dict:
+        """Direkte Attribut-Zugriffe statt asdict() (ohne rekursives Kopieren)"""
+        return {
+            "source_column": self.source_column,
+            "target_field": self.target_field,
+            "transform": self.transform,
+            "default_value": self.default_value
+        }
+
 
 @dataclass
 class ImportTemplate:
@@ -103,7 +119,7 @@ class ImportTemplate:
             "name": self.name,
             "import_type": self.import_type,
             "file_format": self.file_format,
-            "mappings": [asdict(m) for m in self.mappings],
+            "mappings": [m.to_dict() for m in self.mappings],
             "csv_delimiter": self.csv_delimiter,
             "csv_encoding": self.csv_encoding,
             "skip_first_row": self.skip_first_row,
@@ -2,8 +2,17 @@
 ERPNext Feld-Definitionen und Auto-Mapping-Regeln
 """
 
+import re
+from functools import lru_cache
 from typing import Dict
 
+# Optional Aho-Corasick für Teilstring-Suche im Auto-Mapping
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # ==================== ERPNext FELDER ====================
 
 ERPNEXT_ITEM_FIELDS: Dict[str, Dict] = {
@@ -329,6 +338,64 @@ AUTO_MAPPING_RULES: Dict[str, str] = {
     "oberkategorie": "parent_item_group",
 }
 
+# Normalisierte Auto-Mapping-Tabelle (einmalig beim Modul-Import gebaut)
+# Umlaute ersetzen ("Größe" == "Groesse") und _/- zu Leerzeichen - ein
+# translate()-Durchlauf statt Regex; split()/join() fasst Whitespace zusammen
+_HEADER_TABLE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "_": " ", "-": " "})
+
+
+def _normalize_header(header: str) -> str:
+    """Normalisiert einen Spaltennamen (Whitespace/_/- vereinheitlicht, klein, ohne Umlaute)"""
+    return " ".join(header.lower().translate(_HEADER_TABLE).split())
+
+
+_AUTO_MAP_NORM: Dict[str, str] = {
+    _normalize_header(key): target for key, target in AUTO_MAPPING_RULES.items()
+}
+
+if AHOCORASICK_AVAILABLE:
+    _AUTO_MAP_AUTOMATON = ahocorasick.Automaton()
+    for _key, _target in _AUTO_MAP_NORM.items():
+        _AUTO_MAP_AUTOMATON.add_word(_key, (_key, _target))
+    _AUTO_MAP_AUTOMATON.make_automaton()
+else:
+    _AUTO_MAP_AUTOMATON = None
+
+# Fallback ohne Aho-Corasick: alle Schlüssel in einer Regex-Alternation (längste
+# zuerst). Der Lookahead liefert überlappende Treffer an jeder Position in einem
+# einzigen Durchlauf der C-Regex-Engine.
+_AUTO_MAP_RE = re.compile(
+    "(?=(" + "|".join(re.escape(key) for key in sorted(_AUTO_MAP_NORM, key=len, reverse=True)) + "))"
+)
+
+
+# Spaltennamen wiederholen sich bei jedem erneuten Parsen/Auto-Mapping
+@lru_cache(maxsize=4096)
+def auto_map(header: str) -> str:
+    """
+    Ermittelt das ERPNext-Zielfeld für einen Spaltennamen.
+
+    Erst exakter Treffer auf den normalisierten Namen, danach der längste
+    Regel-Schlüssel, der im Spaltennamen enthalten ist (z.B. "SEO Titel (Meta)").
+
+    Returns:
+        Zielfeld oder "" wenn keine Regel passt
+    """
+    normalized = _normalize_header(header)
+    target = _AUTO_MAP_NORM.get(normalized)
+    if target:
+        return target
+
+    if _AUTO_MAP_AUTOMATON is not None:
+        best_key = ""
+        for _, (key, key_target) in _AUTO_MAP_AUTOMATON.iter(normalized):
+            if len(key) > len(best_key):
+                best_key, target = key, key_target
+        return target or ""
+
+    best_key = max((m.group(1) for m in _AUTO_MAP_RE.finditer(normalized)), key=len, default="")
+    return _AUTO_MAP_NORM.get(best_key, "")
+
 # ==================== UOM MAPPING ====================
 
 UOM_MAPPING: Dict[str, str] = {
@@ -2,32 +2,123 @@
 Google Gemini AI Client für intelligentes Feld-Mapping
 """
 
-import json
-import time
+import hashlib
 import logging
-from typing import Optional, Dict, List, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Any
+
+from .cache import PersistentCache
+from .utils import json_loads, json_dumps
 
 logger = logging.getLogger(__name__)
 
 # Conditional requests import
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
 
 
+@lru_cache(maxsize=8)
+def _render_mapping_prefix(targets: Tuple[Tuple, ...]) -> str:
+    """Rendert den von den Quellspalten unabhängigen Teil des Mapping-Prompts"""
+    target_list = "\n".join(
+        f"- {key}: {label} ({field_type}) {'PFLICHT' if required else ''} {'CUSTOM' if custom else ''}".strip()
+        for key, label, field_type, required, custom in targets
+    )
+    return f"""Du bist ein Experte für Daten-Mapping in ERP-Systemen.
+
+AUFGABE: Ordne die Quellspalten den passenden ERPNext-Zielfeldern zu.
+
+ZIELFELDER (ERPNext):
+{target_list}
+
+REGELN:
+1. Jede Quellspalte kann nur EINEM Zielfeld zugeordnet werden
+2. Nicht alle Quellspalten müssen zugeordnet werden
+3. Achte auf semantische Ähnlichkeit, nicht nur auf Namen
+4. Berücksichtige die Beispieldaten für bessere Zuordnung
+5. CUSTOM-Felder sind benutzerdefinierte Felder - ordne diese auch zu wenn passend
+6. Typische Mappings:
+   - Artikelnummer/SKU/Art-Nr -> item_code
+   - Bezeichnung/Name/Titel -> item_name
+   - EAN/GTIN/Barcode -> gtin
+   - Preis/VK/Netto -> standard_rate
+   - Kategorie/Warengruppe -> item_group
+   - Beschreibung/Text -> description
+   - Gewicht -> weight_per_unit
+   - Hersteller/Marke/Brand -> brand
+
+ANTWORT-FORMAT (NUR JSON, keine Erklärung):
+[{{"source": "quellspalte1", "target": "zielfeld1"}}, {{"source": "quellspalte2", "target": "zielfeld2"}}]
+
+Wenn keine passende Zuordnung möglich ist, die Spalte weglassen."""
+
+
 class GeminiAPI:
     """Google Gemini API Client für intelligentes Feld-Mapping"""
 
+    # Ab dieser Spaltenanzahl wird das Mapping in parallele Teil-Prompts zerlegt
+    CHUNK_THRESHOLD = 40
+    CHUNK_SIZE = 30
+    MAX_PARALLEL_REQUESTS = 4
+    # Gleiche Spalten/Zielfelder/Beispiele liefern das gespeicherte Mapping (30 Tage)
+    MAPPING_CACHE_TTL = 30 * 24 * 3600
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
         self.model = "gemini-2.5-flash"
         self.last_error = ""
+        self._sessions: Dict[int, Any] = {}
+        self._mapping_cache: Optional[PersistentCache] = None
 
-    def _make_request(self, prompt: str, retries: int = 2) -> Optional[str]:
-        """Sendet Anfrage an Gemini API mit Retry-Logik"""
+    def _get_session(self, retries: int = 2):
+        """
+        Gemeinsame Session (Keep-Alive) je Retry-Anzahl - wird beim ersten Request erstellt.
+
+        Retries/Backoff übernimmt urllib3 inkl. Retry-After-Header bei 429.
+        """
+        session = self._sessions.get(retries)
+        if session is None:
+            session = requests.Session()
+            retry_strategy = Retry(
+                total=retries,
+                backoff_factor=2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy)
+            session.mount("https://", adapter)
+            self._sessions[retries] = session
+        return session
+
+    # Structured Output: Gemini akzeptiert nur die OpenAPI-Teilmenge (kein additionalProperties,
+    # OBJECT braucht feste properties) - daher Liste von {source, target}-Paaren
+    MAPPING_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "source": {"type": "string"},
+                "target": {"type": "string"},
+            },
+            "required": ["source", "target"],
+        },
+    }
+
+    def _make_request(self, prompt: str, retries: int = 2,
+                      response_schema: Optional[Dict] = None) -> Optional[str]:
+        """Sendet Anfrage an Gemini API mit Retry-Logik.
+
+        Mit response_schema liefert die API direkt JSON (ohne Markdown).
+        """
         if not REQUESTS_AVAILABLE:
             return None
 
@@ -44,51 +135,45 @@ class GeminiAPI:
                 "maxOutputTokens": 2048,
             }
         }
+        if response_schema is not None:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = response_schema
 
-        for attempt in range(retries + 1):
-            try:
-                response = requests.post(url, json=payload, timeout=60)
-
-                # Rate Limit Handling
-                if response.status_code == 429:
-                    self.last_error = "Rate Limit erreicht - bitte kurz warten"
-                    if attempt < retries:
-                        wait_time = (attempt + 1) * 5  # 5s, 10s
-                        logger.warning(f"Rate limit, warte {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        logger.error("Rate limit nach allen Retries")
-                        return None
-
-                response.raise_for_status()
-                data = response.json()
-
-                # Extrahiere Text aus Antwort
-                candidates = data.get("candidates", [])
-                if candidates:
-                    content = candidates[0].get("content", {})
-                    parts = content.get("parts", [])
-                    if parts:
-                        self.last_error = ""
-                        return parts[0].get("text", "")
-
-                self.last_error = "Keine Antwort von API"
+        try:
+            response = self._get_session(retries).post(
+                url, data=json_dumps(payload),
+                headers={"Content-Type": "application/json"}, timeout=60
+            )
+
+            # Rate Limit Handling (Retries bereits durch Session ausgeschöpft)
+            if response.status_code == 429:
+                self.last_error = "Rate Limit erreicht - bitte kurz warten"
+                logger.error("Rate limit nach allen Retries")
                 return None
 
-            except requests.exceptions.HTTPError as e:
-                self.last_error = f"HTTP Fehler: {e.response.status_code}"
-                logger.error(f"Gemini API HTTP Error: {e}")
-                if attempt < retries and e.response.status_code >= 500:
-                    time.sleep(2)
-                    continue
-                return None
-            except Exception as e:
-                self.last_error = str(e)
-                logger.error(f"Gemini API Error: {e}")
-                return None
+            response.raise_for_status()
+            data = json_loads(response.content)
 
-        return None
+            # Extrahiere Text aus Antwort
+            candidates = data.get("candidates", [])
+            if candidates:
+                content = candidates[0].get("content", {})
+                parts = content.get("parts", [])
+                if parts:
+                    self.last_error = ""
+                    return parts[0].get("text", "")
+
+            self.last_error = "Keine Antwort von API"
+            return None
+
+        except requests.exceptions.HTTPError as e:
+            self.last_error = f"HTTP Fehler: {e.response.status_code}"
+            logger.error(f"Gemini API HTTP Error: {e}")
+            return None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Gemini API Error: {e}")
+            return None
 
     def test_connection(self) -> Tuple[bool, str]:
         """Testet die API-Verbindung"""
@@ -103,6 +188,9 @@ class GeminiAPI:
         """
         Mappt Quellspalten intelligent auf Zielfelder mittels AI.
 
+        Ergebnisse werden persistent gecacht - ein erneuter Aufruf mit gleichen
+        Spalten, Zielfeldern und Beispielen braucht keinen API-Request.
+
         Args:
             source_columns: Liste der Spalten aus der Quelldatei
             target_fields: Dictionary der ERPNext-Zielfelder
@@ -111,16 +199,76 @@ class GeminiAPI:
         Returns:
             Dict[source_column, target_field]
         """
-        # Erstelle Beschreibung der Zielfelder
-        target_descriptions = []
-        for field_key, field_info in target_fields.items():
-            label = field_info.get("label", field_key)
-            field_type = field_info.get("type", "Text")
-            required = "PFLICHT" if field_info.get("required") else ""
-            custom = "CUSTOM" if field_info.get("custom") else ""
-            target_descriptions.append(f"- {field_key}: {label} ({field_type}) {required} {custom}".strip())
+        key = self._mapping_cache_key(source_columns, target_fields, sample_data)
+        if self._mapping_cache is None:
+            self._mapping_cache = PersistentCache(self.base_url, ttl=self.MAPPING_CACHE_TTL)
+        cached = self._mapping_cache.get("ai_mapping", key)
+        if cached is not None:
+            return json_loads(cached)
+
+        mapping, complete = self._map_all_columns(source_columns, target_fields, sample_data)
+        # Nur vollständige Antworten cachen - ein fehlgeschlagener Teil-Prompt
+        # (429, Timeout) darf kein lückenhaftes Mapping für 30 Tage festschreiben
+        if complete and mapping:
+            self._mapping_cache.put("ai_mapping", key, json_dumps(mapping).decode("utf-8"))
+        return mapping
+
+    def _mapping_cache_key(self, source_columns: List[str],
+                           target_fields: Dict[str, Dict],
+                           sample_data: Optional[List[Dict]]) -> str:
+        """Hash über alles, was in den Prompt eingeht (Modell, Spalten, Zielfelder, Beispiele)"""
+        targets = [
+            (key, info.get("label", key), info.get("type", "Text"),
+             bool(info.get("required")), bool(info.get("custom")))
+            for key, info in target_fields.items()
+        ]
+        samples = [[str(row.get(col, ""))[:50] for col in source_columns]
+                   for row in (sample_data or [])[:3]]
+        payload = json_dumps([self.model, list(source_columns), targets, samples])
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _map_all_columns(self, source_columns: List[str],
+                         target_fields: Dict[str, Dict],
+                         sample_data: List[Dict] = None) -> Tuple[Dict[str, str], bool]:
+        """
+        Fragt die AI (bei vielen Spalten in parallelen Teil-Prompts).
 
-        target_list = "\n".join(target_descriptions)
+        Returns: (Mapping, True wenn alle Teil-Prompts erfolgreich waren)
+        """
+        if len(source_columns) <= self.CHUNK_THRESHOLD:
+            mapping = self._map_columns(source_columns, target_fields, sample_data)
+            return mapping or {}, mapping is not None
+
+        # Viele Spalten: Teil-Prompts parallel senden und zusammenführen
+        chunks = [source_columns[i:i + self.CHUNK_SIZE]
+                  for i in range(0, len(source_columns), self.CHUNK_SIZE)]
+        workers = min(len(chunks), self.MAX_PARALLEL_REQUESTS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda cols: self._map_columns(cols, target_fields, sample_data),
+                chunks
+            )
+            mapping = {}
+            complete = True
+            for chunk_mapping in results:
+                if chunk_mapping is None:
+                    complete = False
+                else:
+                    mapping.update(chunk_mapping)
+        return mapping, complete
+
+    def _map_columns(self, source_columns: List[str],
+                     target_fields: Dict[str, Dict],
+                     sample_data: List[Dict] = None) -> Optional[Dict[str, str]]:
+        """Mappt eine Gruppe von Quellspalten mit einem einzelnen Prompt (None bei Fehler)"""
+        # Stabiler Prompt-Anfang (Zielfelder + Regeln) wird gecacht und steht vorne,
+        # damit Gemini Context Caching greifen kann
+        targets = tuple(
+            (key, info.get("label", key), info.get("type", "Text"),
+             bool(info.get("required")), bool(info.get("custom")))
+            for key, info in target_fields.items()
+        )
+        prefix = _render_mapping_prefix(targets)
 
         # Erstelle Beschreibung der Quellspalten mit Beispieldaten
         source_descriptions = []
@@ -137,81 +285,38 @@ class GeminiAPI:
 
         source_list = "\n".join(source_descriptions)
 
-        prompt = f"""Du bist ein Experte für Daten-Mapping in ERP-Systemen.
-
-AUFGABE: Ordne die Quellspalten den passenden ERPNext-Zielfeldern zu.
+        prompt = f"""{prefix}
 
 QUELLSPALTEN (aus CSV/Import-Datei):
 {source_list}
 
-ZIELFELDER (ERPNext):
-{target_list}
+Antworte NUR mit dem JSON-Array, nichts anderes."""
 
-REGELN:
-1. Jede Quellspalte kann nur EINEM Zielfeld zugeordnet werden
-2. Nicht alle Quellspalten müssen zugeordnet werden
-3. Achte auf semantische Ähnlichkeit, nicht nur auf Namen
-4. Berücksichtige die Beispieldaten für bessere Zuordnung
-5. CUSTOM-Felder sind benutzerdefinierte Felder - ordne diese auch zu wenn passend
-6. Typische Mappings:
-   - Artikelnummer/SKU/Art-Nr -> item_code
-   - Bezeichnung/Name/Titel -> item_name
-   - EAN/GTIN/Barcode -> gtin
-   - Preis/VK/Netto -> standard_rate
-   - Kategorie/Warengruppe -> item_group
-   - Beschreibung/Text -> description
-   - Gewicht -> weight_per_unit
-   - Hersteller/Marke/Brand -> brand
-
-ANTWORT-FORMAT (NUR JSON, keine Erklärung):
-{{"quellspalte1": "zielfeld1", "quellspalte2": "zielfeld2"}}
-
-Wenn keine passende Zuordnung möglich ist, die Spalte weglassen.
-Antworte NUR mit dem JSON-Objekt, nichts anderes."""
-
-        result = self._make_request(prompt)
+        result = self._make_request(prompt, response_schema=self.MAPPING_SCHEMA)
 
         if not result:
-            return {}
+            return None
 
-        # Parse JSON aus Antwort
+        # Parse JSON aus Antwort (Structured Output, kein Markdown mehr)
         try:
-            # Bereinige Antwort (manchmal kommt Markdown-Codeblock)
-            result = result.strip()
-            
-            # Entferne Markdown-Codeblock wenn vorhanden
-            if result.startswith("```"):
-                # Finde Ende des Codeblocks
-                lines = result.split("\n")
-                # Erste Zeile ist ```json oder ```, letzte ist ```
-                start_idx = 1
-                end_idx = len(lines)
-                
-                # Suche nach schließendem ```
-                for i in range(len(lines) - 1, 0, -1):
-                    if lines[i].strip() == "```":
-                        end_idx = i
-                        break
-                
-                result = "\n".join(lines[start_idx:end_idx])
-            
-            # Entferne "json" Präfix wenn vorhanden
-            result = result.strip()
-            if result.lower().startswith("json"):
-                result = result[4:].strip()
-
-            mapping = json.loads(result.strip())
+            pairs = json_loads(result)
+            if not isinstance(pairs, list):
+                return None
 
-            # Validiere Mapping
+            # Validiere Mapping und wandle Paare in {quellspalte: zielfeld}
             valid_targets = set(target_fields.keys())
             validated_mapping = {}
-            for source, target in mapping.items():
+            for pair in pairs:
+                if not isinstance(pair, dict):
+                    continue
+                source, target = pair.get("source"), pair.get("target")
                 if source in source_columns and target in valid_targets:
                     validated_mapping[source] = target
 
             return validated_mapping
 
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json.JSONDecodeError und orjson.JSONDecodeError erben von ValueError
             logger.error(f"Gemini JSON Parse Error: {e}")
             logger.error(f"Response was: {result}")
-            return {}
+            return None
@@ -5,10 +5,25 @@ Datei-Parser für CSV und BMECat XML
 import csv
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator
 
 logger = logging.getLogger(__name__)
 
+# Optional lxml für schnelles Streaming-Parsing (Fallback: ElementTree)
+try:
+    from lxml import etree as LET
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Optional pyarrow für schnelles CSV-Parsing (Fallback: csv.DictReader)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 class CSVParser:
     """Parser für CSV-Dateien"""
@@ -37,6 +52,10 @@ class CSVParser:
             return ('?', exc.end)
         
         try:
+            if PYARROW_AVAILABLE and self._parse_arrow(file_path):
+                logger.info(f"CSV geparst (pyarrow): {len(self.data)} Zeilen, {len(self.columns)} Spalten")
+                return self.data, self.columns
+
             # Versuche zuerst mit strict encoding
             try:
                 with open(file_path, 'r', encoding=self.encoding, errors='strict') as f:
@@ -58,6 +77,30 @@ class CSVParser:
             logger.error(f"CSV Parse Error: {e}")
             raise
     
+    def _parse_arrow(self, file_path: str) -> bool:
+        """Parst mit pyarrow (C++, multithreaded). Gibt False zurück bei Fehlern."""
+        try:
+            with open(file_path, 'r', encoding=self.encoding, newline='') as f:
+                columns = next(csv.reader(f, delimiter=self.delimiter), [])
+            # Memory-Mapping: pyarrow liest direkt aus dem Page-Cache
+            with pa.memory_map(file_path, 'r') as source:
+                table = pacsv.read_csv(
+                    source,
+                    # Spaltennamen wie csv.DictReader, alle Werte als Text
+                    read_options=pacsv.ReadOptions(encoding=self.encoding,
+                                                   column_names=columns, skip_rows=1),
+                    parse_options=pacsv.ParseOptions(delimiter=self.delimiter,
+                                                     newlines_in_values=True),
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={c: pa.string() for c in columns}),
+                )
+        except Exception as e:
+            logger.warning(f"pyarrow CSV-Parsing fehlgeschlagen, verwende csv-Modul: {e}")
+            return False
+        self.columns = columns
+        self.data = table.to_pylist()
+        return True
+
     def get_sample_data(self, rows: int = 5) -> List[Dict]:
         """Gibt Beispieldaten zurück"""
         return self.data[:rows]
@@ -69,39 +112,98 @@ class BMECatParser:
     def __init__(self):
         self.products: List[Dict] = []
         self.categories: List[Dict] = []
+        self._tag_cache: Dict[str, str] = {}
+        self._tag_article = "ARTICLE"
+        self._tag_details = "ARTICLE_DETAILS"
+        self._tag_prices = "ARTICLE_PRICE_DETAILS"
+        self._tag_price = "ARTICLE_PRICE"
+        # Fehlerhafte Artikel: (laufende Nummer, Fehlermeldung)
+        self.errors: List[Tuple[int, str]] = []
     
     def parse(self, file_path: str) -> Tuple[List[Dict], List[Dict]]:
         """
         Parst BMECat XML Datei.
         
+        Die Datei wird gestreamt: jeder ARTICLE wird nach dem Parsen
+        freigegeben, der Speicherbedarf bleibt unabhängig von der Dateigröße.
+        
         Args:
             file_path: Pfad zur XML-Datei
             
         Returns:
             Tuple von (Produkte, Kategorien)
         """
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        self.products = list(self.iter_products(file_path))
+        logger.info(f"BMECat geparst: {len(self.products)} Produkte")
+        return self.products, self.categories
+    
+    def iter_products(self, file_path: str) -> Iterator[Dict]:
+        """
+        Liefert die Produkte einzeln (Generator) - ohne Produktliste im Speicher.
         
-        ns = self._detect_namespace(root)
-        self.products = []
+        Für Vorschau und Import, die nur einen Teil bzw. jeden Artikel einmal brauchen.
+        """
+        ns = self._detect_namespace(file_path)
+        self._tag_cache = {}
+        # Qualifizierte Tags einmal bauen - Vergleich per == statt endswith()
+        self._tag_article = f"{ns}ARTICLE"
+        self._tag_details = f"{ns}ARTICLE_DETAILS"
+        self._tag_prices = f"{ns}ARTICLE_PRICE_DETAILS"
+        self._tag_price = f"{ns}ARTICLE_PRICE"
         self.categories = []
+        self.errors = []
         
         # Produkte parsen
-        for article in root.iter():
-            if article.tag.endswith('ARTICLE'):
-                product = self._parse_article(article, ns)
-                if product:
-                    self.products.append(product)
-        
-        logger.info(f"BMECat geparst: {len(self.products)} Produkte")
-        return self.products, self.categories
+        if LXML_AVAILABLE:
+            # Tag-Filter läuft in libxml2 - nur ARTICLE-Elemente erreichen Python
+            events = LET.iterparse(file_path, events=("end",), tag=self._tag_article,
+                                   huge_tree=True)
+        else:
+            events = ET.iterparse(file_path, events=("end",))
+        # Ein try-Block für die ganze Schleife statt einem pro Artikel: nach einem
+        # Fehler wird der Fehler protokolliert und mit dem nächsten Artikel fortgesetzt
+        articles = iter(events)
+        index = 0
+        article = None
+        while True:
+            try:
+                for _, article in articles:
+                    if article.tag == self._tag_article:
+                        index += 1
+                        product = self._parse_article(article, ns)
+                        if product:
+                            yield product
+                        self._release(article)
+                return
+            except SyntaxError:
+                # XML-Syntaxfehler (ParseError/XMLSyntaxError) - Datei ist unbrauchbar
+                raise
+            except Exception as e:
+                logger.error(f"BMECat Parse Error (Artikel {index}): {e}")
+                self.errors.append((index, str(e)))
+                if article is not None:
+                    self._release(article)
     
-    def _detect_namespace(self, root) -> str:
-        """Erkennt den XML-Namespace"""
-        tag = root.tag
-        if '{' in tag:
-            return tag[tag.find('{'):tag.find('}')+1]
+    @staticmethod
+    def _release(article):
+        """Gibt einen verarbeiteten ARTICLE frei (Streaming-Speicherbedarf)"""
+        article.clear()
+        if LXML_AVAILABLE:
+            # Bereits verarbeitete Geschwister-Elemente entfernen
+            while article.getprevious() is not None:
+                del article.getparent()[0]
+        # ElementTree kennt kein getparent(): die geleerten ARTICLE-Hüllen bleiben
+        # im Elternelement - wenige Bytes je Artikel, für große Kataloge lxml nutzen
+    
+    def _detect_namespace(self, file_path: str) -> str:
+        """Erkennt den XML-Namespace anhand des ersten Elements"""
+        etree = LET if LXML_AVAILABLE else ET
+        with open(file_path, 'rb') as f:
+            for _, root in etree.iterparse(f, events=("start",)):
+                tag = root.tag
+                if '{' in tag:
+                    return tag[tag.find('{'):tag.find('}')+1]
+                return ''
         return ''
     
     def _get_text(self, element, path: str, ns: str, default: str = "") -> str:
@@ -109,49 +211,48 @@ class BMECatParser:
         if element is None:
             return default
         
-        # Suche mit und ohne Namespace
-        for search_path in [f'{ns}{path}', path, f'.//{ns}{path}', f'.//{path}']:
-            el = element.find(search_path)
-            if el is not None and el.text:
-                return el.text.strip()
+        # Qualifizierter Tag wird nur einmal pro Dokument gebaut
+        tag = self._tag_cache.get(path)
+        if tag is None:
+            tag = self._tag_cache[path] = f'{ns}{path}'
+        
+        el = element.find(tag)
+        if el is not None and el.text:
+            return el.text.strip()
         return default
     
     def _parse_article(self, article, ns: str) -> Optional[Dict]:
-        """Parst einen einzelnen Artikel aus BMECat"""
-        try:
-            # Suche nach Details-Elementen
-            details = None
-            prices = None
-            
-            for child in article:
-                if child.tag.endswith('ARTICLE_DETAILS'):
-                    details = child
-                elif child.tag.endswith('ARTICLE_PRICE_DETAILS'):
-                    prices = child
-            
-            supplier_aid = self._get_text(article, 'SUPPLIER_AID', ns)
-            
-            product = {
-                "artikelnummer": supplier_aid,
-                "artikelname": self._get_text(details, 'DESCRIPTION_SHORT', ns) if details else "",
-                "beschreibung": self._get_text(details, 'DESCRIPTION_LONG', ns) if details else "",
-                "ean": self._get_text(details, 'EAN', ns) if details else "",
-                "han": self._get_text(details, 'MANUFACTURER_AID', ns) if details else "",
-                "hersteller": self._get_text(details, 'MANUFACTURER_NAME', ns) if details else "",
-            }
-            
-            # Preise
-            if prices:
-                for price_el in prices:
-                    if price_el.tag.endswith('ARTICLE_PRICE'):
-                        product["preis"] = self._get_text(price_el, 'PRICE_AMOUNT', ns)
-                        break
-            
-            return product if product.get("artikelnummer") else None
-            
-        except Exception as e:
-            logger.error(f"BMECat Article Parse Error: {e}")
-            return None
+        """Parst einen einzelnen Artikel aus BMECat (ohne eigenes Fehler-Handling, siehe parse())"""
+        # Suche nach Details-Elementen
+        details = None
+        prices = None
+        
+        for child in article:
+            if child.tag == self._tag_details:
+                details = child
+            elif child.tag == self._tag_prices:
+                prices = child
+        
+        supplier_aid = self._get_text(article, 'SUPPLIER_AID', ns)
+        
+        # _get_text liefert "" wenn details fehlt (None)
+        product = {
+            "artikelnummer": supplier_aid,
+            "artikelname": self._get_text(details, 'DESCRIPTION_SHORT', ns),
+            "beschreibung": self._get_text(details, 'DESCRIPTION_LONG', ns),
+            "ean": self._get_text(details, 'EAN', ns),
+            "han": self._get_text(details, 'MANUFACTURER_AID', ns),
+            "hersteller": self._get_text(details, 'MANUFACTURER_NAME', ns),
+        }
+        
+        # Preise
+        if prices is not None:
+            for price_el in prices:
+                if price_el.tag == self._tag_price:
+                    product["preis"] = self._get_text(price_el, 'PRICE_AMOUNT', ns)
+                    break
+        
+        return product if product.get("artikelnummer") else None
     
     def get_columns(self) -> List[str]:
         """Gibt die verfügbaren Spalten zurück"""
@@ -2,8 +2,37 @@
 Hilfsfunktionen für den ERPNext Importer
 """
 
+import json
 from typing import Any, Optional
 
+# Optional orjson für schnelles JSON (Fallback: json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data):
+    """Dekodiert JSON (str oder bytes) - orjson wenn verfügbar"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Kodiert JSON als UTF-8 Bytes - orjson wenn verfügbar"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, indent=2 if pretty else None,
+                      ensure_ascii=False, default=str).encode("utf-8")
+
+
+def json_param(obj: Any) -> str:
+    """Kodiert JSON als str für Query-Parameter (fields/filters)"""
+    return json_dumps(obj).decode("utf-8")
+
 
 def parse_number(value: Any, allow_empty: bool = True) -> Optional[float]:
     """